@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+import time
+
+from phgen.audit import audit_files, collect_paths
+
+def main():
+    # ===== USER CONFIGURATION =====
+    # 1. Files or folders to audit together (every .csv/.txt file inside a folder)
+    #    Paths given on the command line take precedence
+    BASE_DIR = os.path.dirname(__file__)
+    PATHS = [
+        os.path.join(BASE_DIR, "Duplicate"),
+        os.path.join(BASE_DIR, "Invalid_Numbers"),
+        os.path.join(BASE_DIR, "Output"),
+    ]
+    
+    # 2. Worker processes (None = one per CPU)
+    PROCESSES = None
+    
+    # 3. Low-memory estimate: HyperLogLog sketches (~1% error) instead of exact counts; no spill
+    #    files or sorting, but every row is still parsed, so it is only ~20% faster
+    ESTIMATE = False
+    
+    # 4. Save the full report (every overlapping file pair) as JSON, or None
+    REPORT_FILE = os.path.join(BASE_DIR, "audit_report.json")
+    # =============================
+    
+    paths = collect_paths(path for path in (sys.argv[1:] or PATHS) if os.path.exists(path))
+    if not paths:
+        print("\n❌ No files to audit.")
+        return
+    
+    start = time.perf_counter()
+    report = audit_files(paths, PROCESSES, ESTIMATE)
+    elapsed = time.perf_counter() - start
+    approx = "~" if report.estimated else ""
+    
+    print(f"\n✅ Audited {len(report.files)} files, {report.rows} rows in {elapsed:.1f}s")
+    print(f"🌟 Distinct numbers: {approx}{report.distinct}")
+    print(f"🔁 Duplicate rows: {approx}{report.duplicate_rows}")
+    if report.cross_file_numbers is not None:
+        print(f"🔗 Numbers in more than one file: {report.cross_file_numbers}")
+    
+    print("\n📁 Per file:")
+    for audit in report.files:
+        print(f"  - {os.path.relpath(audit.path, BASE_DIR)}: {audit.rows} rows, {approx}{audit.distinct} distinct, "
+              f"{approx}{audit.duplicate_rows} duplicate rows, {approx}{audit.shared} shared with other files")
+    
+    if REPORT_FILE:
+        with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"\n📄 Report: {os.path.abspath(REPORT_FILE)}")
+
+if __name__ == "__main__":
+    main()
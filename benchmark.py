@@ -0,0 +1,182 @@
+import argparse
+import cProfile
+import json
+import multiprocessing
+import os
+import platform
+import pstats
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module, peak RSS is reported as null
+    resource = None
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+# Cases that are too slow for the largest sizes are capped (exact-Faker contacts)
+MAX_ROWS = {"individual_number.generate_contacts_with_distribution": 10 ** 4}
+
+
+def _split_networks(rows: int, networks: List[str]) -> Dict[str, int]:
+    """Spread `rows` evenly over `networks`"""
+    base, extra = divmod(rows, len(networks))
+    return {network: base + (1 if i < extra else 0) for i, network in enumerate(networks)}
+
+
+def _case(name: str, rows: int) -> Tuple[Callable[[], object], Callable[[str, object], object]]:
+    """(generate, save) callables for benchmark case `name` at `rows` output rows"""
+    if name == "valid_number.generate_mixed_numbers":
+        import valid_number as module
+        return (lambda: module.generate_mixed_numbers(rows)), module.save_to_csv
+    if name == "duplicated_number.generate_mixed_numbers":
+        import duplicated_number as module
+        return (lambda: module.generate_mixed_numbers(rows - rows // 2, rows // 2)), module.save_to_csv
+    if name == "duplicated_number2.generate_numbers_with_distribution":
+        import duplicated_number2 as module
+        counts = _split_networks(rows - rows // 2, list(module.SIM_PREFIXES))
+        return (lambda: module.generate_numbers_with_distribution(counts, rows // 2)), module.save_to_csv
+    if name == "invalid_number.generate_unique_invalid_numbers":
+        import invalid_number as module
+        return (lambda: module.generate_unique_invalid_numbers(rows)), module.save_to_csv
+    if name == "mixed_invalid_valid_duplicate.generate_mixed_numbers":
+        import mixed_invalid_valid_duplicate as module
+        return (lambda: module.generate_mixed_numbers(rows - rows // 2, rows // 2)), module.save_to_csv
+    if name == "individual_number.generate_contacts_with_distribution":
+        import individual_number as module
+        from phgen.contacts import get_faker
+        get_faker()  # Faker is imported lazily, surface a missing install here
+        counts = _split_networks(rows - rows // 2, list(module.SIM_PREFIXES))
+        return (lambda: module.generate_contacts_with_distribution(counts, rows // 2)), module.save_to_csv
+    raise ValueError(f"Unknown benchmark case: {name}")
+
+
+CASES = [
+    "valid_number.generate_mixed_numbers",
+    "duplicated_number.generate_mixed_numbers",
+    "duplicated_number2.generate_numbers_with_distribution",
+    "invalid_number.generate_unique_invalid_numbers",
+    "mixed_invalid_valid_duplicate.generate_mixed_numbers",
+    "individual_number.generate_contacts_with_distribution",
+]
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(name: str, rows: int) -> Dict[str, object]:
+    """Time generation and save_to_csv for one case (runs in a fresh worker process)"""
+    result: Dict[str, object] = {"case": name, "rows": rows}
+    try:
+        generate, save = _case(name, rows)
+    except ImportError as e:
+        result["skipped"] = f"missing dependency: {e.name}"
+        return result
+
+    start = time.perf_counter()
+    numbers = generate()
+    generated = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        save(os.path.join(tmp, "bench.csv"), numbers)
+    saved = time.perf_counter()
+
+    result["generate_s"] = round(generated - start, 6)
+    result["save_s"] = round(saved - generated, 6)
+    result["rows_per_sec"] = round(rows / max(saved - start, 1e-9), 1)
+    result["peak_rss_kb"] = _peak_rss_kb()
+    return result
+
+
+def run_suite(cases: List[str], sizes: List[int]) -> Dict[str, object]:
+    """Run every case at every size, each in its own spawned process so peak RSS is per case"""
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in cases:
+        for rows in sizes:
+            if rows > MAX_ROWS.get(name, rows):
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, name, rows).result()
+            results.append(result)
+            if "skipped" in result:
+                print(f"{name:58} {rows:>10}  skipped ({result['skipped']})")
+                break
+            print(f"{name:58} {rows:>10}  {result['rows_per_sec']:>14,.0f} rows/s  "
+                  f"gen {result['generate_s']:.3f}s  save {result['save_s']:.3f}s  rss {result['peak_rss_kb']} KiB")
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Regressions: cases whose rows/sec fell more than `tolerance` below the baseline"""
+    previous = {(r["case"], r["rows"]): r for r in baseline["results"] if "rows_per_sec" in r}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["case"], result["rows"]))
+        if before is None or "rows_per_sec" not in result:
+            continue
+        if result["rows_per_sec"] < before["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result['case']} @ {result['rows']}: {result['rows_per_sec']:,.0f} rows/s "
+                f"(baseline {before['rows_per_sec']:,.0f})"
+            )
+    return regressions
+
+
+def profile_case(name: str, rows: int, top: int = 25):
+    """Print the hottest functions of one case under cProfile"""
+    generate, save = _case(name, rows)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    numbers = generate()
+    with tempfile.TemporaryDirectory() as tmp:
+        save(os.path.join(tmp, "bench.csv"), numbers)
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every generator module")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="row counts to run")
+    parser.add_argument("--cases", nargs="+", default=CASES, choices=CASES, metavar="CASE")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed rows/sec drop (0.2 = 20%%)")
+    parser.add_argument("--profile", choices=CASES, metavar="CASE", help="cProfile one case instead")
+    args = parser.parse_args()
+
+    if args.profile:
+        profile_case(args.profile, max(args.sizes))
+        return
+
+    report = run_suite(args.cases, args.sizes)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {os.path.abspath(args.output)}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,28 @@
-import csv
 import random
 import os
-from typing import List, Dict
+from typing import List, Union
 
-# SIM Prefixes mapping with network names in descending priority order
-SIM_PREFIXES: Dict[str, List[str]] = {
-    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
-    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
-    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
-    "Smart/TNT": ["907", "908", "909", "910", "912", "913", "914"],
-    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "940", "941", "942"]
-}
+from phgen.columnar import COLUMNAR_SUFFIX, ColumnarReader, save_columnar
+from phgen.duplicates import generate_priority_numbers as generate_mixed_numbers
+from phgen.duplicates import generate_priority_store as generate_number_store
+from phgen.duplicates import iter_priority_numbers as iter_mixed_numbers
+from phgen.prefixes import SIM_PREFIXES
+from phgen.store import DuplicatedNumbers, NumberStore
+from phgen.stream import write_chunks
+from phgen.weights import NetworkWeights
 
 def generate_ph_number(prefix: str) -> str:
     """Generate a random Philippine mobile number (63 + prefix + 7 random digits)"""
     suffix = ''.join([str(random.randint(0, 9)) for _ in range(7)])
     return f"63{prefix}{suffix}"
 
-def generate_mixed_numbers(unique_numbers: int, duplicates: int) -> List[str]:
-    """Generate numbers with ordered duplicates, maintaining network priority and accurate prefix representation"""
-    numbers = []
-    network_order = ["Globe/TM", "Smart", "TNT", "Smart/TNT", "Sun"]  # Strict priority order
-    
-    # First, ensure we have at least one number from each prefix in each network
-    prefix_samples = []
-    for network in network_order:
-        for prefix in SIM_PREFIXES[network]:
-            prefix_samples.append((network, prefix))
-    
-    # Add these prefix samples first
-    for network, prefix in prefix_samples:
-        if len(numbers) >= unique_numbers:
-            break
-        numbers.append(generate_ph_number(prefix))
-    
-    # Then fill the rest with random prefixes from any network (maintaining priority)
-    for network in network_order:
-        if len(numbers) >= unique_numbers:
-            break
-        prefixes = SIM_PREFIXES[network]
-        while len(numbers) < unique_numbers and prefixes:
-            prefix = random.choice(prefixes)
-            numbers.append(generate_ph_number(prefix))
-    
-    # Duplicate the first 'duplicates' numbers (highest priority)
-    numbers.extend(numbers[:duplicates])
-    return numbers
-
-def save_to_csv(filename: str, numbers: List[str]) -> bool:
+def save_to_csv(filename: str, numbers: Union[List[str], NumberStore, DuplicatedNumbers]) -> bool:
     """Save numbers to a CSV file (one number per row, no headers)"""
     try:
-        dirname = os.path.dirname(filename)
-        if dirname:
-            os.makedirs(dirname, exist_ok=True)
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            for number in numbers:
-                writer.writerow([number])
+        if isinstance(numbers, (NumberStore, DuplicatedNumbers)):
+            write_chunks(filename, numbers.iter_text_chunks())
+        else:
+            write_chunks(filename, [numbers])
         
         if not os.path.exists(filename):
             raise RuntimeError("File creation failed silently")
@@ -75,6 +40,8 @@ def main():
     CONTACTS_PER_FILE = 1000  # Total numbers (50 unique + 50 duplicates)
     DUPLICATES = 500        # Exact number of duplicates
     UNIQUE_NUMBERS = CONTACTS_PER_FILE - DUPLICATES  # 50 unique
+    OUTPUT_FORMAT = "csv"   # "columnar" = packed binary .phc file, verified straight from the mapped file
+    MARKET_SHARE = None     # e.g. {"Globe/TM": 0.55, "Smart": 0.25, "Sun": 0.2}: split the fill rows by share
     
     # Save in the same folder as the script
     output_dir = os.path.join(os.path.dirname(__file__), 'Duplicate')
@@ -83,17 +50,35 @@ def main():
     print(f"Generating 1 file with {CONTACTS_PER_FILE} numbers (50 unique + 50 duplicates)...")
     print(f"Network priority: Globe/TM → Smart → TNT → Smart/TNT → Sun")
     
-    numbers = generate_mixed_numbers(UNIQUE_NUMBERS, DUPLICATES)
+    weights = NetworkWeights(MARKET_SHARE) if MARKET_SHARE else None
+    numbers = generate_number_store(UNIQUE_NUMBERS, DUPLICATES, weights)
+    if OUTPUT_FORMAT == "columnar":
+        filename = os.path.join(output_dir, "Schedule_1" + COLUMNAR_SUFFIX)
+        save_columnar(filename, numbers)
+        
+        # Verification reads the flag and network columns back without parsing any text
+        with ColumnarReader(filename) as reader:
+            flag_counts = reader.flag_counts()
+            network_counts = reader.network_counts(unique=True)
+            print(f"\nSuccessfully created: {filename}")
+            print(f"Total numbers: {len(reader)} (Expected: {CONTACTS_PER_FILE})")
+            print(f"Unique numbers: {len(reader) - flag_counts['duplicate']} (Expected: {UNIQUE_NUMBERS})")
+            print(f"Duplicates: {flag_counts['duplicate']} (Expected: {DUPLICATES})")
+        print("\nNetwork distribution in unique numbers:")
+        for network, count in network_counts.items():
+            print(f"{network}: {count} numbers")
+        return
+    
     filename = os.path.join(output_dir, "Schedule_1.csv") #Change the file name as needed
     
     if save_to_csv(filename, numbers):
         # Verification
-        unique_set = set(numbers)
+        unique_count = numbers.unique_count()
         print(f"\nSuccessfully created: {filename}")
         print(f"File location: {os.path.abspath(filename)}")
         print(f"Total numbers: {len(numbers)} (Expected: {CONTACTS_PER_FILE})")
-        print(f"Unique numbers: {len(unique_set)} (Expected: {UNIQUE_NUMBERS})")
-        print(f"Duplicates: {len(numbers) - len(unique_set)} (Expected: {DUPLICATES})")
+        print(f"Unique numbers: {unique_count} (Expected: {UNIQUE_NUMBERS})")
+        print(f"Duplicates: {len(numbers) - unique_count} (Expected: {DUPLICATES})")
         
         # Print sample numbers (first 3 and last 3)
         print("\nSample numbers:")
@@ -102,13 +87,7 @@ def main():
         
         # Print network distribution
         print("\nNetwork distribution in unique numbers:")
-        network_counts = {network: 0 for network in SIM_PREFIXES}
-        for number in unique_set:
-            prefix = number[2:5]  # Extract the prefix (after '63')
-            for network, prefixes in SIM_PREFIXES.items():
-                if prefix in prefixes:
-                    network_counts[network] += 1
-                    break
+        network_counts = numbers.store.network_counts(SIM_PREFIXES, unique=True)
         for network, count in network_counts.items():
             print(f"{network}: {count} numbers")
     else:
@@ -1,51 +1,41 @@
-import csv
 import random
 import os
-from typing import List, Dict, Optional
+from collections import deque
+from contextlib import nullcontext
+from typing import Iterable, List, Sequence
 
-# SIM Prefixes mapping with network names
-SIM_PREFIXES: Dict[str, List[str]] = {
-    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
-    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
-    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
-    "Smart/TNT": ["907", "908", "909", "910", "912", "913", "914"],
-    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "940", "941", "942"]
-}
+from phgen.checkpoint import load_checkpoint, run_resumable
+from phgen.duplicates import generate_distribution_store as generate_number_store
+from phgen.duplicates import (
+    ResumableDistribution, generate_numbers_with_distribution, iter_numbers_with_distribution, iter_weighted_numbers,
+)
+from phgen.instrument import instrumented, write_report
+from phgen.prefixes import SIM_PREFIXES
+from phgen.registry import NumberRegistry
+from phgen.stream import write_chunks
+from phgen.weights import NetworkWeights
 
 def generate_ph_number(prefix: str) -> str:
     """Generate a PH number (63 + prefix + 7 random digits)"""
     return f"63{prefix}{''.join(str(random.randint(0, 9)) for _ in range(7))}" 
 
-def generate_numbers_with_distribution(
-    network_counts: Dict[str, int],
-    duplicates: int
-) -> List[str]:
-    """Generate numbers with exact distribution per network + duplicates"""
-    numbers = []
-    
-    # Generate unique numbers per network
-    for network, count in network_counts.items():
-        if network not in SIM_PREFIXES:
-            raise ValueError(f"Unknown network: {network}")
-        for _ in range(count):
-            prefix = random.choice(SIM_PREFIXES[network])
-            numbers.append(generate_ph_number(prefix))
-    
-    # Add duplicates (from the start to maintain priority)
-    numbers.extend(numbers[:duplicates])
-    return numbers
-
 def save_to_csv(filename: str, numbers: List[str]) -> bool:
     """Save numbers to CSV (one per row, no headers)"""
     try:
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            csv.writer(f).writerows([[num] for num in numbers])
+        write_chunks(filename, [numbers])
         return True
     except Exception as e:
         print(f"ERROR: Failed to save {filename}\n{type(e).__name__}: {e}")
         return False
 
+def sample_rows(chunks: Iterable[Sequence[str]], first: List[str], last: deque) -> Iterable[Sequence[str]]:
+    """Pass `chunks` through, keeping the first rows in `first` and the last ones in `last`"""
+    for chunk in chunks:
+        if len(first) < 3:
+            first.extend(chunk[:3 - len(first)])
+        last.extend(chunk[-last.maxlen:])
+        yield chunk
+
 def main():
     # ===== USER CONFIGURATION =====
     # 1. Set EXACT counts per network (adjust these numbers)
@@ -62,12 +52,49 @@ def main():
     
     # 3. Custom CSV filename (optional, auto-generates if None)
     CUSTOM_FILENAME = "Duplicate_500.csv" 
+    
+    # 4. Never reuse numbers issued by earlier runs (kept in .registry/)
+    USE_REGISTRY = False
+    
+    # 5. Where duplicates go: "head" (first numbers again at the end), "uniform", "zipf" (hot numbers)
+    #    or "exact" (every number repeated equally); all but "head" scatter them through the file
+    DUPLICATE_STRATEGY = "head"
+    
+    # 6. Or split a total by weight (e.g. market share) instead of exact counts; None keeps NETWORK_COUNTS
+    MARKET_SHARE = None  # e.g. {"Globe/TM": 0.55, "Smart": 0.25, "TNT": 0.1, "Sun": 0.1}
+    UNIQUE_TOTAL = 1000
+    
+    # 7. Very large runs: commit the file in segments so a crashed run can be rerun and continue
+    #    where it stopped (head strategy, no registry, no MARKET_SHARE); SEED None reuses the interrupted run's seed
+    RESUMABLE = False
+    SEED = None
+    
+    # 8. Write per-stage timings and per-network row counts to <file>.report.json
+    REPORT = False
     # =============================
     
-    # Generate numbers
-    unique_numbers = sum(NETWORK_COUNTS.values())
-    total_numbers = unique_numbers + DUPLICATES
-    numbers = generate_numbers_with_distribution(NETWORK_COUNTS, DUPLICATES)
+    weights = None
+    if MARKET_SHARE:
+        # Exact largest-remainder quotas per prefix, drawn like the weighted mode: a prefix listed
+        # under two networks (946 is Smart and TNT) is only drawn for the first one
+        weights = NetworkWeights(MARKET_SHARE)
+        NETWORK_COUNTS = {network: count for network, count in
+                          weights.network_counts(weights.quotas(UNIQUE_TOTAL)).items() if count}
+    
+    if RESUMABLE:
+        if weights is not None:
+            print("\n❌ RESUMABLE works with NETWORK_COUNTS only, set MARKET_SHARE = None")
+            return
+        filename = CUSTOM_FILENAME or "Duplicate_resumable.csv"
+        filepath = os.path.join(os.path.dirname(__file__), "Duplicate", filename)
+        checkpoint = load_checkpoint(filepath)
+        seed = SEED if SEED is not None else checkpoint["job"]["seed"] if checkpoint else random.getrandbits(64)
+        if checkpoint:
+            print(f"Resuming {filename} after {checkpoint['rows']} committed rows...")
+        job = {"network_counts": NETWORK_COUNTS, "duplicates": DUPLICATES, "seed": seed}
+        rows = run_resumable(filepath, ResumableDistribution(NETWORK_COUNTS, DUPLICATES, seed), job)
+        print(f"\n✅ Successfully created: {filename} ({rows} numbers, seed {seed})")
+        return
     
     # Auto-generate filename if not provided
     if not CUSTOM_FILENAME:
@@ -76,31 +103,49 @@ def main():
             for network, count in NETWORK_COUNTS.items()
         ) + f"_dup_{DUPLICATES}.csv"
     
-    # Save to CSV
     output_dir = os.path.join(os.path.dirname(__file__), "Duplicate")
-    os.makedirs(output_dir, exist_ok=True)
     filepath = os.path.join(output_dir, CUSTOM_FILENAME)
     
-    if save_to_csv(filepath, numbers):
-        # Verification
-        unique_set = set(numbers)
-        print(f"\n✅ Successfully created: {CUSTOM_FILENAME}")
-        print(f"📁 Location: {os.path.abspath(filepath)}")
-        print(f"🔢 Total numbers: {len(numbers)} (Expected: {total_numbers})")
-        print(f"🌟 Unique numbers: {len(unique_set)} (Expected: {unique_numbers})")
-        print(f"♻️ Duplicates: {len(numbers) - len(unique_set)} (Expected: {DUPLICATES})")
-        
-        # Network distribution
-        print("\n📶 Network distribution (unique numbers):")
-        for network, count in NETWORK_COUNTS.items():
-            print(f"  - {network}: {count} numbers")
-        
-        # Sample output
-        print("\n🔍 Sample numbers:")
-        print("First 3:", numbers[:3])
-        print("Last 3 (duplicates):", numbers[-3:])
-    else:
+    # Generate and save in chunks: the file is never held in memory, rows are counted as they are written
+    unique_numbers = sum(NETWORK_COUNTS.values())
+    total_numbers = unique_numbers + DUPLICATES
+    registry = NumberRegistry(os.path.join(os.path.dirname(__file__), ".registry")) if USE_REGISTRY else None
+    first, last = [], deque(maxlen=3)
+    try:
+        if weights is not None:
+            chunks = iter_weighted_numbers(weights, UNIQUE_TOTAL, DUPLICATES, registry=registry,
+                                           strategy=DUPLICATE_STRATEGY)
+        else:
+            chunks = iter_numbers_with_distribution(NETWORK_COUNTS, DUPLICATES, registry=registry,
+                                                    strategy=DUPLICATE_STRATEGY)
+        with instrumented() if REPORT else nullcontext() as stats:
+            rows = write_chunks(filepath, sample_rows(chunks, first, last))
+    except Exception as e:
+        print(f"ERROR: Failed to save {filepath}\n{type(e).__name__}: {e}")
         print("\n❌ Failed to create file. Check errors above.")
+        return
+    finally:
+        if registry is not None:
+            registry.close()
+    
+    # Verification (the generator never repeats a unique number, so only the row count is checked)
+    print(f"\n✅ Successfully created: {CUSTOM_FILENAME}")
+    print(f"📁 Location: {os.path.abspath(filepath)}")
+    print(f"🔢 Total numbers: {rows} (Expected: {total_numbers})")
+    print(f"🌟 Unique numbers: {unique_numbers}")
+    print(f"♻️ Duplicates: {rows - unique_numbers} (Expected: {DUPLICATES})")
+    if stats is not None:
+        print(f"📄 Run report: {write_report(stats, filepath, script='duplicated_number2.py', rows=rows)}")
+    
+    # Network distribution
+    print("\n📶 Network distribution (unique numbers):")
+    for network, count in NETWORK_COUNTS.items():
+        print(f"  - {network}: {count} numbers")
+    
+    # Sample output
+    print("\n🔍 Sample numbers:")
+    print("First 3:", first)
+    print("Last 3:" if DUPLICATE_STRATEGY != "head" else "Last 3 (duplicates):", list(last))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
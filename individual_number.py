@@ -1,68 +1,21 @@
-import csv
-import random
 import os
-from typing import List, Dict
-from faker import Faker
-
-# Initialize Faker
-fake = Faker()
-
-# SIM Prefixes mapping with network names
-SIM_PREFIXES: Dict[str, List[str]] = {
-    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
-    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
-    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
-    "Smart/TNT": ["907", "908", "909", "910", "912", "914"],
-    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "941", "942"]
-}
-
-def generate_ph_number(prefix: str) -> str:
-    """Generate a PH number (0 + prefix + 7 random digits)"""
-    return f"0{prefix}{''.join([str(random.randint(0, 9)) for _ in range(7)])}"
+import random
+from typing import List
 
-def generate_contact_row(prefix: str) -> str:
-    """Generate a contact row matching Book1.csv format"""
-    first_name = fake.first_name()
-    middle_name = fake.random_letter().upper()  # Single initial like in your example
-    last_name = fake.last_name()
-    mobile_number = generate_ph_number(prefix)
-    company = fake.company().replace(",", "")  # Remove commas to match your format
-    position = fake.job().replace(",", "")
-    department = random.choice(["Sales", "Marketing", "IT", "HR", "Finance", "Operations", 
-                              "R&D", "Logistics", "Admin", "Support", "Legal", "Strategy",
-                              "Management", "Production", "Creative", "Research", "Development"])
-    email = f"{first_name.lower()}.{last_name.lower()}@{company.replace(' ', '').lower()}.com"
-    city = fake.city()
-    address = f"{random.randint(1, 999)} {fake.street_name()}, {city}"
-    
-    # Format exactly like Book1.csv
-    return f"{first_name}|{middle_name}|{last_name}|{mobile_number}|{company}|{position}|{department}|{email}|{address}"
-
-def generate_contacts_with_distribution(
-    network_counts: Dict[str, int],
-    duplicates: int
-) -> List[str]:
-    """Generate contacts with exact distribution per network + duplicates"""
-    contacts = []
-    
-    # Generate unique contacts per network
-    for network, count in network_counts.items():
-        if network not in SIM_PREFIXES:
-            raise ValueError(f"Unknown network: {network}")
-        for _ in range(count):
-            prefix = random.choice(SIM_PREFIXES[network])
-            contacts.append(generate_contact_row(prefix))
-    
-    # Add duplicates (from the start to maintain priority)
-    contacts.extend(contacts[:duplicates])
-    return contacts
+from phgen.checkpoint import load_checkpoint, run_resumable
+from phgen.contacts import (
+    DEPARTMENTS, POOL_CACHE_PATH, ResumableContacts, benchmark_contact_modes, generate_contact_row,
+    generate_contacts_with_distribution, get_contact_pools, iter_contacts_with_distribution,
+)
+from phgen.contacts import generate_local_number as generate_ph_number
+from phgen.pipeline import write_contacts_parallel
+from phgen.prefixes import SIM_PREFIXES
+from phgen.stream import write_chunks
 
 def save_to_csv(filename: str, contacts: List[str]) -> bool:
     """Save contacts to CSV (one per row, no headers)"""
     try:
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            f.write("\n".join(contacts))
+        write_chunks(filename, [contacts], line_ending="\n", trailing_newline=False)
         return True
     except Exception as e:
         print(f"ERROR: Failed to save {filename}\n{type(e).__name__}: {e}")
@@ -84,10 +37,41 @@ def main():
     
     # 3. Custom CSV filename
     CUSTOM_FILENAME = "Duplicate_5i.csv" 
+    
+    # 4. Fast mode: build rows from cached Faker pools (much faster for millions of rows)
+    FAST_MODE = False
+    
+    # 5. Very large runs: commit the file in segments so a crashed run can be rerun and continue
+    #    where it stopped; SEED None reuses the interrupted run's seed
+    RESUMABLE = False
+    SEED = None
+    
+    # 6. Multi-million-row files: render blocks in this many worker processes (1 = off);
+    #    mobile numbers are guaranteed unique across the whole file
+    PROCESSES = 1
     # =============================
     
+    if PROCESSES > 1:
+        filepath = os.path.join(os.path.dirname(__file__), "Output", CUSTOM_FILENAME)
+        rows = write_contacts_parallel(filepath, NETWORK_COUNTS, DUPLICATES, SEED, FAST_MODE, PROCESSES)
+        print(f"\n✅ Successfully created: {CUSTOM_FILENAME} ({rows} contacts)")
+        print(f"📁 Location: {os.path.abspath(filepath)}")
+        return
+    
+    if RESUMABLE:
+        filepath = os.path.join(os.path.dirname(__file__), "Output", CUSTOM_FILENAME)
+        checkpoint = load_checkpoint(filepath)
+        seed = SEED if SEED is not None else checkpoint["job"]["seed"] if checkpoint else random.getrandbits(64)
+        if checkpoint:
+            print(f"Resuming {CUSTOM_FILENAME} after {checkpoint['rows']} committed rows...")
+        job = {"network_counts": NETWORK_COUNTS, "duplicates": DUPLICATES, "fast": FAST_MODE, "seed": seed}
+        rows = run_resumable(filepath, ResumableContacts(NETWORK_COUNTS, DUPLICATES, seed, FAST_MODE), job,
+                             line_ending="\n", trailing_newline=False)
+        print(f"\n✅ Successfully created: {CUSTOM_FILENAME} ({rows} contacts, seed {seed})")
+        return
+    
     # Generate contacts
-    contacts = generate_contacts_with_distribution(NETWORK_COUNTS, DUPLICATES)
+    contacts = generate_contacts_with_distribution(NETWORK_COUNTS, DUPLICATES, fast=FAST_MODE)
     
     # Save to CSV
     output_dir = os.path.join(os.path.dirname(__file__), "Output")
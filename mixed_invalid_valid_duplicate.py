@@ -1,86 +1,95 @@
-import csv
 import random
-import string
-from typing import List, Dict
+from collections import deque
+from functools import partial
+from typing import Iterable, List, Sequence
 
-# SIM Prefixes mapping with network names in descending priority order
-SIM_PREFIXES: Dict[str, List[str]] = {
-    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
-    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
-    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
-    "Smart/TNT": ["907", "908", "909", "910", "912", "913", "914"],
-    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "940", "941", "942"]
-}
+from phgen.mixed import (
+    generate_invalid_number, generate_mixed_numbers, iter_interleaved_numbers, iter_mixed_numbers, iter_mixed_rows,
+)
+from phgen.prefixes import SIM_PREFIXES
+from phgen.shard import derive_seed, generate_files_sharded
+from phgen.stream import compressed_name, write_chunks
+from phgen.writer import write_files
 
 def generate_valid_number(prefix: str) -> str:
     """Generate a valid Philippine mobile number (63 + prefix + 7 digits)"""
     suffix = ''.join([str(random.randint(0, 9)) for _ in range(7)])
     return f"63{prefix}{suffix}"
 
-def generate_invalid_number() -> str:
-    """Generate an invalid Philippine mobile number with various patterns"""
-    patterns = [
-        # Wrong length (not 11 digits)
-        lambda: f"63{random.randint(1, 9)}{''.join([str(random.randint(0, 9)) for _ in range(8)])}",
-        # Wrong country code (not 63)
-        lambda: f"6{random.randint(0, 5)}{''.join([str(random.randint(0, 9)) for _ in range(9)])}",
-        # Invalid prefix (000, 111, 222)
-        lambda: f"63{random.choice(['000', '111', '222'])}{''.join([str(random.randint(0, 9)) for _ in range(7)])}",
-        # Completely random digits
-        lambda: ''.join([str(random.randint(0, 9)) for _ in range(12)]),
-        # Numbers with letters mixed in
-        lambda: f"63{random.choice(['81', '90', '91'])}" + \
-               ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(7))
-    ]
-    return random.choice(patterns)()
+def save_to_csv(filename: str, numbers: List[str]):
+    """Save numbers to CSV (no headers, same CRLF rows as csv.writer)"""
+    write_chunks(filename, [numbers])
 
-def generate_mixed_numbers(valid_count: int, invalid_count: int) -> List[List[str]]:
-    """Generate numbers with valid first, then invalid"""
-    numbers = []
-    all_prefixes = [p for network in SIM_PREFIXES.values() for p in network]
-    
-    # Generate VALID numbers (first segment)
-    valid_numbers = [
-        [generate_valid_number(random.choice(all_prefixes))] 
-        for _ in range(valid_count)
-    ]
-    
-    # Generate INVALID numbers (second segment)
-    invalid_numbers = [
-        [generate_invalid_number()] 
-        for _ in range(invalid_count)
-    ]
-    
-    # Combine (valid first, then invalid)
-    numbers = valid_numbers + invalid_numbers
-    return numbers
-
-def save_to_csv(filename: str, numbers: List[List[str]]):
-    """Save numbers to CSV (no headers)"""
-    with open(filename, 'w', newline='') as f:
-        csv.writer(f).writerows(numbers)
+def sample_rows(chunks: Iterable[Sequence[str]], first: List[str], last: deque) -> Iterable[Sequence[str]]:
+    """Pass `chunks` through, keeping the first rows in `first` and the last ones in `last`"""
+    for chunk in chunks:
+        if len(first) < 5:
+            first.extend(chunk[:5 - len(first)])
+        last.extend(chunk[-last.maxlen:])
+        yield chunk
 
 def main():
     # CONFIGURATION
     CONTACTS_PER_FILE = 100   # Total numbers per file
     INVALID_COUNT = 50        # Invalid numbers per file
     NUMBER_OF_FILES = 1      # Files to generate
+    PROCESSES = 1            # Worker processes (>1 generates the files in parallel)
+    SEED = None              # Set an int for byte-identical files on every run
+    COMPRESSION = None       # "gzip" or "xz" writes .csv.gz / .csv.xz files
+    WRITER_THREADS = 4       # Files compressed and written while the next one is generated
+    DUPLICATE_COUNT = 0      # Rows repeating a valid number of the same file
+    PLACEMENT = None         # None = valid first, invalid last; or "blocks", "shuffle", "burst" (exact counts)
+    BURST_SIZE = 100         # Invalid rows per burst with PLACEMENT = "burst"
+    
+    if PLACEMENT or DUPLICATE_COUNT:
+        # Interleaved valid/invalid/duplicate rows with exact counts per class, in constant memory
+        valid_count = CONTACTS_PER_FILE - INVALID_COUNT - DUPLICATE_COUNT
+        seed = SEED if SEED is not None else random.getrandbits(64)
+        filenames = [compressed_name(f"Mixed_{i}.csv", COMPRESSION) for i in range(1, NUMBER_OF_FILES + 1)]
+        jobs = (
+            (filename, iter_interleaved_numbers(valid_count, INVALID_COUNT, DUPLICATE_COUNT, PLACEMENT or "shuffle",
+                                                burst_size=BURST_SIZE, seed=derive_seed(seed, index)))
+            for index, filename in enumerate(filenames)
+        )
+        write_files(jobs, threads=WRITER_THREADS)
+        for filename in filenames:
+            print(f"Generated {filename} ({valid_count} valid, {INVALID_COUNT} invalid, {DUPLICATE_COUNT} duplicates)")
+        print("\nDone!")
+        return
     
     print(f"Creating {NUMBER_OF_FILES} files with:")
     print(f"- First {CONTACTS_PER_FILE - INVALID_COUNT} valid numbers")
     print(f"- Last {INVALID_COUNT} invalid numbers (some with letters)\n")
     
+    filenames = [compressed_name(f"ValidFirst_InvalidLast_{i}.csv", COMPRESSION) for i in range(1, NUMBER_OF_FILES + 1)]
+    if PROCESSES > 1 or SEED is not None:
+        rows_fn = partial(iter_mixed_rows, valid_count=CONTACTS_PER_FILE - INVALID_COUNT)
+        generate_files_sharded(filenames, rows_fn, CONTACTS_PER_FILE, seed=SEED, processes=PROCESSES)
+        for filename in filenames:
+            print(f"Generated {filename}")
+        print("\nDone! Files have valid numbers first, followed by invalid numbers.")
+        return
+    
+    if NUMBER_OF_FILES > 1 or COMPRESSION:
+        # Rows are generated here, in order, while writer threads compress and write earlier files
+        valid_count = CONTACTS_PER_FILE - INVALID_COUNT
+        write_files(((filename, iter_mixed_numbers(valid_count, INVALID_COUNT)) for filename in filenames),
+                    threads=WRITER_THREADS)
+        for filename in filenames:
+            print(f"Generated {filename}")
+        print("\nDone! Files have valid numbers first, followed by invalid numbers.")
+        return
+    
     for i in range(1, NUMBER_OF_FILES + 1):
-        nums = generate_mixed_numbers(
-            valid_count=CONTACTS_PER_FILE - INVALID_COUNT,
-            invalid_count=INVALID_COUNT
-        )
-        save_to_csv(f"ValidFirst_InvalidLast_{i}.csv", nums)
+        # Streamed chunk by chunk; only the sample rows printed below are kept
+        first, last = [], deque(maxlen=5)
+        chunks = iter_mixed_numbers(CONTACTS_PER_FILE - INVALID_COUNT, INVALID_COUNT)
+        write_chunks(f"ValidFirst_InvalidLast_{i}.csv", sample_rows(chunks, first, last))
         
         # Print sample output
         print(f"\nGenerated ValidFirst_InvalidLast_{i}.csv")
-        print("First 5 (valid):", [n[0] for n in nums[:5]])
-        print("Last 5 (invalid):", [n[0] for n in nums[-5:]])
+        print("First 5 (valid):", first)
+        print("Last 5 (invalid):", list(last))
     
     print("\nDone! Files have valid numbers first, followed by invalid numbers.")
 
@@ -0,0 +1 @@
+"""Shared engines behind the Philippine phone number generator scripts"""
@@ -0,0 +1,5 @@
+import sys
+
+from phgen.cli import main
+
+sys.exit(main())
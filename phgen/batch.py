@@ -0,0 +1,141 @@
+import random
+import time
+from array import array
+from typing import List, Optional, Sequence
+
+from phgen.instrument import current_stats
+
+# Every prefix owns 10^7 suffixes (7 random digits)
+SUFFIX_SPACE = 10_000_000
+# Numbers are kept as integers without the country code: prefix * 10^7 + suffix
+NSN_DIGITS = 10
+
+
+def prefix_bases(prefixes: Sequence[str]) -> List[int]:
+    """Integer value of each prefix shifted past the 7 suffix digits"""
+    return [int(prefix) * SUFFIX_SPACE for prefix in prefixes]
+
+
+def _draw_offsets(bases: Sequence[int], offset: int = 0) -> List[int]:
+    """Per-prefix amount to add to a draw r (in range(len(bases) * 10^7)) to get its number
+
+    r // 10^7 picks the prefix and r % 10^7 is the suffix, so the number is
+    r - index * 10^7 + bases[index] (+ `offset`): one modulo per row instead of two.
+    """
+    return [base - index * SUFFIX_SPACE + offset for index, base in enumerate(bases)]
+
+
+def draw_numbers(prefixes: Sequence[str], count: int, rng: Optional[random.Random] = None) -> List[int]:
+    """Draw `count` numbers as integers (prefix * 10^7 + suffix) from uniformly chosen prefixes"""
+    if count <= 0:
+        return []
+    if not prefixes:
+        raise ValueError("At least one prefix is required")
+    offsets = _draw_offsets(prefix_bases(prefixes))
+    space = len(offsets) * SUFFIX_SPACE
+    # One 64-bit draw covers both the prefix index and the suffix; the modulo bias is < 1e-10
+    raw = array('Q', (rng or random).randbytes(8 * count))
+    return [offsets[(r := x % space) // SUFFIX_SPACE] + r for x in raw]
+
+
+def format_numbers(values: Sequence[int], country_code: str = "63") -> List[str]:
+    """Render integer numbers as text with the given country code or trunk prefix ("63", "0", "+63")"""
+    stats = current_stats()
+    if stats is not None:
+        with stats.stage("format", len(values)):
+            return _format_numbers(values, country_code)
+    return _format_numbers(values, country_code)
+
+
+def _format_numbers(values: Sequence[int], country_code: str) -> List[str]:
+    if country_code.isdigit() and not country_code.startswith("0"):
+        offset = int(country_code) * 10 ** NSN_DIGITS
+        return [str(v + offset) for v in values]
+    return [country_code + str(v) for v in values]
+
+
+def numpy_generator(seed: Optional[int] = None):
+    """A `numpy.random.Generator` for the NumPy backend (NumPy is optional and only imported here)"""
+    import numpy as np
+    return np.random.default_rng(seed)
+
+
+def _is_numpy_generator(rng) -> bool:
+    """True for NumPy generators, without importing NumPy just to check"""
+    return type(rng).__module__.startswith("numpy")
+
+
+def _generate_numpy(prefixes: Sequence[str], count: int, country_code: str, generator) -> List[str]:
+    """NumPy backend: draw index and suffix arrays, render text once at the end"""
+    import numpy as np
+    bases = np.array(prefix_bases(prefixes), dtype=np.int64)
+    values = bases[generator.integers(0, len(bases), count)] + generator.integers(0, SUFFIX_SPACE, count)
+    if country_code.isdigit() and not country_code.startswith("0"):
+        return (values + int(country_code) * 10 ** NSN_DIGITS).astype(str).tolist()
+    return np.char.add(country_code, values.astype(str)).tolist()
+
+
+def generate_ph_numbers(
+    prefixes: Sequence[str],
+    count: int,
+    rng=None,
+    country_code: str = "63",
+) -> List[str]:
+    """Generate `count` Philippine mobile numbers in one call (country code + prefix + 7 digits)
+
+    Prefixes are picked uniformly from `prefixes` (repeats in the list act as weights).
+    `rng` may be a `random.Random` (stdlib path) or a `numpy.random.Generator` (see
+    `numpy_generator`); when it is omitted the global `random` module is used.
+    """
+    if count <= 0:
+        return []
+    if not prefixes:
+        raise ValueError("At least one prefix is required")
+    if rng is not None and _is_numpy_generator(rng):
+        return _generate_numpy(prefixes, count, country_code, rng)
+
+    bases = prefix_bases(prefixes)
+    space = len(bases) * SUFFIX_SPACE
+    stats = current_stats()
+    if stats is not None:
+        start = time.perf_counter()
+    raw = array('Q', (rng or random).randbytes(8 * count))
+    if stats is not None:
+        # Prefix and suffix come from the same 64-bit draw, so they are timed together
+        drawn = time.perf_counter()
+        stats.add_time("draw", drawn - start, count)
+    if country_code.isdigit() and not country_code.startswith("0"):
+        # Text is built in the same pass: the country code is folded into the per-prefix offsets
+        offsets = _draw_offsets(bases, int(country_code) * 10 ** NSN_DIGITS)
+        numbers = [str(offsets[(r := x % space) // SUFFIX_SPACE] + r) for x in raw]
+    else:
+        offsets = _draw_offsets(bases)
+        numbers = [country_code + str(offsets[(r := x % space) // SUFFIX_SPACE] + r) for x in raw]
+    if stats is not None:
+        stats.add_time("format", time.perf_counter() - drawn, count)
+    return numbers
+
+
+def generate_ph_numbers_for(
+    row_prefixes: Sequence[str],
+    rng=None,
+    country_code: str = "63",
+) -> List[str]:
+    """Generate one number per entry of `row_prefixes`, keeping the given prefix order"""
+    if not row_prefixes:
+        return []
+    stats = current_stats()
+    if stats is not None:
+        start = time.perf_counter()
+    raw = array('Q', (rng or random).randbytes(8 * len(row_prefixes)))
+    if stats is not None:
+        drawn = time.perf_counter()
+        stats.add_time("draw", drawn - start, len(row_prefixes))
+    if country_code.isdigit() and not country_code.startswith("0"):
+        offset = int(country_code) * 10 ** NSN_DIGITS
+        numbers = [str(offset + int(prefix) * SUFFIX_SPACE + x % SUFFIX_SPACE) for prefix, x in zip(row_prefixes, raw)]
+    else:
+        numbers = [f"{country_code}{prefix}{x % SUFFIX_SPACE:07d}" for prefix, x in zip(row_prefixes, raw)]
+    if stats is not None:
+        stats.add_time("format", time.perf_counter() - drawn, len(row_prefixes))
+    return numbers
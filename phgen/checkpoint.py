@@ -0,0 +1,121 @@
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes, compression_for, compressor
+
+# Rows committed per segment (one fsync and checkpoint each)
+DEFAULT_SEGMENT_ROWS = 1_000_000
+CHECKPOINT_SUFFIX = ".ckpt"
+PARTIAL_SUFFIX = ".partial"
+_VERSION = 1
+
+
+def rng_state(rng: random.Random) -> list:
+    """JSON-ready state of a random.Random"""
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def set_rng_state(rng: random.Random, state: list):
+    """Restore a state saved by rng_state"""
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
+
+
+def checkpoint_path(filename: str) -> str:
+    return filename + CHECKPOINT_SUFFIX
+
+
+def load_checkpoint(filename: str) -> Optional[Dict[str, object]]:
+    """The checkpoint of an interrupted run writing `filename`, or None"""
+    path = checkpoint_path(filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_checkpoint(filename: str, checkpoint: Dict[str, object]):
+    """Replace the checkpoint atomically, so a crash leaves the old or the new one, never half of one"""
+    path = checkpoint_path(filename)
+    tmp_name = path + ".tmp"
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, path)
+
+
+def run_resumable(
+    filename: str,
+    source,
+    job: Dict[str, object],
+    segment_rows: int = DEFAULT_SEGMENT_ROWS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    line_ending: str = "\r\n",
+    trailing_newline: bool = True,
+    compression: Optional[str] = "auto",
+) -> int:
+    """Write `source` to `filename` in committed segments, resuming an interrupted run
+
+    `source` has a `total` row count, `take(count)` returning the next rows, and
+    `getstate()`/`setstate(state)` with JSON-ready state. Rows are appended to
+    `filename`.partial; after every segment the file is fsynced and a checkpoint
+    records the committed rows, bytes, `job` and the source state. A restart
+    truncates the partial file to the last commit and carries on from there, so
+    the result is byte-identical to an uninterrupted run. `job` (the generator
+    parameters, seed included) must match the checkpoint's, or the run is refused.
+    Compressed output gets one gzip/xz member per segment.
+    """
+    if segment_rows <= 0:
+        raise ValueError("segment_rows must be positive")
+    if compression == "auto":
+        compression = compression_for(filename)
+    if compression not in (None, "gzip", "xz"):
+        raise ValueError(f"Unknown compression: {compression}")
+    # Round-tripped so it compares equal to the copy read back from the checkpoint
+    job = json.loads(json.dumps(dict(job, segment_rows=segment_rows, chunk_size=chunk_size, compression=compression)))
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    partial = filename + PARTIAL_SUFFIX
+    checkpoint = load_checkpoint(filename)
+    if checkpoint is not None and os.path.exists(partial):
+        if checkpoint.get("version") != _VERSION or checkpoint["job"] != job:
+            raise ValueError(f"{checkpoint_path(filename)} belongs to a different job; delete it to start over")
+        source.setstate(checkpoint["state"])
+        rows, committed = checkpoint["rows"], checkpoint["bytes"]
+        raw = open(partial, 'r+b')
+        raw.truncate(committed)  # Drop whatever the interrupted segment got out
+        raw.seek(committed)
+    else:
+        rows = 0
+        raw = open(partial, 'wb')
+
+    with raw:
+        while rows < source.total:
+            size = min(segment_rows, source.total - rows)
+            sink = compressor(raw, compression) if compression else raw
+            for part in chunk_sizes(size, chunk_size):
+                chunk: List[str] = source.take(part)
+                if len(chunk) != part:
+                    raise RuntimeError(f"Source ran dry after {rows} rows, expected {source.total}")
+                text = line_ending.join(chunk)
+                if trailing_newline:
+                    text += line_ending
+                elif rows:
+                    text = line_ending + text
+                sink.write(text.encode('utf-8'))
+                rows += part
+            if sink is not raw:
+                sink.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+            _save_checkpoint(filename, {"version": _VERSION, "job": job, "rows": rows, "bytes": raw.tell(),
+                                        "state": source.getstate()})
+    os.replace(partial, filename)
+    os.remove(checkpoint_path(filename))
+    return rows
@@ -0,0 +1,483 @@
+"""Single command line entry point: python -m phgen <mode> [options]
+
+Every mode streams its rows straight to the output file. Mode modules are only
+imported once their subcommand is picked, so `--help` and small runs start fast.
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from phgen.stream import DEFAULT_CHUNK_SIZE
+
+# Default of `serve --max-streams` (kept here so --help never imports asyncio)
+DEFAULT_MAX_STREAMS = 32
+# Default of --segment-rows, same as phgen.checkpoint.DEFAULT_SEGMENT_ROWS
+DEFAULT_SEGMENT_ROWS = 1_000_000
+
+
+def _network_counts(pairs: List[str]) -> Dict[str, int]:
+    """Parse NAME=COUNT pairs (e.g. Globe/TM=200) keeping their order"""
+    counts = {}
+    for pair in pairs:
+        network, sep, count = pair.rpartition("=")
+        if not sep or not count.isdigit():
+            raise ValueError(f"Expected NAME=COUNT, got {pair!r}")
+        counts[network] = int(count)
+    return counts
+
+
+def _weights(pairs: Optional[List[str]]) -> Optional[Dict[str, float]]:
+    """Parse NAME=WEIGHT pairs (e.g. Globe/TM=0.55), None when no pair was given"""
+    if not pairs:
+        return None
+    weights = {}
+    for pair in pairs:
+        name, sep, weight = pair.rpartition("=")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise ValueError(f"Expected NAME=WEIGHT, got {pair!r}")
+    return weights
+
+
+def _print_histogram(histogram: Dict[str, int]):
+    for network, count in histogram.items():
+        print(f"{network}: {count}")
+
+
+def _valid_chunks(args, registry=None) -> Iterable[Sequence[str]]:
+    from phgen.valid import iter_mixed_numbers, iter_unique_rows
+
+    if args.unique:
+        seed = args.seed if args.seed is not None else random.getrandbits(64)
+        return iter_unique_rows(0, args.count, None, seed)
+    if args.numpy:
+        from phgen.batch import numpy_generator
+        rng = numpy_generator(args.seed)
+    else:
+        rng = random.Random(args.seed)
+    return iter_mixed_numbers(args.count, args.chunk_size, rng, registry)
+
+
+def _run_valid(args) -> int:
+    from phgen.stream import write_chunks
+    from phgen.valid import iter_number_rows, iter_unique_rows
+
+    if args.registry and (args.processes > 1 or args.unique):
+        # The registry is updated in place by one process, and its numbers never repeat anyway
+        raise ValueError("--registry cannot be combined with --processes or --unique")
+    if args.processes > 1 or args.unique:
+        from functools import partial
+        from phgen.shard import generate_file_sharded
+        seed = args.seed if args.seed is not None else random.getrandbits(64)
+        rows_fn = partial(iter_unique_rows, seed=seed) if args.unique else iter_number_rows
+        return generate_file_sharded(args.output, rows_fn, args.count,
+                                     seed=seed, shards=args.processes, processes=args.processes)
+
+    registry = None
+    if args.registry:
+        from phgen.registry import NumberRegistry
+        registry = NumberRegistry(args.registry)
+    try:
+        return write_chunks(args.output, _valid_chunks(args, registry))
+    finally:
+        if registry is not None:
+            registry.close()
+
+
+def _duplicate_chunks(args) -> Iterable[Sequence[str]]:
+    from phgen.duplicates import iter_numbers_with_distribution, iter_priority_numbers
+
+    schedule = (args.strategy, args.zipf_exponent, args.multiplicity)
+    if args.network:
+        return iter_numbers_with_distribution(_network_counts(args.network), args.duplicates, args.chunk_size,
+                                              None, *schedule, seed=args.seed)
+    weights = None
+    if args.weight:
+        from phgen.weights import NetworkWeights
+        weights = NetworkWeights(_weights(args.weight))
+    return iter_priority_numbers(args.unique, args.duplicates, args.chunk_size, *schedule, weights, args.seed)
+
+
+def _resumable_seed(args) -> int:
+    """--seed, else the seed of the interrupted run being resumed, else a fresh one"""
+    if args.seed is not None:
+        return args.seed
+    from phgen.checkpoint import load_checkpoint
+    checkpoint = load_checkpoint(args.output)
+    if checkpoint is not None:
+        return checkpoint["job"]["seed"]
+    return random.getrandbits(64)
+
+
+def _run_duplicate(args) -> int:
+    from phgen.stream import write_chunks
+
+    if args.resumable:
+        if not args.network or args.strategy != "head" or args.output.endswith(".phc"):
+            raise ValueError("--resumable needs --network, the head strategy and a text output")
+        from phgen.checkpoint import run_resumable
+        from phgen.duplicates import ResumableDistribution
+        seed = _resumable_seed(args)
+        counts = _network_counts(args.network)
+        job = {"mode": "duplicate", "network_counts": counts, "duplicates": args.duplicates, "seed": seed}
+        return run_resumable(args.output, ResumableDistribution(counts, args.duplicates, seed), job,
+                             args.segment_rows, args.chunk_size)
+
+    if args.output.endswith(".phc"):
+        if args.strategy != "head":
+            raise ValueError("Columnar output supports the head duplicate strategy only")
+        from phgen.columnar import save_columnar
+        from phgen.duplicates import generate_distribution_store, generate_priority_store
+        if args.network:
+            numbers = generate_distribution_store(_network_counts(args.network), args.duplicates, args.seed)
+        else:
+            numbers = generate_priority_store(args.unique, args.duplicates, seed=args.seed)
+        return save_columnar(args.output, numbers)
+    return write_chunks(args.output, _duplicate_chunks(args))
+
+
+def _weighted_chunks(args, histogram: Optional[Dict[str, int]] = None) -> Iterable[Sequence[str]]:
+    from phgen.weights import NetworkWeights
+
+    weights = NetworkWeights(_weights(args.weight), _weights(args.prefix_weight))
+    return weights.iter_numbers(args.count, args.chunk_size, random.Random(args.seed), not args.sample, histogram)
+
+
+def _run_weighted(args) -> int:
+    if args.processes > 1:
+        from functools import partial
+        from phgen.shard import generate_file_sharded
+        from phgen.weights import NetworkWeights
+        weights = NetworkWeights(_weights(args.weight), _weights(args.prefix_weight))
+        exact = not args.sample
+        seed = args.seed if args.seed is not None else random.getrandbits(64)
+        rows_fn = partial(weights.iter_rows, total=args.count, seed=seed, exact=exact, chunk_size=args.chunk_size)
+        rows = generate_file_sharded(args.output, rows_fn, args.count,
+                                     seed=seed, shards=args.processes, processes=args.processes)
+        # Exact quotas are known up front; sampled shards keep their draws to themselves
+        if exact:
+            _print_histogram(weights.network_counts(weights.quotas(args.count)))
+        return rows
+
+    from phgen.stream import write_chunks
+    histogram: Dict[str, int] = {}
+    rows = write_chunks(args.output, _weighted_chunks(args, histogram))
+    _print_histogram(histogram)
+    return rows
+
+
+def _invalid_chunks(args) -> Iterable[Sequence[str]]:
+    from phgen.invalid import iter_unique_invalid_numbers
+
+    return iter_unique_invalid_numbers(args.count, args.chunk_size, seed=args.seed, patterns=args.pattern)
+
+
+def _run_invalid(args) -> int:
+    from phgen.invalid import iter_unique_invalid_numbers
+    from phgen.stream import write_chunks
+
+    if not args.registry:
+        return write_chunks(args.output, _invalid_chunks(args))
+    from phgen.registry import open_invalid_registry
+    with open_invalid_registry(args.registry) as registry:
+        return write_chunks(args.output, iter_unique_invalid_numbers(args.count, args.chunk_size, args.seed,
+                                                                      args.pattern, registry))
+
+
+def _mixed_chunks(args) -> Iterable[Sequence[str]]:
+    from phgen.mixed import iter_interleaved_numbers, iter_mixed_numbers
+
+    if args.placement or args.duplicates:
+        return iter_interleaved_numbers(args.count - args.invalid - args.duplicates, args.invalid, args.duplicates,
+                                        args.placement or "shuffle", args.chunk_size, args.burst_size, args.seed)
+    return iter_mixed_numbers(args.count - args.invalid, args.invalid, args.chunk_size, random.Random(args.seed))
+
+
+def _run_mixed(args) -> int:
+    from phgen.stream import write_chunks
+
+    if args.processes > 1 and not (args.placement or args.duplicates):
+        from functools import partial
+        from phgen.mixed import iter_mixed_rows
+        from phgen.shard import generate_file_sharded
+        rows_fn = partial(iter_mixed_rows, valid_count=args.count - args.invalid)
+        return generate_file_sharded(args.output, rows_fn, args.count, seed=args.seed,
+                                     shards=args.processes, processes=args.processes)
+    return write_chunks(args.output, _mixed_chunks(args))
+
+
+def _contacts_chunks(args) -> Iterable[Sequence[str]]:
+    from phgen.contacts import iter_contacts_with_distribution
+
+    return iter_contacts_with_distribution(_network_counts(args.network), args.duplicates,
+                                           args.chunk_size, fast=args.fast, seed=args.seed)
+
+
+def _run_contacts(args) -> int:
+    if args.resumable:
+        if args.processes > 1:
+            raise ValueError("--processes and --resumable cannot be combined")
+        from phgen.checkpoint import run_resumable
+        from phgen.contacts import ResumableContacts
+        seed = _resumable_seed(args)
+        counts = _network_counts(args.network)
+        job = {"mode": "contacts", "network_counts": counts, "duplicates": args.duplicates, "fast": args.fast,
+               "seed": seed}
+        source = ResumableContacts(counts, args.duplicates, seed, args.fast, args.chunk_size)
+        return run_resumable(args.output, source, job, args.segment_rows, args.chunk_size,
+                             line_ending="\n", trailing_newline=False)
+
+    # Every process count goes through the block pipeline, so a seed gives one file whatever --processes is
+    from phgen.pipeline import write_contacts_parallel
+    return write_contacts_parallel(args.output, _network_counts(args.network), args.duplicates, args.seed,
+                                   args.fast, args.processes)
+
+
+def _slice_dataset(args):
+    from phgen.counter import CounterDataset
+
+    if args.seed is None:
+        raise ValueError("slice needs --seed: rows are a function of the seed and the row index")
+    dataset = CounterDataset(args.count - args.invalid - args.duplicates, args.invalid, args.duplicates, args.seed,
+                             args.strategy, args.placement, args.unique, args.zipf_exponent)
+    stop = dataset.total if args.stop is None else args.stop
+    if not 0 <= args.start <= stop <= dataset.total:
+        raise ValueError(f"Rows {args.start}..{stop} are outside the {dataset.total}-row dataset")
+    return dataset, stop
+
+
+def _slice_chunks(args) -> Iterable[Sequence[str]]:
+    dataset, stop = _slice_dataset(args)
+    return dataset.iter_rows(args.start, stop, args.chunk_size)
+
+
+def _run_slice(args) -> int:
+    from phgen.stream import write_chunks
+
+    if args.processes > 1:
+        from functools import partial
+        from phgen.counter import iter_slice_rows
+        from phgen.shard import generate_file_sharded
+        dataset, stop = _slice_dataset(args)
+        rows_fn = partial(iter_slice_rows, dataset=dataset, offset=args.start, chunk_size=args.chunk_size)
+        return generate_file_sharded(args.output, rows_fn, stop - args.start, seed=args.seed,
+                                     shards=args.processes, processes=args.processes)
+    return write_chunks(args.output, _slice_chunks(args))
+
+
+def _run_serve(args) -> int:
+    import asyncio
+    from phgen.service import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_streams))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _run_audit(args) -> int:
+    import json
+    from phgen.audit import audit_files, collect_paths
+
+    paths = collect_paths(args.paths)
+    if not paths:
+        raise ValueError("No CSV or text files found to audit")
+    report = audit_files(paths, args.processes, args.estimate, args.column, work_dir=args.work_dir)
+    approx = "~" if report.estimated else ""
+    for audit in report.files:
+        print(f"{audit.path}: {audit.rows} rows, {audit.valid} valid, {approx}{audit.distinct} distinct, "
+              f"{approx}{audit.duplicate_rows} duplicate rows, {approx}{audit.shared} shared with other files")
+    print(f"Total: {report.rows} rows in {len(report.files)} files, {approx}{report.distinct} distinct, "
+          f"{approx}{report.duplicate_rows} duplicate rows")
+    if report.cross_file_numbers is not None:
+        print(f"Numbers in more than one file: {report.cross_file_numbers}")
+        for (first, second), shared in sorted(report.overlaps.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {shared}: {first} <-> {second}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Audit report: {args.json}")
+    return 0
+
+
+def build_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Argument parser with one subcommand per generator
+
+    Every generator mode sets `handler` (writes the file, returns the row count)
+    and `chunks` (the same rows as a chunk iterator, used by the service).
+    """
+    parser = parser_class(prog="phgen", description="Philippine phone number generator")
+    modes = parser.add_subparsers(dest="mode", required=True, metavar="MODE")
+
+    def add_mode(name: str, handler, chunks, help: str, default_output: str) -> argparse.ArgumentParser:
+        mode = modes.add_parser(name, help=help, description=help)
+        mode.set_defaults(handler=handler, chunks=chunks)
+        mode.add_argument("-o", "--output", default=default_output, help=f"output file (default: {default_output})")
+        mode.add_argument("--seed", type=int, help="seed for reproducible output")
+        mode.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows generated per chunk")
+        mode.add_argument("--report", action="store_true",
+                          help="time every stage and write a JSON run report to OUTPUT.report.json")
+        mode.add_argument("--profile", action="store_true",
+                          help="also dump cProfile stats to OUTPUT.prof (implies --report)")
+        mode.add_argument("--trace-memory", action="store_true",
+                          help="also trace allocations with tracemalloc, peak and top sites go in the report "
+                               "(implies --report)")
+        return mode
+
+    def add_resumable(mode: argparse.ArgumentParser):
+        mode.add_argument("--resumable", action="store_true",
+                          help="commit the output in segments with a checkpoint; rerunning the same command "
+                               "after a crash continues from the last segment (byte-identical result)")
+        mode.add_argument("--segment-rows", type=int, default=DEFAULT_SEGMENT_ROWS,
+                          help="rows per committed segment (--resumable)")
+
+    valid = add_mode("valid", _run_valid, _valid_chunks, "valid numbers from all networks (valid_number.py)",
+                     "Valid_1.csv")
+    valid.add_argument("-n", "--count", type=int, default=20, help="numbers to generate")
+    valid.add_argument("--unique", action="store_true", help="never repeat a number within the file")
+    valid.add_argument("--registry", metavar="DIR", help="skip numbers issued by earlier runs (kept in DIR)")
+    valid.add_argument("--processes", type=int, default=1, help="worker processes for one file")
+    valid.add_argument("--numpy", action="store_true", help="use the NumPy backend (NumPy must be installed)")
+
+    duplicate = add_mode("duplicate", _run_duplicate, _duplicate_chunks,
+                         "unique numbers followed by duplicates of the first ones (duplicated_number*.py); "
+                         "a .phc output is written in the binary columnar format",
+                         "Duplicate.csv")
+    duplicate.add_argument("--unique", type=int, default=500, help="unique numbers in priority order")
+    duplicate.add_argument("--network", action="append", metavar="NAME=COUNT",
+                           help="exact unique count for a network (repeatable, replaces --unique)")
+    duplicate.add_argument("--duplicates", type=int, default=500, help="duplicated rows")
+    duplicate.add_argument("--strategy", choices=("head", "uniform", "zipf", "exact"), default="head",
+                           help="head: first numbers again at the end; uniform/zipf: random numbers at random "
+                                "positions (zipf skews towards hot numbers); exact: equal repeats per number")
+    duplicate.add_argument("--zipf-exponent", type=float, default=1.1, help="skew of the zipf strategy")
+    duplicate.add_argument("--multiplicity", type=int,
+                           help="exact strategy: every number appears this many times (replaces --duplicates)")
+    duplicate.add_argument("--weight", action="append", metavar="NAME=WEIGHT",
+                           help="split the rows beyond one per prefix by network weight (repeatable, "
+                                "e.g. market share) instead of filling the top network")
+    add_resumable(duplicate)
+
+    weighted = add_mode("weighted", _run_weighted, _weighted_chunks,
+                        "valid numbers split by network/prefix weights (e.g. market share)", "Weighted.csv")
+    weighted.add_argument("-n", "--count", type=int, default=1000, help="numbers to generate")
+    weighted.add_argument("--weight", action="append", metavar="NAME=WEIGHT",
+                          help="network weight (repeatable); unlisted networks get no rows, "
+                               "no weights at all weighs every prefix equally")
+    weighted.add_argument("--prefix-weight", action="append", metavar="PREFIX=WEIGHT",
+                          help="weight of a prefix within its network (repeatable, default 1)")
+    weighted.add_argument("--sample", action="store_true",
+                          help="draw every row independently instead of meeting exact per-prefix quotas")
+    weighted.add_argument("--processes", type=int, default=1, help="worker processes for one file")
+
+    invalid = add_mode("invalid", _run_invalid, _invalid_chunks, "unique invalid numbers (invalid_number.py)",
+                       "Invalid.csv")
+    invalid.add_argument("-n", "--count", type=int, default=25, help="numbers to generate")
+    invalid.add_argument("--pattern", action="append", metavar="NAME", help="only use this pattern (repeatable)")
+    invalid.add_argument("--registry", metavar="DIR",
+                         help="skip numbers issued by earlier runs (Bloom filter kept in DIR)")
+
+    mixed = add_mode("mixed", _run_mixed, _mixed_chunks,
+                     "valid numbers first, invalid last (mixed_invalid_valid_duplicate.py)",
+                     "ValidFirst_InvalidLast.csv")
+    mixed.add_argument("-n", "--count", type=int, default=100, help="total numbers")
+    mixed.add_argument("--invalid", type=int, default=50, help="invalid numbers")
+    mixed.add_argument("--duplicates", type=int, default=0, help="rows repeating a valid number of the file")
+    mixed.add_argument("--placement", choices=("blocks", "shuffle", "burst"),
+                       help="interleave valid/invalid/duplicate rows to exact counts (default with --duplicates: "
+                            "shuffle); without it valid rows come first and invalid rows last")
+    mixed.add_argument("--burst-size", type=int, default=100, help="invalid rows per burst (burst placement)")
+    mixed.add_argument("--processes", type=int, default=1, help="worker processes for one file")
+
+    contacts = add_mode("contacts", _run_contacts, _contacts_chunks, "Book1-style contact rows (individual_number.py)",
+                        "Contacts.csv")
+    contacts.add_argument("--network", action="append", required=True, metavar="NAME=COUNT",
+                          help="contacts for a network (repeatable)")
+    contacts.add_argument("--duplicates", type=int, default=0, help="duplicated rows at the end")
+    contacts.add_argument("--fast", action="store_true", help="build rows from cached Faker pools")
+    contacts.add_argument("--processes", type=int, default=1,
+                          help="render blocks in worker processes; mobile numbers never repeat in the unique rows "
+                               "and a --seed gives the same file for any count (--resumable and the serve "
+                               "stream use the sequential generator, whose rows differ)")
+    add_resumable(contacts)
+
+    slice_ = add_mode("slice", _run_slice, _slice_chunks,
+                      "rows START..STOP of a seeded valid/invalid/duplicate dataset, computed without "
+                      "generating the rows before them (every row is a function of --seed and its index)",
+                      "Slice.csv")
+    slice_.add_argument("-n", "--count", type=int, default=100, help="total rows of the whole dataset")
+    slice_.add_argument("--invalid", type=int, default=0, help="invalid rows of the dataset")
+    slice_.add_argument("--duplicates", type=int, default=0, help="rows repeating a valid row of the dataset")
+    slice_.add_argument("--start", type=int, default=0, help="first row to write")
+    slice_.add_argument("--stop", type=int, help="row after the last one to write (default: the end)")
+    slice_.add_argument("--unique", action="store_true", help="valid rows never repeat each other")
+    slice_.add_argument("--strategy", choices=("uniform", "zipf", "exact", "head"), default="uniform",
+                        help="which valid rows the duplicates repeat (see duplicate --strategy)")
+    slice_.add_argument("--zipf-exponent", type=float, default=1.1, help="skew of the zipf strategy")
+    slice_.add_argument("--placement", choices=("shuffle", "blocks"), default="shuffle",
+                        help="shuffle: classes interleaved at random; blocks: valid, invalid, then duplicates")
+    slice_.add_argument("--processes", type=int, default=1, help="worker processes for one file")
+
+    audit_help = "exact unique/duplicate counts and cross-file overlaps of existing CSV or pipe files"
+    audit = modes.add_parser("audit", help=audit_help, description=audit_help)
+    audit.set_defaults(handler=_run_audit)
+    audit.add_argument("paths", nargs="+", metavar="PATH", help="files, or directories whose .csv/.txt files "
+                                                                "are audited (e.g. Duplicate/ Output/)")
+    audit.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    audit.add_argument("--estimate", action="store_true",
+                       help="HyperLogLog estimates (~1%%) instead of exact counts: no spill files and "
+                            "little memory, but only ~20%% faster (rows are still parsed); no pairwise overlaps")
+    audit.add_argument("--column", type=int,
+                       help="0-based column of the number (default: 3 for pipe files, else 0)")
+    audit.add_argument("--work-dir", metavar="DIR", help="where exact mode spills its partitions "
+                                                         "(default: the system temp directory)")
+    audit.add_argument("--top", type=int, default=10, help="file pairs with the most shared numbers to list")
+    audit.add_argument("--json", metavar="PATH", help="also write the full report (every file pair) as JSON")
+
+    serve_help = "stream any mode over HTTP on demand, e.g. GET /mixed?count=1000&invalid=100&seed=1"
+    serve = modes.add_parser("serve", help=serve_help, description=serve_help)
+    serve.set_defaults(handler=_run_serve)
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="TCP port (default: 8080)")
+    serve.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    serve.add_argument("--max-streams", type=int, default=DEFAULT_MAX_STREAMS,
+                       help="responses generated at once, further clients wait their turn")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    try:
+        if getattr(args, "report", False) or getattr(args, "profile", False) or getattr(args, "trace_memory", False):
+            rows = _run_instrumented(args)
+        else:
+            rows = args.handler(args)
+    except (ValueError, ImportError) as e:  # Bad NAME=COUNT / capacity, or an optional backend missing
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if args.mode in ("serve", "audit"):
+        return rows
+    print(f"Created {args.output} ({rows} rows in {time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+def _run_instrumented(args) -> int:
+    """Run the mode's handler under phgen.instrument and write the run report next to the output"""
+    from phgen.instrument import instrumented, write_report
+
+    if (getattr(args, "processes", None) or 1) > 1:
+        # Stages are counted per process, so a report would only hold the coordinator's (mostly empty) share
+        raise ValueError("--report, --profile and --trace-memory need --processes 1")
+    with instrumented(args.output + ".prof" if args.profile else None, args.trace_memory) as stats:
+        rows = args.handler(args)
+    options = {key: value for key, value in vars(args).items() if key not in ("handler", "chunks")}
+    path = write_report(stats, args.output, mode=args.mode, rows=rows, options=options)
+    print(f"Run report: {path}")
+    return rows
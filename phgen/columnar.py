@@ -0,0 +1,266 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Sequence, Union
+
+from phgen.batch import NSN_DIGITS, SUFFIX_SPACE, format_numbers
+from phgen.prefixes import SIM_PREFIXES
+from phgen.store import DuplicatedNumbers, NumberStore
+from phgen.stream import DEFAULT_CHUNK_SIZE
+
+# Layout (little-endian, every column 8-byte aligned):
+#   magic | rows u64 | header length u64 | text rows u64 | JSON header
+#   values  u64 x rows    valid: prefix * 10^7 + suffix, other rows: index into the text table
+#   flags   u8  x rows    FLAG_* bits
+#   network u8  x rows    1-based index into the header's network list, 0 = none
+#   text offsets u64 x (text rows + 1), then the UTF-8 text of the non-valid rows
+MAGIC = b"PHGNCOL1"
+# Extension used for columnar output
+COLUMNAR_SUFFIX = ".phc"
+_PREAMBLE = struct.Struct("<8sQQQ")
+
+FLAG_VALID = 1
+FLAG_DUPLICATE = 2
+FLAG_TEXT = 4
+
+
+def _padding(offset: int) -> int:
+    return -offset % 8
+
+
+def _byte_counts(data: memoryview, values: Sequence[int]) -> Dict[int, int]:
+    """Occurrences of each byte value in `data` (one NumPy pass when available)"""
+    try:
+        import numpy as np
+    except ImportError:
+        data = data.tobytes()
+        return {value: data.count(value) for value in values}
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    return {value: int(counts[value]) for value in values}
+
+
+class ColumnarWriter:
+    """Streams rows into the binary columnar format, one column at a time on disk
+
+    Values go straight to the output file; the small columns are spilled to
+    temporary files and appended on close, so memory use does not grow with rows.
+    """
+
+    def __init__(self, filename: str, sim_prefixes: Dict[str, List[str]] = SIM_PREFIXES, country_code: str = "63"):
+        if sys.byteorder != "little":
+            raise RuntimeError("The columnar format is little-endian only")
+        self.filename = filename
+        self.rows = 0
+        self._texts = 0
+        self._text_bytes = 0
+        self._country_code = country_code
+        self._networks = list(sim_prefixes)
+        self._network_ids = bytearray(1000)
+        for network_id, network in enumerate(self._networks, 1):
+            for prefix in sim_prefixes[network]:
+                if not self._network_ids[int(prefix)]:
+                    self._network_ids[int(prefix)] = network_id
+        header = json.dumps({
+            "country_code": country_code,
+            "networks": {network: sim_prefixes[network] for network in self._networks},
+        }).encode()
+        self._header = header + b" " * _padding(_PREAMBLE.size + len(header))
+
+        dirname = os.path.dirname(filename)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._file = open(filename, 'wb')
+        self._file.write(_PREAMBLE.pack(MAGIC, 0, len(self._header), 0))
+        self._file.write(self._header)
+        self._flags = tempfile.TemporaryFile()
+        self._network = tempfile.TemporaryFile()
+        self._offsets = tempfile.TemporaryFile()
+        self._text = tempfile.TemporaryFile()
+
+    def write_values(self, values: Sequence[int], duplicate: bool = False):
+        """Append valid numbers given as packed integers (prefix * 10^7 + suffix)"""
+        packed = values if isinstance(values, array) and values.typecode == 'Q' else array('Q', values)
+        network_ids = self._network_ids
+        self._file.write(packed)
+        self._flags.write(bytes([FLAG_VALID | (FLAG_DUPLICATE if duplicate else 0)]) * len(packed))
+        self._network.write(bytes(network_ids[value // SUFFIX_SPACE % 1000] for value in packed))
+        self.rows += len(packed)
+
+    def write_numbers(self, numbers: Sequence[str], duplicate: bool = False):
+        """Append text numbers; valid ones (country code + known prefix + 7 digits) are packed"""
+        head = self._country_code
+        length = len(head) + NSN_DIGITS
+        network_ids = self._network_ids
+        duplicate_flag = FLAG_DUPLICATE if duplicate else 0
+        values = array('Q')
+        flags = bytearray()
+        networks = bytearray()
+        for number in numbers:
+            if len(number) == length and number.startswith(head) and number.isdigit():
+                value = int(number[len(head):])
+                network_id = network_ids[value // SUFFIX_SPACE]
+                if network_id:
+                    values.append(value)
+                    flags.append(FLAG_VALID | duplicate_flag)
+                    networks.append(network_id)
+                    continue
+            encoded = number.encode()
+            self._offsets.write(struct.pack("<Q", self._text_bytes))
+            self._text.write(encoded)
+            self._text_bytes += len(encoded)
+            values.append(self._texts)
+            flags.append(FLAG_TEXT | duplicate_flag)
+            networks.append(0)
+            self._texts += 1
+        self._file.write(values)
+        self._flags.write(flags)
+        self._network.write(networks)
+        self.rows += len(values)
+
+    def close(self):
+        """Append the spilled columns and fill in the row counts"""
+        if self._file.closed:
+            return
+        self._offsets.write(struct.pack("<Q", self._text_bytes))
+        for spill, pad in ((self._flags, 0), (self._network, _padding(2 * self.rows)), (self._offsets, 0), (self._text, 0)):
+            spill.seek(0)
+            shutil.copyfileobj(spill, self._file, 16 * 1024 * 1024)
+            spill.close()
+            self._file.write(b"\0" * pad)
+        self._file.seek(0)
+        self._file.write(_PREAMBLE.pack(MAGIC, self.rows, len(self._header), self._texts))
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_columnar(
+    filename: str,
+    numbers: Union[Sequence[str], NumberStore, DuplicatedNumbers],
+    sim_prefixes: Dict[str, List[str]] = SIM_PREFIXES,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Write a list of numbers, a NumberStore or a DuplicatedNumbers view, return the row count
+
+    The repeated head of a DuplicatedNumbers view is flagged as duplicate rows.
+    """
+    store = numbers.store if isinstance(numbers, DuplicatedNumbers) else numbers
+    country_code = store.country_code if isinstance(store, NumberStore) else "63"
+    with ColumnarWriter(filename, sim_prefixes, country_code) as writer:
+        if isinstance(store, NumberStore):
+            values = store.values
+            for start in range(0, len(values), chunk_size):
+                writer.write_values(values[start:start + chunk_size])
+            if isinstance(numbers, DuplicatedNumbers):
+                for start in range(0, numbers.duplicates, chunk_size):
+                    writer.write_values(values[start:min(start + chunk_size, numbers.duplicates)], duplicate=True)
+        else:
+            for start in range(0, len(numbers), chunk_size):
+                writer.write_numbers(numbers[start:start + chunk_size])
+        return writer.rows
+
+
+class ColumnarReader:
+    """Memory-maps a columnar file and exposes its columns as zero-copy memoryviews
+
+    Opening costs the same for 100 rows or 100M rows; nothing is parsed until a
+    column is touched. Views handed out keep the mapping alive, so release them
+    before calling close().
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise RuntimeError("The columnar format is little-endian only")
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, header_length, self.text_rows = _PREAMBLE.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a columnar number file")
+        header = json.loads(bytes(self._mm[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+        self.country_code: str = header["country_code"]
+        self.sim_prefixes: Dict[str, List[str]] = header["networks"]
+        self.networks = list(self.sim_prefixes)
+
+        view = memoryview(self._mm)
+        offset = _PREAMBLE.size + header_length
+        self.values = view[offset:offset + 8 * self.rows].cast('Q')
+        offset += 8 * self.rows
+        self.flags = view[offset:offset + self.rows]
+        offset += self.rows
+        self.network_ids = view[offset:offset + self.rows]
+        offset += self.rows + _padding(2 * self.rows)
+        self._text_offsets = view[offset:offset + 8 * (self.text_rows + 1)].cast('Q')
+        self._text_start = offset + 8 * (self.text_rows + 1)
+        self._views = [view, self.values, self.flags, self.network_ids, self._text_offsets]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def numpy(self, column: str):
+        """A column ("values", "flags" or "network_ids") as a NumPy array sharing the mapping"""
+        import numpy as np
+        return np.frombuffer(getattr(self, column), dtype=np.uint64 if column == "values" else np.uint8)
+
+    def text(self, row: int) -> str:
+        """Text of one row, as it would appear in the CSV output"""
+        value = self.values[row]
+        if self.flags[row] & FLAG_VALID:
+            return format_numbers([value], self.country_code)[0]
+        start = self._text_start + self._text_offsets[value]
+        return self._mm[start:self._text_start + self._text_offsets[value + 1]].decode()
+
+    def iter_text_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+        """Rendered rows chunk by chunk, for write_chunks"""
+        for start in range(0, self.rows, chunk_size):
+            stop = min(start + chunk_size, self.rows)
+            if self.flags[start:stop].tobytes().count(FLAG_VALID) == stop - start:
+                yield format_numbers(self.values[start:stop], self.country_code)
+            else:
+                yield [self.text(row) for row in range(start, stop)]
+
+    def flag_counts(self) -> Dict[str, int]:
+        """Rows per kind: valid, duplicate and text (non-valid) rows"""
+        per_value = _byte_counts(self.flags, range(8))
+        return {
+            name: sum(count for value, count in per_value.items() if value & bit)
+            for name, bit in (("valid", FLAG_VALID), ("duplicate", FLAG_DUPLICATE), ("text", FLAG_TEXT))
+        }
+
+    def network_counts(self, unique: bool = False) -> Dict[str, int]:
+        """Rows per network, optionally skipping rows flagged as duplicates"""
+        network_ids = range(1, len(self.networks) + 1)
+        per_id = _byte_counts(self.network_ids, network_ids)
+        if unique:
+            # Zero out the network id of non-duplicate rows with one big-integer AND, then count what is left
+            mask = self.flags.tobytes().translate(bytes(0xFF if value & FLAG_DUPLICATE else 0 for value in range(256)))
+            duplicated = int.from_bytes(self.network_ids, 'little') & int.from_bytes(mask, 'little')
+            per_duplicate = _byte_counts(memoryview(duplicated.to_bytes(self.rows, 'little')), network_ids)
+            per_id = {network_id: count - per_duplicate[network_id] for network_id, count in per_id.items()}
+        return {network: per_id[network_id] for network_id, network in zip(network_ids, self.networks)}
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._mm.close()
+
+    def __enter__(self) -> "ColumnarReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_columnar_text(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+    """Rows of a columnar file as text chunks (e.g. to convert it back to CSV)"""
+    with ColumnarReader(path) as reader:
+        yield from reader.iter_text_chunks(chunk_size)
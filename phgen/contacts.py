@@ -0,0 +1,388 @@
+import json
+import os
+import random
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from phgen.batch import generate_ph_numbers_for
+from phgen.checkpoint import rng_state, set_rng_state
+from phgen.prefixes import SIM_PREFIXES
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes, collect, head_chunks
+
+# Default number of distinct values drawn from Faker per field
+DEFAULT_POOL_SIZE = 5000
+# Faker locale of the pools (and of get_faker)
+DEFAULT_LOCALE = "en_US"
+
+DEPARTMENTS = ["Sales", "Marketing", "IT", "HR", "Finance", "Operations",
+               "R&D", "Logistics", "Admin", "Support", "Legal", "Strategy",
+               "Management", "Production", "Creative", "Research", "Development"]
+
+
+
+def pool_cache_path(size: int = DEFAULT_POOL_SIZE, locale: str = DEFAULT_LOCALE) -> str:
+    """Per-user cache file of the fast-mode pools ($XDG_CACHE_HOME/phgen, else ~/.cache/phgen)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "phgen", f"contact_pools_{locale}_{size}.json")
+
+
+# Fast mode: Faker values are pre-generated once and cached here
+POOL_CACHE_PATH = pool_cache_path()
+_fake = None
+_pools: Dict[tuple, "ContactPools"] = {}
+
+
+class ContactPools(NamedTuple):
+    """Pre-generated Faker values that contact rows are assembled from"""
+    first_names: List[str]
+    last_names: List[str]
+    companies: List[str]
+    jobs: List[str]
+    cities: List[str]
+    streets: List[str]
+
+
+def build_pools(fake, size: int = DEFAULT_POOL_SIZE) -> ContactPools:
+    """Call Faker `size` times per field, with the same comma clean-up as generate_contact_row"""
+    return ContactPools(
+        first_names=[fake.first_name() for _ in range(size)],
+        last_names=[fake.last_name() for _ in range(size)],
+        companies=[fake.company().replace(",", "") for _ in range(size)],
+        jobs=[fake.job().replace(",", "") for _ in range(size)],
+        cities=[fake.city() for _ in range(size)],
+        streets=[fake.street_name() for _ in range(size)],
+    )
+
+
+def load_or_build_pools(
+    size: int = DEFAULT_POOL_SIZE,
+    cache_path: Optional[str] = None,
+    locale: str = DEFAULT_LOCALE,
+) -> ContactPools:
+    """Load pools from a JSON cache file, building and saving them on the first run
+
+    Pools are built by a Faker seeded from `locale` and `size`, so a rebuilt cache
+    holds the same values and seeded fast-mode runs repeat on every machine. The
+    cache is only used when its size and locale match, and is replaced atomically,
+    so concurrent first runs never read a half-written file.
+    """
+    key = {"size": size, "locale": locale}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding='utf-8') as f:
+            data = json.load(f)
+        if all(data.get(name) == value for name, value in key.items()):
+            return ContactPools(**data["pools"])
+
+    pools = build_pools(seeded_faker(f"pools:{locale}:{size}", locale), size)
+    if cache_path:
+        dirname = os.path.dirname(cache_path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({**key, "pools": pools._asdict()}, f, ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return pools
+
+
+def pool_contact_rows(
+    pools: ContactPools,
+    row_prefixes: Sequence[str],
+    departments: Sequence[str],
+    rng: random.Random,
+    mobiles: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Assemble one Book1.csv row per prefix by sampling the pools (no Faker calls)
+
+    Pre-drawn `mobiles` (0-form numbers, one per row) replace the numbers drawn for `row_prefixes`.
+    """
+    count = len(row_prefixes) if mobiles is None else len(mobiles)
+    choices = rng.choices
+    first_names = choices(pools.first_names, k=count)
+    last_names = choices(pools.last_names, k=count)
+    companies = choices(pools.companies, k=count)
+    jobs = choices(pools.jobs, k=count)
+    cities = choices(pools.cities, k=count)
+    streets = choices(pools.streets, k=count)
+    initials = choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=count)
+    depts = choices(departments, k=count)
+    house_numbers = [rng.randint(1, 999) for _ in range(count)]
+    if mobiles is None:
+        mobiles = generate_ph_numbers_for(row_prefixes, rng, country_code="0")
+
+    return [
+        f"{first}|{initial}|{last}|{mobile}|{company}|{job}|{dept}|"
+        f"{first.lower()}.{last.lower()}@{company.replace(' ', '').lower()}.com|"
+        f"{house} {street}, {city}"
+        for first, initial, last, mobile, company, job, dept, house, street, city in zip(
+            first_names, initials, last_names, mobiles, companies, jobs, depts, house_numbers, streets, cities
+        )
+    ]
+
+
+def iter_pool_contacts(
+    pools: ContactPools,
+    prefixes: Sequence[str],
+    count: int,
+    departments: Sequence[str],
+    rng: random.Random,
+    chunk_size: int,
+) -> Iterator[List[str]]:
+    """Contact rows for `count` numbers with prefixes drawn like random.choice(prefixes)"""
+    for size in chunk_sizes(count, chunk_size):
+        yield pool_contact_rows(pools, rng.choices(prefixes, k=size), departments, rng)
+
+
+def get_faker():
+    """Shared Faker instance, created on first use (importing Faker alone takes longer than most runs)"""
+    global _fake
+    if _fake is None:
+        from faker import Faker
+        _fake = Faker(DEFAULT_LOCALE)
+    return _fake
+
+
+def seeded_faker(seed, locale: str = DEFAULT_LOCALE):
+    """A Faker of its own, seeded with `seed`
+
+    get_faker()'s instance draws from the global random module, so streams that
+    run side by side (service requests, pipeline blocks) each take their own.
+    """
+    get_faker()  # Imports Faker, or raises ImportError
+    from faker import Faker
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    return fake
+
+
+def get_contact_pools(size: int = DEFAULT_POOL_SIZE, locale: str = DEFAULT_LOCALE) -> ContactPools:
+    """Faker value pools for fast mode, loaded from the per-user disk cache when available"""
+    pools = _pools.get((size, locale))
+    if pools is None:
+        pools = _pools[size, locale] = load_or_build_pools(size, pool_cache_path(size, locale), locale)
+    return pools
+
+
+def generate_local_number(prefix: str, rng=random) -> str:
+    """Generate a PH number (0 + prefix + 7 random digits)"""
+    return f"0{prefix}{''.join([str(rng.randint(0, 9)) for _ in range(7)])}"
+
+
+def generate_contact_row(prefix: str, rng=random, mobile: Optional[str] = None, fake=None) -> str:
+    """Generate a contact row matching Book1.csv format (with `mobile` instead of a random number if given)
+
+    Faker fields come from `fake`, by default the shared get_faker() instance.
+    """
+    if fake is None:
+        fake = get_faker()
+    first_name = fake.first_name()
+    middle_name = fake.random_letter().upper()  # Single initial like in your example
+    last_name = fake.last_name()
+    mobile_number = generate_local_number(prefix, rng) if mobile is None else mobile
+    company = fake.company().replace(",", "")  # Remove commas to match your format
+    position = fake.job().replace(",", "")
+    department = rng.choice(DEPARTMENTS)
+    email = f"{first_name.lower()}.{last_name.lower()}@{company.replace(' ', '').lower()}.com"
+    city = fake.city()
+    address = f"{rng.randint(1, 999)} {fake.street_name()}, {city}"
+
+    # Format exactly like Book1.csv
+    return f"{first_name}|{middle_name}|{last_name}|{mobile_number}|{company}|{position}|{department}|{email}|{address}"
+
+
+def _contact_block(
+    prefixes: Sequence[str],
+    size: int,
+    rng: random.Random,
+    pools: Optional[ContactPools],
+    fake=None,
+) -> List[str]:
+    """`size` contact rows for one network (one chunk of _iter_unique_contacts)"""
+    if pools is not None:
+        return pool_contact_rows(pools, rng.choices(prefixes, k=size), DEPARTMENTS, rng)
+    return [generate_contact_row(rng.choice(prefixes), rng, fake=fake) for _ in range(size)]
+
+
+def _iter_unique_contacts(
+    network_counts: Dict[str, int],
+    rng: random.Random,
+    chunk_size: int,
+    pools: Optional[ContactPools] = None,
+    fake=None,
+) -> Iterator[List[str]]:
+    """Unique part of generate_contacts_with_distribution, determined by `rng` and the state of `fake`"""
+    for network, count in network_counts.items():
+        for size in chunk_sizes(count, chunk_size):
+            yield _contact_block(SIM_PREFIXES[network], size, rng, pools, fake)
+
+
+class _ContactCursor:
+    """Unique contact rows walked in fixed blocks per network, with a saveable position
+
+    Blocks start at fixed offsets of each network and are rebuilt from the RNG
+    and Faker states saved at their start, so a cursor restored mid-block, or a
+    second cursor replaying the head, produces exactly the same rows.
+    """
+
+    def __init__(
+        self,
+        network_counts: Dict[str, int],
+        seed: int,
+        block_rows: int,
+        pools: Optional[ContactPools],
+    ):
+        self._networks = list(network_counts.items())
+        self._block_rows = block_rows
+        self._pools = pools
+        self._network = 0
+        self._block_start = 0
+        self._offset = 0
+        self._rng_state = rng_state(random.Random(seed))
+        # Faker is seeded from the job seed too, so a fresh run repeats the same contacts
+        self._fake = None if pools is not None else seeded_faker(f"{seed}:faker")
+        self._faker_state = None if pools is not None else rng_state(self._fake.random)
+        self._rows: Optional[List[str]] = None
+        self._after: Optional[tuple] = None
+
+    def _load_block(self, network: str, size: int):
+        rng = random.Random()
+        set_rng_state(rng, self._rng_state)
+        if self._pools is not None:
+            self._rows = _contact_block(SIM_PREFIXES[network], size, rng, self._pools)
+            self._after = (rng_state(rng), None)
+            return
+        set_rng_state(self._fake.random, self._faker_state)
+        self._rows = _contact_block(SIM_PREFIXES[network], size, rng, None, self._fake)
+        self._after = (rng_state(rng), rng_state(self._fake.random))
+
+    def take(self, count: int) -> List[str]:
+        rows: List[str] = []
+        while len(rows) < count and self._network < len(self._networks):
+            network, quota = self._networks[self._network]
+            if self._block_start >= quota:
+                self._network += 1
+                self._block_start = 0
+                continue
+            if self._rows is None:
+                self._load_block(network, min(self._block_rows, quota - self._block_start))
+            piece = self._rows[self._offset:self._offset + count - len(rows)]
+            rows.extend(piece)
+            self._offset += len(piece)
+            if self._offset == len(self._rows):
+                self._block_start += len(self._rows)
+                self._offset = 0
+                self._rng_state, self._faker_state = self._after
+                self._rows = None
+        return rows
+
+    def getstate(self) -> dict:
+        return {"network": self._network, "block_start": self._block_start, "offset": self._offset,
+                "rng": self._rng_state, "faker": self._faker_state}
+
+    def setstate(self, state: dict):
+        self._network, self._block_start, self._offset = state["network"], state["block_start"], state["offset"]
+        self._rng_state, self._faker_state = state["rng"], state["faker"]
+        self._rows = None  # Rebuilt from the block's start states on the next take
+
+
+class ResumableContacts:
+    """Rows of iter_contacts_with_distribution for phgen.checkpoint.run_resumable
+
+    The unique rows come in blocks of `block_rows` per network and the
+    duplicated head is replayed block by block, so the same `seed` gives the
+    same file however often the run is interrupted. Fast mode needs the same
+    pool cache on every restart.
+    """
+
+    def __init__(
+        self,
+        network_counts: Dict[str, int],
+        duplicates: int,
+        seed: int,
+        fast: bool = False,
+        block_rows: int = DEFAULT_CHUNK_SIZE,
+    ):
+        for network in network_counts:
+            if network not in SIM_PREFIXES:
+                raise ValueError(f"Unknown network: {network}")
+        pools = get_contact_pools() if fast else None
+        self.unique_total = sum(network_counts.values())
+        self.total = self.unique_total + min(max(duplicates, 0), self.unique_total)
+        self._unique = _ContactCursor(network_counts, seed, block_rows, pools)
+        self._replay = _ContactCursor(network_counts, seed, block_rows, pools)
+        self._emitted = 0
+
+    def take(self, count: int) -> List[str]:
+        count = min(count, self.total - self._emitted)
+        first = min(count, max(self.unique_total - self._emitted, 0))
+        rows = self._unique.take(first) + self._replay.take(count - first)
+        self._emitted += count
+        return rows
+
+    def getstate(self) -> dict:
+        return {"emitted": self._emitted, "unique": self._unique.getstate(), "replay": self._replay.getstate()}
+
+    def setstate(self, state: dict):
+        self._emitted = state["emitted"]
+        self._unique.setstate(state["unique"])
+        self._replay.setstate(state["replay"])
+
+
+def iter_contacts_with_distribution(
+    network_counts: Dict[str, int],
+    duplicates: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fast: bool = False,
+    seed: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_contacts_with_distribution, yields chunks of rows
+
+    With `fast=True` rows are assembled from pre-generated Faker pools instead of
+    calling Faker for every field of every row. The same `seed` gives the same
+    rows (and, with the same chunk size, the rows of ResumableContacts).
+    """
+    for network in network_counts:
+        if network not in SIM_PREFIXES:
+            raise ValueError(f"Unknown network: {network}")
+
+    # Generate unique contacts per network
+    pools = get_contact_pools() if fast else None
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    def unique_contacts():
+        # Faker is seeded from the job seed too, like _ContactCursor, and never shared with other streams
+        fake = None if pools is not None else seeded_faker(f"{seed}:faker")
+        return _iter_unique_contacts(network_counts, random.Random(seed), chunk_size, pools, fake)
+
+    yield from unique_contacts()
+
+    # Add duplicates (from the start to maintain priority) by replaying both random streams
+    yield from head_chunks(unique_contacts(), duplicates)
+
+
+def generate_contacts_with_distribution(
+    network_counts: Dict[str, int],
+    duplicates: int,
+    fast: bool = False,
+    seed: Optional[int] = None,
+) -> List[str]:
+    """Generate contacts with exact distribution per network + duplicates"""
+    return collect(iter_contacts_with_distribution(network_counts, duplicates, fast=fast, seed=seed))
+
+
+def benchmark_contact_modes(rows: int = 2000) -> Dict[str, float]:
+    """Rows per second of exact-Faker mode vs pool mode (pool build time excluded)"""
+    network_counts = {"Globe/TM": rows}
+    get_contact_pools()
+    results = {}
+    for mode, fast in (("faker", False), ("pool", True)):
+        start = time.perf_counter()
+        generate_contacts_with_distribution(network_counts, 0, fast=fast)
+        results[mode] = rows / (time.perf_counter() - start)
+    results["speedup"] = results["pool"] / results["faker"]
+    return results
@@ -0,0 +1,230 @@
+import hashlib
+import random
+from typing import Iterator, List, Optional, Sequence
+
+from phgen.batch import SUFFIX_SPACE, format_numbers, prefix_bases
+from phgen.instrument import current_stats
+from phgen.invalid import INVALID_PATTERNS, InvalidNumberEngine
+from phgen.mixed import CLASS_NAMES, DUPLICATE, INVALID, VALID
+from phgen.prefixes import all_network_prefixes
+from phgen.schedule import DEFAULT_ZIPF_EXPONENT, ZipfSampler
+from phgen.stream import DEFAULT_CHUNK_SIZE
+from phgen.unique import FeistelPermutation, UniquePermutation, mix64
+
+# uniform: duplicates repeat uniformly chosen valid rows; zipf: skewed towards a few hot rows;
+# exact: every valid row is repeated an equal number of times (+-1); head: the first valid rows again
+COUNTER_STRATEGIES = ("uniform", "zipf", "exact", "head")
+# shuffle: classes uniformly interleaved; blocks: valid, then invalid, then duplicates
+COUNTER_PLACEMENTS = ("shuffle", "blocks")
+
+
+def stream_key(seed: int, stream: str) -> int:
+    """64-bit key of one named stream of the job `seed` (valid rows, duplicate references, ...)"""
+    digest = hashlib.blake2b(f"{seed}:{stream}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class _CounterStream:
+    """random()-compatible uniforms for one row, for samplers that may take several draws"""
+
+    def __init__(self, key: int, row: int):
+        self._key = mix64(key, row)
+        self._draws = 0
+
+    def random(self) -> float:
+        self._draws += 1
+        return (mix64(self._key, self._draws) >> 11) * 2.0 ** -53
+
+
+class CounterNumbers:
+    """Valid numbers where row i is a pure function of (seed, i)
+
+    Drawn like generate_ph_numbers (uniform prefix from `prefixes`, uniform
+    suffix, repeats possible), but from a keyed hash of the row index instead
+    of a sequential RNG, so any row range costs only its own rows.
+    """
+
+    def __init__(self, prefixes: Sequence[str], seed: int):
+        if not prefixes:
+            raise ValueError("At least one prefix is required")
+        self._bases = prefix_bases(prefixes)
+        self._space = len(self._bases) * SUFFIX_SPACE
+        self._key = stream_key(seed, "valid")
+
+    def values_at(self, indices: Sequence[int]) -> List[int]:
+        """Integer numbers (prefix * 10^7 + suffix) for arbitrary row indices"""
+        bases, space, key = self._bases, self._space, self._key
+        out = []
+        append = out.append
+        for index in indices:
+            x = mix64(key, index)
+            append(bases[x % space // SUFFIX_SPACE] + x % SUFFIX_SPACE)
+        return out
+
+    def values(self, start: int, stop: int) -> List[int]:
+        """Integer numbers for rows [start, stop)"""
+        return self.values_at(range(start, stop))
+
+    def numbers(self, start: int, stop: int, country_code: str = "63") -> List[str]:
+        """Text numbers for rows [start, stop)"""
+        return format_numbers(self.values(start, stop), country_code)
+
+
+class CounterDataset:
+    """A seeded file of valid, invalid and duplicate rows whose row N is computed on its own
+
+    Row r goes through a keyed permutation of range(total) to a slot; slots
+    0..valid-1 are valid rows, the next `invalid` slots are invalid rows and
+    the rest are duplicates of valid rows. Every source is random-access:
+    - valid rows come from CounterNumbers, or from UniquePermutation with `unique`,
+    - invalid rows from the unique invalid engine (exact per-pattern quotas),
+    - duplicate slot d repeats a valid row picked by `strategy` from d alone.
+    Class counts are exact over the whole file, and rows(start, stop) of any
+    range matches the same range of a full run, whatever order or process
+    computes it. Memory is O(1) in the number of rows.
+    """
+
+    def __init__(
+        self,
+        valid: int,
+        invalid: int = 0,
+        duplicates: int = 0,
+        seed: Optional[int] = None,
+        strategy: str = "uniform",
+        placement: str = "shuffle",
+        unique: bool = False,
+        zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    ):
+        if strategy not in COUNTER_STRATEGIES:
+            raise ValueError(f"Unknown duplicate strategy: {strategy} (expected one of {', '.join(COUNTER_STRATEGIES)})")
+        if placement not in COUNTER_PLACEMENTS:
+            raise ValueError(f"Unknown placement: {placement} (expected one of {', '.join(COUNTER_PLACEMENTS)})")
+        if min(valid, invalid, duplicates) < 0:
+            raise ValueError("Row counts must not be negative")
+        if duplicates and not valid:
+            raise ValueError("Duplicates need at least one valid number")
+        if strategy == "head" and duplicates > valid:
+            raise ValueError(f"head strategy can repeat at most {valid} numbers, got {duplicates}")
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.targets = {"valid": valid, "invalid": invalid, "duplicate": duplicates}
+        self.strategy = strategy
+        self.placement = placement
+        self.unique = unique
+        self.zipf_exponent = zipf_exponent
+        self._args = (valid, invalid, duplicates, seed, strategy, placement, unique, zipf_exponent)
+
+        prefixes = all_network_prefixes()
+        self._valid = UniquePermutation(prefixes, seed) if unique else CounterNumbers(prefixes, seed)
+        if unique and valid > self._valid.capacity:
+            raise ValueError(f"Requested {valid} unique numbers but the prefixes only hold {self._valid.capacity}")
+        self._invalid = InvalidNumberEngine(INVALID_PATTERNS, invalid, seed=seed)
+        total = self.total
+        # Without other classes the valid rows are already in file order
+        shuffled = placement == "shuffle" and valid < total
+        self._layout = FeistelPermutation(total, seed, tweak="rows") if shuffled else None
+        self._duplicate_key = stream_key(seed, "duplicates")
+        self._zipf = ZipfSampler(valid, zipf_exponent) if strategy == "zipf" and duplicates else None
+        # exact: duplicate slots are dealt out in a keyed order, each number owning base or base + 1 of them
+        self._exact_order = (FeistelPermutation(duplicates, seed, tweak="duplicates")
+                             if strategy == "exact" and duplicates else None)
+
+    def __reduce__(self):
+        # Rebuilt from its arguments in worker processes (the invalid patterns hold lambdas)
+        return (CounterDataset, self._args)
+
+    @property
+    def total(self) -> int:
+        return sum(self.targets.values())
+
+    def _references(self, slots: Sequence[int]) -> List[int]:
+        """Valid row repeated by each duplicate slot"""
+        valid = self.targets["valid"]
+        if self.strategy == "head":
+            return list(slots)
+        if self.strategy == "uniform":
+            key = self._duplicate_key
+            return [mix64(key, slot) % valid for slot in slots]
+        if self.strategy == "zipf":
+            sample, key = self._zipf.sample, self._duplicate_key
+            return [sample(_CounterStream(key, slot)) - 1 for slot in slots]
+        base, extra = divmod(self.targets["duplicate"], valid)
+        out = []
+        for slot in map(self._exact_order, slots):
+            # The first `extra` numbers own base + 1 slots, the rest own base
+            if slot < extra * (base + 1):
+                out.append(slot // (base + 1))
+            else:
+                out.append(extra + (slot - extra * (base + 1)) // base)
+        return out
+
+    def classes(self, start: int, stop: int) -> List[int]:
+        """Class code (VALID, INVALID, DUPLICATE) of rows [start, stop)"""
+        valid_end = self.targets["valid"]
+        invalid_end = valid_end + self.targets["invalid"]
+        return [VALID if slot < valid_end else INVALID if slot < invalid_end else DUPLICATE
+                for slot in self._slots(start, stop)]
+
+    def _slots(self, start: int, stop: int) -> Sequence[int]:
+        if not 0 <= start <= stop <= self.total:
+            raise IndexError(f"range {start}..{stop} outside dataset of {self.total} rows")
+        if self._layout is None or start == stop:
+            return range(start, stop)
+        return self._layout.batch(start, stop)
+
+    def rows(self, start: int, stop: int, country_code: str = "63") -> List[str]:
+        """Text of rows [start, stop)"""
+        valid_end = self.targets["valid"]
+        if self._layout is None and stop <= valid_end:
+            # Valid rows only, in order: the batch path of the valid source
+            if not 0 <= start <= stop:
+                raise IndexError(f"range {start}..{stop} outside dataset of {self.total} rows")
+            rows = self._valid.numbers(start, stop, country_code)
+            stats = current_stats()
+            if stats is not None:
+                stats.count("class", "valid", len(rows))
+            return rows
+
+        invalid_end = valid_end + self.targets["invalid"]
+        codes, valid_rows, invalid_rows, duplicate_slots = [], [], [], []
+        for slot in self._slots(start, stop):
+            if slot < valid_end:
+                codes.append(VALID)
+                valid_rows.append(slot)
+            elif slot < invalid_end:
+                codes.append(INVALID)
+                invalid_rows.append(slot - valid_end)
+            else:
+                codes.append(DUPLICATE)
+                duplicate_slots.append(slot - invalid_end)
+        sources = (
+            iter(format_numbers(self._valid.values_at(valid_rows), country_code)),
+            iter(self._invalid.numbers_at(invalid_rows)),
+            iter(format_numbers(self._valid.values_at(self._references(duplicate_slots)), country_code)),
+        )
+        stats = current_stats()
+        if stats is not None:
+            stats.count_many("class", dict(zip(CLASS_NAMES, (len(valid_rows), len(invalid_rows),
+                                                             len(duplicate_slots)))))
+        return [next(sources[code]) for code in codes]
+
+    def row(self, index: int, country_code: str = "63") -> str:
+        """Text of row `index`"""
+        return self.rows(index, index + 1, country_code)[0]
+
+    def iter_rows(
+        self, start: int = 0, stop: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[List[str]]:
+        """Rows [start, stop) chunk by chunk"""
+        stop = self.total if stop is None else stop
+        for chunk_start in range(start, stop, chunk_size):
+            yield self.rows(chunk_start, min(chunk_start + chunk_size, stop))
+
+
+def iter_slice_rows(
+    start: int, stop: int, rng: random.Random, dataset: CounterDataset, offset: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[str]]:
+    """Rows [start, stop) of a sharded file holding `dataset` rows from `offset` on (the shard RNG is unused)"""
+    return dataset.iter_rows(offset + start, offset + stop, chunk_size)
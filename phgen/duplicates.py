@@ -0,0 +1,400 @@
+import random
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from phgen.batch import SUFFIX_SPACE, format_numbers
+from phgen.instrument import timed
+from phgen.prefixes import SIM_PREFIXES
+from phgen.registry import NumberRegistry
+from phgen.schedule import DEFAULT_ZIPF_EXPONENT, DuplicateScheduler
+from phgen.store import DuplicatedNumbers, NumberStore
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes, collect, head_chunks
+from phgen.unique import UniqueNumberSampler, unique_prefixes
+from phgen.weights import NetworkWeights
+
+
+Multiplicity = Union[int, Sequence[int], None]
+
+
+def _schedule_seed(seed: int) -> int:
+    """Seed of the duplicate scheduler, derived from the job seed like the other named streams"""
+    return random.Random(f"{seed}:duplicates").getrandbits(64)
+
+
+def iter_scheduled_numbers(
+    store: NumberStore,
+    scheduler: DuplicateScheduler,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[str]]:
+    """Render the rows of `scheduler` from the unique numbers in `store` (duplicates are never copied)"""
+    values = store.values
+    for indices in timed(scheduler.iter_indices(chunk_size), "duplicate"):
+        yield format_numbers([values[index] for index in indices], store.country_code)
+
+
+def _iter_scheduled(
+    unique_values: Iterable[List[int]],
+    scheduler: DuplicateScheduler,
+    chunk_size: int,
+) -> Iterator[List[str]]:
+    """Pack the unique numbers (8 bytes each), then stream the scheduled rows"""
+    store = NumberStore()
+    for values in unique_values:
+        store.extend(values)
+    yield from iter_scheduled_numbers(store, scheduler, chunk_size)
+
+
+# Priority flavour (duplicated_number.py): one number per prefix, then fill from the top network
+
+def _iter_priority_values(
+    unique_numbers: int,
+    seed: int,
+    chunk_size: int,
+    weights: Optional[NetworkWeights] = None,
+) -> Iterator[List[int]]:
+    """Unique part of generate_priority_numbers as packed integers, fully determined by `seed`
+
+    With `weights`, the rows after the one-per-prefix pass are split by exact
+    weighted quotas instead of all going to the highest priority network.
+    """
+    sampler = UniqueNumberSampler(seed)
+    network_order = list(SIM_PREFIXES)  # Strict priority order
+
+    # First, ensure we have at least one number from each prefix in each network
+    prefix_samples = []
+    for network in network_order:
+        for prefix in SIM_PREFIXES[network]:
+            prefix_samples.append(prefix)
+    prefix_samples = prefix_samples[:max(unique_numbers, 0)]
+    for start in range(0, len(prefix_samples), chunk_size):
+        yield sampler.draw_for(prefix_samples[start:start + chunk_size])
+
+    if weights is not None:
+        order = random.Random(seed)  # Rows of a chunk are shuffled, the same way on every replay
+        for counts in weights.iter_chunk_counts(unique_numbers - len(prefix_samples), chunk_size):
+            yield sampler.draw_for(weights.row_prefixes(counts, order))
+        return
+
+    # Then fill the rest from the highest priority network that has prefixes
+    for network in network_order:
+        prefixes = SIM_PREFIXES[network]
+        if prefixes:
+            for size in chunk_sizes(unique_numbers - len(prefix_samples), chunk_size):
+                yield sampler.draw(prefixes, size)
+            break
+
+
+def _iter_priority_numbers(
+    unique_numbers: int,
+    seed: int,
+    chunk_size: int,
+    weights: Optional[NetworkWeights] = None,
+) -> Iterator[List[str]]:
+    """Unique part of generate_priority_numbers, never repeating a number"""
+    for values in _iter_priority_values(unique_numbers, seed, chunk_size, weights):
+        yield format_numbers(values)
+
+
+def iter_priority_numbers(
+    unique_numbers: int,
+    duplicates: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    strategy: str = "head",
+    zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    multiplicity: Multiplicity = None,
+    weights: Optional[NetworkWeights] = None,
+    seed: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_priority_numbers, yields chunks of at most `chunk_size` numbers
+
+    `strategy` picks where duplicates go and which numbers they repeat (see phgen.schedule).
+    `weights` splits the rows beyond one per prefix by weight (e.g. market share).
+    The same `seed` gives the same rows.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    if strategy != "head":
+        scheduler = DuplicateScheduler(unique_numbers, duplicates, strategy, _schedule_seed(seed),
+                                       zipf_exponent, multiplicity)
+        unique_values = _iter_priority_values(unique_numbers, seed, chunk_size, weights)
+        yield from _iter_scheduled(unique_values, scheduler, chunk_size)
+        return
+    yield from _iter_priority_numbers(unique_numbers, seed, chunk_size, weights)
+
+    # Duplicate the first 'duplicates' numbers (highest priority) by replaying the same stream
+    yield from timed(head_chunks(_iter_priority_numbers(unique_numbers, seed, chunk_size, weights), duplicates),
+                     "duplicate")
+
+
+def generate_priority_numbers(
+    unique_numbers: int,
+    duplicates: int,
+    strategy: str = "head",
+    zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    multiplicity: Multiplicity = None,
+    weights: Optional[NetworkWeights] = None,
+    seed: Optional[int] = None,
+) -> List[str]:
+    """Generate numbers with ordered duplicates, maintaining network priority and accurate prefix representation"""
+    return collect(iter_priority_numbers(unique_numbers, duplicates, DEFAULT_CHUNK_SIZE,
+                                         strategy, zipf_exponent, multiplicity, weights, seed))
+
+
+def generate_priority_store(
+    unique_numbers: int,
+    duplicates: int,
+    weights: Optional[NetworkWeights] = None,
+    seed: Optional[int] = None,
+) -> DuplicatedNumbers:
+    """Same numbers as generate_priority_numbers, packed as integers with duplicates as a view"""
+    if seed is None:
+        seed = random.getrandbits(64)
+    store = NumberStore()
+    for values in _iter_priority_values(unique_numbers, seed, DEFAULT_CHUNK_SIZE, weights):
+        store.extend(values)
+    return store.with_duplicates(duplicates)
+
+
+# Distribution flavour (duplicated_number2.py): exact unique counts per network
+
+def _iter_distribution_values(
+    network_counts: Dict[str, int],
+    seed: int,
+    chunk_size: int,
+    registry: Optional[NumberRegistry] = None,
+) -> Iterator[List[int]]:
+    """Unique part of generate_numbers_with_distribution as packed integers, fully determined by `seed`
+
+    With a `registry`, numbers issued by earlier runs are skipped and the new ones recorded.
+    """
+    sampler = UniqueNumberSampler(seed)
+    for network, count in network_counts.items():
+        prefixes = unique_prefixes(SIM_PREFIXES[network])  # A prefix listed twice must not weigh double
+        for size in chunk_sizes(count, chunk_size):
+            values = sampler.draw(prefixes, size)
+            if registry is not None:
+                values = registry.claim(values)
+                while len(values) < size:
+                    values.extend(registry.claim(sampler.draw(prefixes, size - len(values))))
+            yield values
+
+
+def check_network_counts(network_counts: Dict[str, int]):
+    """Reject unknown networks and counts beyond a network's unique capacity"""
+    for network in network_counts:
+        if network not in SIM_PREFIXES:
+            raise ValueError(f"Unknown network: {network}")
+        capacity = len(set(SIM_PREFIXES[network])) * SUFFIX_SPACE
+        if network_counts[network] > capacity:
+            raise ValueError(f"{network} can hold at most {capacity} unique numbers, got {network_counts[network]}")
+
+
+def _iter_with_duplicates(
+    unique_values: Callable[[Optional[NumberRegistry]], Iterator[List[int]]],
+    unique_total: int,
+    duplicates: int,
+    chunk_size: int,
+    registry: Optional[NumberRegistry],
+    strategy: str,
+    zipf_exponent: float,
+    multiplicity: Multiplicity,
+    seed: int,
+) -> Iterator[List[str]]:
+    """The unique numbers of `unique_values(registry)` plus duplicates placed by `strategy`
+
+    `unique_values` must give the same numbers on every call without a registry.
+    """
+    if strategy != "head":
+        scheduler = DuplicateScheduler(unique_total, duplicates, strategy, _schedule_seed(seed),
+                                       zipf_exponent, multiplicity)
+        yield from _iter_scheduled(unique_values(registry), scheduler, chunk_size)
+        return
+    if registry is None:
+        yield from map(format_numbers, unique_values(None))
+
+        # Add duplicates (from the start to maintain priority) by replaying the same stream
+        yield from timed(head_chunks(map(format_numbers, unique_values(None)), duplicates), "duplicate")
+        return
+
+    # A replay would now find every number registered, so keep the head packed instead
+    head = NumberStore()
+    for values in unique_values(registry):
+        if len(head) < duplicates:
+            head.extend(values[:duplicates - len(head)])
+        yield format_numbers(values)
+    yield from timed(head.iter_text_chunks(chunk_size), "duplicate")
+
+
+def iter_numbers_with_distribution(
+    network_counts: Dict[str, int],
+    duplicates: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    registry: Optional[NumberRegistry] = None,
+    strategy: str = "head",
+    zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    multiplicity: Multiplicity = None,
+    seed: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_numbers_with_distribution, yields chunks of numbers
+
+    `strategy` picks where duplicates go and which numbers they repeat (see phgen.schedule).
+    The same `seed` gives the same rows (with a `registry`, the same registry contents too).
+    """
+    check_network_counts(network_counts)
+
+    # Generate unique numbers per network
+    if seed is None:
+        seed = random.getrandbits(64)
+    yield from _iter_with_duplicates(
+        lambda registry: _iter_distribution_values(network_counts, seed, chunk_size, registry),
+        sum(network_counts.values()), duplicates, chunk_size, registry, strategy, zipf_exponent, multiplicity, seed,
+    )
+
+
+def _iter_weighted_values(
+    weights: NetworkWeights,
+    unique_numbers: int,
+    seed: int,
+    chunk_size: int,
+    registry: Optional[NumberRegistry] = None,
+) -> Iterator[List[int]]:
+    """Unique numbers meeting weights.quotas(unique_numbers) exactly, fully determined by `seed`
+
+    Prefixes come from weights.row_prefixes, so a prefix listed under two networks
+    is only drawn for the network that owns it. With a `registry`, numbers issued
+    by earlier runs are redrawn under the same prefixes.
+    """
+    sampler = UniqueNumberSampler(seed)
+    order = random.Random(seed)  # Rows of a chunk are shuffled, the same way on every replay
+    for counts in weights.iter_chunk_counts(unique_numbers, chunk_size):
+        pending = sampler.draw_for(weights.row_prefixes(counts, order))
+        if registry is None:
+            yield pending
+            continue
+        values: List[int] = []
+        while pending:
+            fresh = registry.claim(pending)
+            values.extend(fresh)
+            if len(fresh) == len(pending):
+                break
+            kept = set(fresh)
+            pending = sampler.draw_for([f"{value // SUFFIX_SPACE:03d}" for value in pending if value not in kept])
+        yield values
+
+
+def iter_weighted_numbers(
+    weights: NetworkWeights,
+    unique_numbers: int,
+    duplicates: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    registry: Optional[NumberRegistry] = None,
+    strategy: str = "head",
+    zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    multiplicity: Multiplicity = None,
+    seed: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """iter_numbers_with_distribution with the unique numbers split by `weights` (e.g. market share)
+
+    Network and prefix counts meet weights.quotas(unique_numbers) exactly, like
+    the weighted mode, and every unique number is drawn for the network that
+    owns its prefix.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    yield from _iter_with_duplicates(
+        lambda registry: _iter_weighted_values(weights, unique_numbers, seed, chunk_size, registry),
+        unique_numbers, duplicates, chunk_size, registry, strategy, zipf_exponent, multiplicity, seed,
+    )
+
+
+class _DistributionCursor:
+    """The unique numbers of _iter_distribution_values (no registry), taken in any split, with a saveable position
+
+    The sampler draws prefixes one row at a time, so taking rows in different
+    slices yields the same numbers.
+    """
+
+    def __init__(self, network_counts: Dict[str, int], seed: int):
+        self._networks = list(network_counts.items())
+        self._sampler = UniqueNumberSampler(seed)
+        self._network = 0
+        self._done = 0
+
+    def take(self, count: int) -> List[int]:
+        values: List[int] = []
+        while len(values) < count and self._network < len(self._networks):
+            network, quota = self._networks[self._network]
+            size = min(count - len(values), quota - self._done)
+            values.extend(self._sampler.draw(unique_prefixes(SIM_PREFIXES[network]), size))
+            self._done += max(size, 0)
+            if self._done >= quota:
+                self._network += 1
+                self._done = 0
+        return values
+
+    def getstate(self) -> dict:
+        return {"network": self._network, "done": self._done, "sampler": self._sampler.getstate()}
+
+    def setstate(self, state: dict):
+        self._network, self._done = state["network"], state["done"]
+        self._sampler.setstate(state["sampler"])
+
+
+class ResumableDistribution:
+    """Rows of iter_numbers_with_distribution (head strategy) for phgen.checkpoint.run_resumable
+
+    The same `seed` gives the same rows however the run is split into segments
+    and restarts. The duplicated head is replayed by a second cursor, so no
+    rows are kept in memory and the checkpoint stays a few KiB.
+    """
+
+    def __init__(self, network_counts: Dict[str, int], duplicates: int, seed: int):
+        check_network_counts(network_counts)
+        self.unique_total = sum(network_counts.values())
+        self.total = self.unique_total + min(max(duplicates, 0), self.unique_total)
+        self._unique = _DistributionCursor(network_counts, seed)
+        self._replay = _DistributionCursor(network_counts, seed)
+        self._emitted = 0
+
+    def take(self, count: int) -> List[str]:
+        count = min(count, self.total - self._emitted)
+        first = min(count, max(self.unique_total - self._emitted, 0))
+        values = self._unique.take(first) + self._replay.take(count - first)
+        self._emitted += count
+        return format_numbers(values)
+
+    def getstate(self) -> dict:
+        return {"emitted": self._emitted, "unique": self._unique.getstate(), "replay": self._replay.getstate()}
+
+    def setstate(self, state: dict):
+        self._emitted = state["emitted"]
+        self._unique.setstate(state["unique"])
+        self._replay.setstate(state["replay"])
+
+
+def generate_numbers_with_distribution(
+    network_counts: Dict[str, int],
+    duplicates: int,
+    registry: Optional[NumberRegistry] = None,
+    strategy: str = "head",
+    zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+    multiplicity: Multiplicity = None,
+    seed: Optional[int] = None,
+) -> List[str]:
+    """Generate numbers with exact distribution per network + duplicates"""
+    return collect(iter_numbers_with_distribution(network_counts, duplicates, DEFAULT_CHUNK_SIZE, registry,
+                                                  strategy, zipf_exponent, multiplicity, seed))
+
+
+def generate_distribution_store(
+    network_counts: Dict[str, int],
+    duplicates: int,
+    seed: Optional[int] = None,
+) -> DuplicatedNumbers:
+    """Same numbers as generate_numbers_with_distribution, packed as integers with duplicates as a view"""
+    check_network_counts(network_counts)
+    if seed is None:
+        seed = random.getrandbits(64)
+    store = NumberStore()
+    for values in _iter_distribution_values(network_counts, seed, DEFAULT_CHUNK_SIZE):
+        store.extend(values)
+    return store.with_duplicates(duplicates)
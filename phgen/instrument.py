@@ -0,0 +1,181 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from phgen.prefixes import SIM_PREFIXES
+
+# Allocation sites listed in the report when memory tracing is on
+TRACEMALLOC_TOP = 10
+# Report file written next to the output
+REPORT_SUFFIX = ".report.json"
+
+
+class RunStats:
+    """Per-stage timers and counters for one run, filled in as chunks stream by
+
+    Stages are timed per chunk, not per row, and may nest (a duplicate stage
+    includes the formatting it triggers), so stage times are inclusive.
+    Counter groups hold per-key tallies such as rows per network or per
+    invalid pattern.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, Counter] = {}
+        self.extra: Dict[str, object] = {}
+        self._heads: Optional[Dict[str, str]] = None
+
+    def add_time(self, stage: str, seconds: float, rows: int = 0):
+        """Add one timed call of `stage` that handled `rows` rows"""
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = {"seconds": 0.0, "calls": 0, "rows": 0}
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        entry["rows"] += rows
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start, rows)
+
+    def count(self, group: str, key: str, amount: int = 1):
+        counter = self.counters.get(group)
+        if counter is None:
+            counter = self.counters[group] = Counter()
+        counter[key] += amount
+
+    def count_many(self, group: str, counts: Dict[str, int]):
+        counter = self.counters.get(group)
+        if counter is None:
+            counter = self.counters[group] = Counter()
+        counter.update(counts)
+
+    def count_networks(self, chunk: Sequence[str]):
+        """Tally the valid 63-form numbers of `chunk` per network (one C-level pass over the chunk)"""
+        if self._heads is None:
+            # Imported here: phgen.store sits below this module in the import graph
+            from phgen.store import prefix_network_table
+            self._heads = {f"63{value:03d}": network
+                           for value, network in enumerate(prefix_network_table(SIM_PREFIXES)) if network is not None}
+        heads = Counter(row[:5] for row in chunk if len(row) == 12 and row.isdigit())
+        networks: Counter = Counter()
+        for head, count in heads.items():
+            network = self._heads.get(head)
+            if network is not None:
+                networks[network] += count
+        self.count_many("network", networks)
+
+    def timed_chunks(self, chunks: Iterable[Sequence[str]], stage: str) -> Iterator[Sequence[str]]:
+        """Pass `chunks` through, timing the production of each one as `stage`"""
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(iterator, None)
+            if chunk is None:
+                return
+            self.add_time(stage, time.perf_counter() - start, len(chunk))
+            yield chunk
+
+    def report(self) -> Dict[str, object]:
+        """JSON-ready summary: wall time, stages with rows/sec, counters"""
+        elapsed = time.perf_counter() - self.started
+        stages = {}
+        for name, entry in self.stages.items():
+            seconds, rows = entry["seconds"], entry["rows"]
+            stages[name] = {
+                "seconds": round(seconds, 6),
+                "calls": entry["calls"],
+                "rows": rows,
+                "rows_per_sec": round(rows / seconds, 1) if rows and seconds else None,
+            }
+        report: Dict[str, object] = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "elapsed_s": round(elapsed, 6),
+            "stages": stages,
+            "counters": {group: dict(counter) for group, counter in self.counters.items()},
+        }
+        report.update(self.extra)
+        return report
+
+
+_current: Optional[RunStats] = None
+
+
+def current_stats() -> Optional[RunStats]:
+    """The active RunStats, or None when instrumentation is off (the hot paths check this once per chunk)"""
+    return _current
+
+
+def timed(chunks: Iterable[Sequence[str]], stage: str) -> Iterable[Sequence[str]]:
+    """`chunks` timed as `stage` when instrumentation is on, untouched otherwise"""
+    stats = _current
+    return chunks if stats is None else stats.timed_chunks(chunks, stage)
+
+
+def report_path(output: str) -> str:
+    """Where the run report of `output` goes"""
+    return output + REPORT_SUFFIX
+
+
+@contextmanager
+def instrumented(profile_path: Optional[str] = None, trace_memory: bool = False) -> Iterator[RunStats]:
+    """Collect RunStats for the code in the block, optionally under cProfile and tracemalloc
+
+    The profile is dumped to `profile_path` (open with pstats or snakeviz); the
+    tracemalloc peak and top allocation sites go into the report. The stats are
+    global, so only one instrumented block can run at a time.
+    """
+    global _current
+    if _current is not None:
+        raise RuntimeError("Instrumentation is already active")
+    stats = RunStats()
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    _current = stats
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield stats
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            stats.extra["profile"] = os.path.abspath(profile_path)
+        if trace_memory:
+            stats.extra["memory"] = _memory_summary()
+            tracemalloc.stop()
+        _current = None
+
+
+def _memory_summary() -> Dict[str, object]:
+    import tracemalloc
+    current, peak = tracemalloc.get_traced_memory()
+    top: List[Dict[str, object]] = []
+    for stat in tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]:
+        frame = stat.traceback[0]
+        top.append({"site": f"{frame.filename}:{frame.lineno}", "kib": round(stat.size / 1024, 1),
+                    "blocks": stat.count})
+    return {"current_kib": round(current / 1024, 1), "peak_kib": round(peak / 1024, 1), "top": top}
+
+
+def write_report(stats: RunStats, output: str, **extra) -> str:
+    """Write the JSON run report next to `output`, return its path"""
+    report = stats.report()
+    report.update(extra)
+    path = report_path(output)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,279 @@
+import random
+import time
+from bisect import bisect_right
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from phgen.instrument import current_stats
+from phgen.prefixes import SIM_PREFIXES, all_network_prefixes
+from phgen.registry import BloomFilter
+from phgen.stream import DEFAULT_CHUNK_SIZE, collect
+from phgen.unique import FeistelPermutation, unique_prefixes
+
+
+class InvalidPattern(NamedTuple):
+    """One family of invalid numbers: `render` maps every index in range(size) to a distinct string"""
+    name: str
+    weight: float
+    size: int
+    render: Callable[[int], str]
+
+
+def _digits_pattern(name: str, weight: float, heads: Sequence[str], digits: int) -> InvalidPattern:
+    """`head` + `digits` free digits, for every head in `heads`"""
+    space = 10 ** digits
+    return InvalidPattern(
+        name, weight, len(heads) * space,
+        lambda index: f"{heads[index // space]}{index % space:0{digits}d}",
+    )
+
+
+def _charset_pattern(name: str, weight: float, heads: Sequence[str], charset: str, length: int) -> InvalidPattern:
+    """`head` + `length` characters from `charset`, for every head in `heads`"""
+    base = len(charset)
+    space = base ** length
+
+    def render(index: int) -> str:
+        head, rest = divmod(index, space)
+        chars = []
+        for _ in range(length):
+            rest, digit = divmod(rest, base)
+            chars.append(charset[digit])
+        return heads[head] + ''.join(chars)
+
+    return InvalidPattern(name, weight, len(heads) * space, render)
+
+
+def build_invalid_patterns(valid_prefixes: Sequence[str]) -> List[InvalidPattern]:
+    """The invalid-number families, made disjoint so no two patterns can emit the same string
+
+    Weights mirror the old `random.choice(patterns)`: every family gets the same share,
+    and the random-digits family splits its share evenly across lengths 8-15.
+    """
+    patterns = [
+        # Wrong country code (6x where x is not 3), 11 digits
+        _digits_pattern("wrong_country_code", 1.0, ["60", "61", "62", "64", "65"], 9),
+        # Wrong length (not 12 digits): 63 + 9 digits
+        _digits_pattern("wrong_length", 1.0, [f"63{d}" for d in range(1, 10)], 8),
+        # Invalid prefix (000, 111, 222)
+        _digits_pattern("invalid_prefix", 1.0, ["63000", "63111", "63222"], 7),
+        # Valid format but invalid carrier prefix (000 is already covered above)
+        _digits_pattern("invalid_carrier", 1.0, ["63123", "63555"], 7),
+        # Numbers with letters/special characters
+        _charset_pattern("letters", 1.0, ["6381", "6390", "6391"], 'abcdefghijABCDEFGHIJ!@#$%^&*()', 7),
+        # Valid prefix but wrong structure
+        _charset_pattern("wrong_structure", 1.0, [f"63{p}" for p in unique_prefixes(valid_prefixes)], 'ABCD!@#$', 7),
+    ]
+    # Completely random digits, never starting with 6 (country code) or 0 (local format)
+    for length in range(8, 16):
+        patterns.append(_digits_pattern(f"random_digits_{length}", 1.0 / 8, list("12345789"), length - 1))
+    return patterns
+
+
+def allocate_quotas(patterns: Sequence[InvalidPattern], count: int) -> List[int]:
+    """Split `count` across patterns by weight, capped by each pattern's size"""
+    capacity = sum(pattern.size for pattern in patterns)
+    if count > capacity:
+        raise ValueError(
+            f"Requested {count} unique invalid numbers but the selected patterns only hold {capacity}"
+        )
+    quotas = [0] * len(patterns)
+    remaining = count
+    open_patterns = [i for i, pattern in enumerate(patterns) if pattern.size > 0]
+    while remaining > 0:
+        total_weight = sum(patterns[i].weight for i in open_patterns)
+        shares = [int(remaining * patterns[i].weight / total_weight) for i in open_patterns]
+        # Hand the rounding leftovers out one by one, heaviest patterns first
+        leftover = remaining - sum(shares)
+        for position in sorted(range(len(open_patterns)), key=lambda p: -patterns[open_patterns[p]].weight):
+            if leftover <= 0:
+                break
+            shares[position] += 1
+            leftover -= 1
+        still_open = []
+        for i, share in zip(open_patterns, shares):
+            take = min(share, patterns[i].size - quotas[i])
+            quotas[i] += take
+            remaining -= take
+            if quotas[i] < patterns[i].size:
+                still_open.append(i)
+        open_patterns = still_open
+    return quotas
+
+
+class InvalidNumberEngine:
+    """Emits `count` unique invalid numbers with exact per-pattern quotas and no rejection sampling
+
+    Row r goes through a keyed permutation of range(count) to a slot; slots are laid out
+    pattern by pattern, and each pattern walks its own keyed permutation of its index
+    space. Any row range, or any set of rows (numbers_at), can be produced on its own.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[InvalidPattern],
+        count: int,
+        seed: Optional[int] = None,
+        names: Optional[Sequence[str]] = None,
+    ):
+        if names is not None:
+            unknown = set(names) - {pattern.name for pattern in patterns}
+            if unknown:
+                raise ValueError(f"Unknown invalid patterns: {sorted(unknown)}")
+            patterns = [pattern for pattern in patterns if pattern.name in names]
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.count = count
+        self.quotas = allocate_quotas(patterns, count)
+        self.patterns = [pattern for pattern, quota in zip(patterns, self.quotas) if quota]
+        self._offsets = []
+        offset = 0
+        for quota in self.quotas:
+            if quota:
+                self._offsets.append(offset)
+                offset += quota
+        self._order = FeistelPermutation(count, seed, tweak="order") if count > 0 else None
+        self._permutations = [
+            FeistelPermutation(p.size, seed, tweak=p.name, expected=quota)
+            for p, quota in zip(self.patterns, (q for q in self.quotas if q))
+        ]
+        self._spare = [quota for quota in self.quotas if quota]
+
+    def pattern_counts(self) -> Dict[str, int]:
+        """Exact number of rows each pattern contributes"""
+        return {pattern.name: quota for pattern, quota in zip(self.patterns, (q for q in self.quotas if q))}
+
+    def numbers(self, start: int, stop: int) -> List[str]:
+        """Invalid numbers for rows [start, stop)"""
+        if start >= stop:
+            return []
+        offsets, patterns, permutations = self._offsets, self.patterns, self._permutations
+        stats = current_stats()
+        if stats is not None:
+            return self._numbers_counted(start, stop, stats)
+        out = []
+        append = out.append
+        for slot in self._order.batch(start, stop):
+            which = bisect_right(offsets, slot) - 1
+            append(patterns[which].render(permutations[which](slot - offsets[which])))
+        return out
+
+    def numbers_at(self, rows: Sequence[int]) -> List[str]:
+        """Invalid numbers for arbitrary rows (e.g. rows scattered through a larger file)"""
+        offsets, patterns, permutations, order = self._offsets, self.patterns, self._permutations, self._order
+        out = []
+        append = out.append
+        for row in rows:
+            slot = order(row)
+            which = bisect_right(offsets, slot) - 1
+            append(patterns[which].render(permutations[which](slot - offsets[which])))
+        return out
+
+    def unissued_numbers(self, start: int, stop: int, registry: BloomFilter) -> List[str]:
+        """numbers(start, stop) minus those the `registry` has seen, which are
+        swapped for unused numbers of the same pattern so the per-pattern counts still hold"""
+        offsets, patterns, permutations = self._offsets, self.patterns, self._permutations
+        rows, kinds = [], []
+        for slot in self._order.batch(start, stop):
+            which = bisect_right(offsets, slot) - 1
+            kinds.append(which)
+            rows.append(patterns[which].render(permutations[which](slot - offsets[which])))
+        fresh = set(registry.claim(rows))
+        for position, number in enumerate(rows):
+            if number in fresh:
+                continue
+            which = kinds[position]
+            while True:
+                # Indices past the pattern's quota are never drawn by this run
+                index = self._spare[which]
+                if index >= patterns[which].size:
+                    raise ValueError(f"Every {patterns[which].name} number has been issued already")
+                self._spare[which] += 1
+                number = patterns[which].render(permutations[which](index))
+                if registry.claim([number]):
+                    break
+            rows[position] = number
+        stats = current_stats()
+        if stats is not None:
+            stats.count_many("invalid_pattern", dict(Counter(patterns[which].name for which in kinds)))
+        return rows
+
+    def _numbers_counted(self, start: int, stop: int, stats) -> List[str]:
+        """numbers() that also tallies rows per pattern into `stats`"""
+        began = time.perf_counter()
+        offsets, patterns, permutations = self._offsets, self.patterns, self._permutations
+        tally = [0] * len(patterns)
+        out = []
+        append = out.append
+        for slot in self._order.batch(start, stop):
+            which = bisect_right(offsets, slot) - 1
+            tally[which] += 1
+            append(patterns[which].render(permutations[which](slot - offsets[which])))
+        stats.count_many("invalid_pattern", {pattern.name: count for pattern, count in zip(patterns, tally) if count})
+        stats.add_time("invalid", time.perf_counter() - began, len(out))
+        return out
+
+
+# Disjoint invalid-number families with known sizes, used for unique batches
+INVALID_PATTERNS = build_invalid_patterns(all_network_prefixes())
+
+# Single-number patterns, built once instead of on every call (names in the same order)
+_RANDOM_PATTERN_NAMES = ["wrong_country_code", "wrong_length", "invalid_prefix", "random_digits", "invalid_carrier",
+                         "letters", "wrong_structure"]
+_RANDOM_PATTERNS = [
+    # Wrong country code (not 63)
+    lambda: f"6{random.randint(0, 5)}{''.join([str(random.randint(0, 9)) for _ in range(9)])}",
+    # Wrong length (not 11 digits)
+    lambda: f"63{random.randint(1, 9)}{''.join([str(random.randint(0, 9)) for _ in range(8)])}",
+    # Invalid prefix (000, 111, 222)
+    lambda: f"63{random.choice(['000', '111', '222'])}{''.join([str(random.randint(0, 9)) for _ in range(7)])}",
+    # Completely random digits
+    lambda: ''.join([str(random.randint(0, 9)) for _ in range(random.randint(8, 15))]),
+    # Valid format but invalid carrier prefix
+    lambda: f"63{random.choice(['000', '123', '555'])}{''.join([str(random.randint(0, 9)) for _ in range(7)])}",
+    # Numbers with letters/special characters
+    lambda: f"63{random.choice(['81', '90', '91'])}" + \
+            ''.join(random.choice('abcdefghijABCDEFGHIJ!@#$%^&*()') for _ in range(7)),
+    # Valid prefix but wrong structure
+    lambda: f"63{random.choice(random.choice(list(SIM_PREFIXES.values())))}{''.join(random.choice('ABCD!@#$') for _ in range(7))}"
+]
+
+
+def generate_invalid_number() -> str:
+    """Generate an invalid Philippine mobile number with various patterns"""
+    # randrange draws like random.choice did, so seeded runs are unchanged
+    index = random.randrange(len(_RANDOM_PATTERNS))
+    stats = current_stats()
+    if stats is not None:
+        stats.count("invalid_pattern", _RANDOM_PATTERN_NAMES[index])
+    return _RANDOM_PATTERNS[index]()
+
+
+def iter_unique_invalid_numbers(
+    count: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: Optional[int] = None,
+    patterns: Optional[List[str]] = None,
+    registry: Optional[BloomFilter] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_unique_invalid_numbers, yields chunks of numbers
+
+    With a `registry`, numbers issued by earlier runs
+    are skipped and the new ones recorded.
+    """
+    engine = InvalidNumberEngine(INVALID_PATTERNS, count, seed=seed, names=patterns)
+    for start in range(0, count, chunk_size):
+        if registry is None:
+            yield engine.numbers(start, min(start + chunk_size, count))
+        else:
+            yield engine.unissued_numbers(start, min(start + chunk_size, count), registry)
+
+
+def generate_unique_invalid_numbers(
+    count: int,
+    seed: Optional[int] = None,
+    patterns: Optional[List[str]] = None,
+    registry: Optional[BloomFilter] = None,
+) -> List[str]:
+    """Generate unique invalid numbers (optionally only from the named patterns)"""
+    return collect(iter_unique_invalid_numbers(count, seed=seed, patterns=patterns, registry=registry))
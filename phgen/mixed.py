@@ -0,0 +1,209 @@
+import random
+import string
+from itertools import islice, repeat
+from typing import Iterator, List, Optional
+
+from phgen.batch import format_numbers, generate_ph_numbers
+from phgen.instrument import current_stats
+from phgen.invalid import INVALID_PATTERNS, InvalidNumberEngine
+from phgen.prefixes import all_network_prefixes
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes, collect
+from phgen.unique import UniquePermutation
+
+_ALPHANUMERIC = string.ascii_letters + string.digits
+
+# Invalid patterns of the valid-first/invalid-last files, built once instead of on every call
+_INVALID_PATTERN_NAMES = ["wrong_length", "wrong_country_code", "invalid_prefix", "random_digits", "letters"]
+_INVALID_PATTERNS = [
+    # Wrong length (not 11 digits)
+    lambda rng: f"63{rng.randint(1, 9)}{''.join([str(rng.randint(0, 9)) for _ in range(8)])}",
+    # Wrong country code (not 63)
+    lambda rng: f"6{rng.randint(0, 5)}{''.join([str(rng.randint(0, 9)) for _ in range(9)])}",
+    # Invalid prefix (000, 111, 222)
+    lambda rng: f"63{rng.choice(['000', '111', '222'])}{''.join([str(rng.randint(0, 9)) for _ in range(7)])}",
+    # Completely random digits
+    lambda rng: ''.join([str(rng.randint(0, 9)) for _ in range(12)]),
+    # Numbers with letters mixed in
+    lambda rng: f"63{rng.choice(['81', '90', '91'])}" + ''.join(rng.choice(_ALPHANUMERIC) for _ in range(7)),
+]
+
+
+def generate_invalid_number(rng=random) -> str:
+    """Generate an invalid Philippine mobile number with various patterns"""
+    # randrange draws like rng.choice did, so seeded runs are unchanged
+    index = rng.randrange(len(_INVALID_PATTERNS))
+    stats = current_stats()
+    if stats is not None:
+        stats.count("invalid_pattern", _INVALID_PATTERN_NAMES[index])
+    return _INVALID_PATTERNS[index](rng)
+
+
+def iter_mixed_numbers(
+    valid_count: int,
+    invalid_count: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rng: Optional[random.Random] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_mixed_numbers, yields chunks of plain number strings"""
+    all_prefixes = all_network_prefixes()
+
+    # VALID numbers first, then INVALID numbers
+    for size in chunk_sizes(valid_count, chunk_size):
+        yield generate_ph_numbers(all_prefixes, size, rng)
+    for size in chunk_sizes(invalid_count, chunk_size):
+        stats = current_stats()
+        if stats is not None:
+            with stats.stage("invalid", size):
+                chunk = [generate_invalid_number(rng or random) for _ in range(size)]
+            yield chunk
+        else:
+            yield [generate_invalid_number(rng or random) for _ in range(size)]
+
+
+def generate_mixed_numbers(valid_count: int, invalid_count: int) -> List[str]:
+    """Generate numbers with valid first, then invalid"""
+    return collect(iter_mixed_numbers(valid_count, invalid_count))
+
+
+def iter_mixed_rows(start: int, stop: int, rng: random.Random, valid_count: int) -> Iterator[List[str]]:
+    """Rows [start, stop) of a sharded file whose first `valid_count` rows are valid"""
+    valid_stop = min(max(valid_count, start), stop)
+    return iter_mixed_numbers(valid_stop - start, stop - valid_stop, rng=rng)
+
+
+# Row classes of the interleaved mixer
+VALID, INVALID, DUPLICATE = 0, 1, 2
+CLASS_NAMES = ("valid", "invalid", "duplicate")
+# blocks: valid, then invalid, then duplicates; shuffle: uniformly interleaved;
+# burst: invalid rows arrive in evenly spaced bursts, valid and duplicates shuffled in between
+PLACEMENTS = ("blocks", "shuffle", "burst")
+DEFAULT_BURST_SIZE = 100
+
+
+class InterleavedMixer:
+    """Streams exactly `valid` + `invalid` + `duplicates` rows, interleaved by `placement`
+
+    Sources are random-access, so memory stays constant at any size:
+    - valid rows walk a keyed permutation of every valid number (no repeats),
+    - invalid rows come from the unique invalid engine (disjoint from valid numbers),
+    - duplicate rows repeat a uniformly chosen valid row of the same file.
+    `counts` tracks the rows emitted per class; iter_numbers() checks them against the
+    targets when it finishes, so a completed stream is guaranteed exact.
+    """
+
+    def __init__(
+        self,
+        valid: int,
+        invalid: int,
+        duplicates: int = 0,
+        placement: str = "shuffle",
+        burst_size: int = DEFAULT_BURST_SIZE,
+        seed: Optional[int] = None,
+    ):
+        if placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement: {placement} (expected one of {', '.join(PLACEMENTS)})")
+        if min(valid, invalid, duplicates) < 0:
+            raise ValueError("Row counts must not be negative")
+        if duplicates and not valid:
+            raise ValueError("Duplicates need at least one valid number")
+        if burst_size < 1:
+            raise ValueError("burst_size must be at least 1")
+        self.targets = {"valid": valid, "invalid": invalid, "duplicate": duplicates}
+        self.placement = placement
+        self.burst_size = burst_size
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.counts = {name: 0 for name in CLASS_NAMES}
+
+    @property
+    def total(self) -> int:
+        return sum(self.targets.values())
+
+    def _iter_shuffled(self, rng: random.Random, counts: List[int]) -> Iterator[int]:
+        """Sequential selection over the classes in `counts` (consumed in place): exact and uniform"""
+        random_ = rng.random
+        left = sum(counts)
+        while left:
+            draw = random_() * left
+            for code, count in enumerate(counts):
+                if draw < count:
+                    counts[code] -= 1
+                    break
+                draw -= count
+            left -= 1
+            yield code
+
+    def iter_classes(self) -> Iterator[int]:
+        """Class code (VALID, INVALID, DUPLICATE) of every row"""
+        valid, invalid, duplicates = self.targets["valid"], self.targets["invalid"], self.targets["duplicate"]
+        rng = random.Random(self.seed)
+        if self.placement == "blocks":
+            yield from repeat(VALID, valid)
+            yield from repeat(INVALID, invalid)
+            yield from repeat(DUPLICATE, duplicates)
+        elif self.placement == "shuffle":
+            yield from self._iter_shuffled(rng, [valid, invalid, duplicates])
+        else:
+            # Burst k is centred in its share of the other rows
+            others = [valid, 0, duplicates]
+            other_rows = valid + duplicates
+            bursts = list(chunk_sizes(invalid, self.burst_size))
+            emitted = 0
+            for k, burst in enumerate(bursts):
+                before = (2 * k + 1) * other_rows // (2 * len(bursts))
+                block = [others[VALID], 0, others[DUPLICATE]]
+                take = before - emitted
+                # Split the rows before this burst between valid and duplicates hypergeometrically
+                split = self._iter_shuffled(rng, block)
+                taken = [0, 0, 0]
+                for _ in range(take):
+                    code = next(split)
+                    taken[code] += 1
+                    yield code
+                others[VALID] -= taken[VALID]
+                others[DUPLICATE] -= taken[DUPLICATE]
+                emitted = before
+                yield from repeat(INVALID, burst)
+            yield from self._iter_shuffled(rng, others)
+
+    def iter_numbers(self, chunk_size: int = DEFAULT_CHUNK_SIZE, country_code: str = "63") -> Iterator[List[str]]:
+        """The mixed rows as text, chunk by chunk"""
+        valid_source = UniquePermutation(all_network_prefixes(), self.seed)
+        invalid_source = InvalidNumberEngine(INVALID_PATTERNS, self.targets["invalid"], seed=self.seed)
+        pick = random.Random(f"{self.seed}:duplicates")
+        counts = self.counts
+        stats = current_stats()
+        classes = self.iter_classes()
+        while True:
+            codes = list(islice(classes, chunk_size))
+            if not codes:
+                break
+            valid_count, invalid_count = codes.count(VALID), codes.count(INVALID)
+            duplicate_count = len(codes) - valid_count - invalid_count
+            start, done = counts["valid"], counts["invalid"]
+            sources = (
+                iter(format_numbers(valid_source.values(start, start + valid_count), country_code)),
+                iter(invalid_source.numbers(done, done + invalid_count)),
+                iter(format_numbers(valid_source.values_at(
+                    [pick.randrange(self.targets["valid"]) for _ in range(duplicate_count)]), country_code)),
+            )
+            yield [next(sources[code]) for code in codes]
+            counts["valid"] += valid_count
+            counts["invalid"] += invalid_count
+            counts["duplicate"] += duplicate_count
+            if stats is not None:
+                stats.count_many("class", dict(zip(CLASS_NAMES, (valid_count, invalid_count, duplicate_count))))
+        if counts != self.targets:
+            raise RuntimeError(f"Mixer emitted {counts}, expected {self.targets}")
+
+
+def iter_interleaved_numbers(
+    valid_count: int,
+    invalid_count: int,
+    duplicates: int = 0,
+    placement: str = "shuffle",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    burst_size: int = DEFAULT_BURST_SIZE,
+    seed: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """Valid, invalid and duplicate rows interleaved to exact counts (see InterleavedMixer)"""
+    return InterleavedMixer(valid_count, invalid_count, duplicates, placement, burst_size, seed).iter_numbers(chunk_size)
@@ -0,0 +1,221 @@
+import os
+import random
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from phgen.batch import format_numbers
+from phgen.contacts import (
+    DEPARTMENTS, ContactPools, generate_contact_row, get_contact_pools, get_faker, pool_contact_rows, seeded_faker,
+)
+from phgen.instrument import current_stats
+from phgen.prefixes import SIM_PREFIXES
+from phgen.shard import derive_seed
+from phgen.stream import DEFAULT_BUFFER_SIZE, compression_for, compressor
+from phgen.unique import UniqueNumberSampler
+
+# Contact rows rendered per worker job (one pre-formatted byte block)
+DEFAULT_BLOCK_ROWS = 20_000
+# Blocks in flight per worker: enough to keep workers busy while the writer catches up
+_BLOCKS_PER_WORKER = 2
+
+
+class ContactBlock(NamedTuple):
+    """One job: rows [start, start + rows) of the unique pool, rendered as contacts of `network`"""
+    block: int      # block id, seeds the block's RNG (and Faker)
+    network: str
+    start: int      # first row in the unique pool
+    rows: int
+    keep: int       # rows written (fewer than `rows` for the last block of the duplicated head)
+    replay: bool    # True for duplicate rows: a reference to an earlier block, not new numbers
+
+
+def plan_contact_blocks(
+    network_counts: Dict[str, int], duplicates: int, block_rows: int = DEFAULT_BLOCK_ROWS
+) -> List[ContactBlock]:
+    """Blocks of iter_contacts_with_distribution's layout: each network's unique rows in order,
+    then the first `duplicates` rows again as references to the blocks holding them"""
+    if block_rows <= 0:
+        raise ValueError("block_rows must be positive")
+    blocks = []
+    start = 0
+    for network, count in network_counts.items():
+        if network not in SIM_PREFIXES:
+            raise ValueError(f"Unknown network: {network}")
+        for offset in range(0, count, block_rows):
+            rows = min(block_rows, count - offset)
+            blocks.append(ContactBlock(len(blocks), network, start, rows, rows, False))
+            start += rows
+    remaining = min(max(duplicates, 0), start)
+    for block in list(blocks):
+        if remaining <= 0:
+            break
+        keep = min(block.rows, remaining)
+        blocks.append(block._replace(keep=keep, replay=True))
+        remaining -= keep
+    return blocks
+
+
+class UniqueNumberPool:
+    """Packed unique numbers (prefix * 10^7 + suffix) in shared memory
+
+    The coordinator creates the pool and fills it block by block; workers attach
+    by `name` and read only their block's rows, so numbers cross the process
+    boundary once, as 8 bytes each, and no two blocks can share a number.
+    """
+
+    def __init__(self, size: int, name: Optional[str] = None):
+        from multiprocessing import shared_memory
+        self.size = size
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=max(8 * size, 8))
+        self._values = self._shm.buf[:8 * size].cast('Q')
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def fill(self, start: int, values: Sequence[int]):
+        self._values[start:start + len(values)] = array('Q', values)
+
+    def values(self, start: int, stop: int) -> array:
+        return array('Q', self._values[start:stop])
+
+    def close(self):
+        """Detach (and free the memory, for the pool's creator)"""
+        self._values.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "UniqueNumberPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _WorkerState(NamedTuple):
+    numbers: UniqueNumberPool
+    seed: int
+    pools: Optional[ContactPools]
+
+
+_worker: Optional[_WorkerState] = None
+
+
+def _init_worker(pool_name: str, size: int, seed: int, pools: Optional[ContactPools]):
+    """Process-pool initializer: attach the shared number pool once per worker"""
+    global _worker
+    _worker = _WorkerState(UniqueNumberPool(size, pool_name), seed, pools)
+
+
+def _render_block(block: ContactBlock) -> bytes:
+    """Worker: the block's contact rows as one UTF-8 byte block (rows joined by \\n, no trailing newline)
+
+    Rows depend only on the job seed, the block id and the block's pooled numbers,
+    so a replayed block renders exactly the bytes of the original.
+    """
+    numbers, seed, pools = _worker
+    block_seed = derive_seed(seed, block.block)
+    rng = random.Random(block_seed)
+    mobiles = format_numbers(numbers.values(block.start, block.start + block.rows), "0")
+    if pools is not None:
+        rows = pool_contact_rows(pools, (), DEPARTMENTS, rng, mobiles)
+    else:
+        fake = seeded_faker(block_seed)
+        prefixes = SIM_PREFIXES[block.network]
+        rows = [generate_contact_row(prefixes[0], rng, mobile, fake) for mobile in mobiles]
+    return "\n".join(rows[:block.keep]).encode('utf-8')
+
+
+def write_contacts_parallel(
+    filename: str,
+    network_counts: Dict[str, int],
+    duplicates: int,
+    seed: Optional[int] = None,
+    fast: bool = False,
+    processes: Optional[int] = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    compression: Optional[str] = "auto",
+    pools: Optional[ContactPools] = None,
+) -> int:
+    """Write a Book1.csv-style contact file with worker processes, return the row count
+
+    Same layout as iter_contacts_with_distribution: each network's unique rows in
+    order, then the first `duplicates` rows again, pipe-delimited, joined by \\n
+    with no trailing newline. The coordinator draws guaranteed-unique mobile
+    numbers per block (UniqueNumberSampler) into a shared-memory pool and hands
+    out block jobs; workers render byte blocks that a single writer appends in
+    order. Duplicate rows are block references that workers render again from the
+    same seed and numbers, so no row is ever held for later. The same `seed`
+    gives the same file for any number of processes. `pools` overrides the
+    cached Faker pools of fast mode.
+    """
+    global _worker
+    if compression == "auto":
+        compression = compression_for(filename)
+    if compression not in (None, "gzip", "xz"):
+        raise ValueError(f"Unknown compression: {compression}")
+    if seed is None:
+        seed = random.getrandbits(64)
+    blocks = plan_contact_blocks(network_counts, duplicates, block_rows)
+    if fast and pools is None:
+        pools = get_contact_pools()
+    elif not fast:
+        pools = None
+        get_faker()  # Fail before any worker starts when Faker is missing
+    processes = processes or os.cpu_count() or 1
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    unique_total = sum(block.rows for block in blocks if not block.replay)
+    sampler = UniqueNumberSampler(seed)
+    stats = current_stats()
+    rows = 0
+    with UniqueNumberPool(unique_total) as numbers:
+        if processes == 1:
+            # Imported here like the process pool; one thread keeps rendering next to the coordinator
+            from concurrent.futures import ThreadPoolExecutor
+            _worker = _WorkerState(numbers, seed, pools)
+            executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                           initargs=(numbers.name, unique_total, seed, pools))
+        pending: deque = deque()
+        with executor, open(filename, 'wb', buffering=DEFAULT_BUFFER_SIZE) as raw:
+            sink = compressor(raw, compression) if compression else raw
+
+            def write_next():
+                nonlocal rows
+                block, future = pending.popleft()
+                data = future.result()
+                start = time.perf_counter() if stats is not None else 0.0
+                if rows:
+                    sink.write(b"\n")
+                sink.write(data)
+                rows += block.keep
+                if stats is not None:
+                    stats.add_time("write", time.perf_counter() - start, block.keep)
+                    stats.count("network", block.network, block.keep)
+
+            try:
+                for block in blocks:
+                    if not block.replay:
+                        numbers.fill(block.start, sampler.draw(SIM_PREFIXES[block.network], block.rows))
+                    pending.append((block, executor.submit(_render_block, block)))
+                    if len(pending) >= _BLOCKS_PER_WORKER * processes:
+                        write_next()
+                while pending:
+                    write_next()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                if sink is not raw:
+                    sink.close()
+        if processes == 1:
+            _worker = None
+    return rows
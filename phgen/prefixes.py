@@ -0,0 +1,19 @@
+from typing import Dict, List
+
+# SIM Prefixes mapping with network names in descending priority order
+# (single source for every script; the copies used to drift apart)
+SIM_PREFIXES: Dict[str, List[str]] = {
+    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
+    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
+    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
+    "Smart/TNT": ["907", "908", "909", "910", "912", "913", "914"],
+    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "940", "941", "942"]
+}
+
+
+def all_network_prefixes() -> List[str]:
+    """Combine all prefixes into one list (repeats kept, so they weigh like random.choice did)"""
+    all_prefixes = []
+    for network in SIM_PREFIXES:
+        all_prefixes.extend(SIM_PREFIXES[network])
+    return all_prefixes
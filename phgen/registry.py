@@ -0,0 +1,170 @@
+import hashlib
+import math
+import mmap
+import os
+from typing import Dict, Iterable, List, Sequence
+
+from phgen.batch import SUFFIX_SPACE, draw_numbers
+
+# One bit per suffix: 10^7 bits per prefix
+BITMAP_BYTES = (SUFFIX_SPACE + 7) // 8
+# Invalid numbers recorded in a registry directory before the Bloom filter's error rate degrades
+DEFAULT_BLOOM_CAPACITY = 10_000_000
+INVALID_BLOOM_NAME = "invalid.bloom"
+
+
+def _open_mapped(path: str, size: int) -> mmap.mmap:
+    """Memory-map `path` for writing, creating it as a zero-filled (sparse) file of `size` bytes
+
+    An existing file of any other size is refused: truncating or padding it would
+    silently lose or misplace issued numbers.
+    """
+    with open(path, 'ab') as f:
+        actual = f.seek(0, os.SEEK_END)
+        if actual == 0:
+            f.truncate(size)
+        elif actual != size:
+            raise ValueError(f"{path} holds {actual} bytes, expected {size}; it was not written with this layout")
+    with open(path, 'r+b') as f:
+        return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE)
+
+
+class NumberRegistry:
+    """On-disk record of every valid number ever issued, shared across runs
+
+    Each prefix owns a memory-mapped bitmap of 10^7 bits (1.25 MB) under `directory`.
+    Bitmaps are mapped lazily on first use, so opening the registry is instant and
+    lookups stay O(1) however many numbers have been issued.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._bitmaps: Dict[int, mmap.mmap] = {}
+
+    def _bitmap(self, prefix: int) -> mmap.mmap:
+        bitmap = self._bitmaps.get(prefix)
+        if bitmap is None:
+            bitmap = self._bitmaps[prefix] = _open_mapped(
+                os.path.join(self.directory, f"{prefix:03d}.bits"), BITMAP_BYTES
+            )
+        return bitmap
+
+    def __contains__(self, value: int) -> bool:
+        prefix, suffix = divmod(value, SUFFIX_SPACE)
+        return bool(self._bitmap(prefix % 1000)[suffix >> 3] & (1 << (suffix & 7)))
+
+    def claim(self, values: Iterable[int]) -> List[int]:
+        """Mark `values` as issued and return those that were not issued before (in order)"""
+        fresh = []
+        append = fresh.append
+        current_prefix = -1
+        bitmap = None
+        for value in values:
+            prefix, suffix = divmod(value, SUFFIX_SPACE)
+            if prefix != current_prefix:
+                current_prefix = prefix
+                bitmap = self._bitmap(prefix % 1000)
+            byte, bit = suffix >> 3, 1 << (suffix & 7)
+            current = bitmap[byte]
+            if not current & bit:
+                bitmap[byte] = current | bit
+                append(value)
+        return fresh
+
+    def issued_count(self, prefix: str) -> int:
+        """How many numbers under `prefix` have been issued so far"""
+        path = os.path.join(self.directory, f"{int(prefix):03d}.bits")
+        if not os.path.exists(path):
+            return 0
+        return bin(int.from_bytes(self._bitmap(int(prefix))[:], 'little')).count("1")
+
+    def flush(self):
+        """Push dirty pages to disk"""
+        for bitmap in self._bitmaps.values():
+            bitmap.flush()
+
+    def close(self):
+        self.flush()
+        for bitmap in self._bitmaps.values():
+            bitmap.close()
+        self._bitmaps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BloomFilter:
+    """Memory-mapped Bloom filter for the invalid-number space, which has no compact index
+
+    `claim` may wrongly treat a new string as seen with probability about `error_rate`,
+    but never lets a seen string through.
+    """
+
+    def __init__(self, path: str, capacity: int, error_rate: float = 0.001):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._map = _open_mapped(path, (self.bits + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        data = self._map
+        return all(data[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def claim(self, items: Iterable[str]) -> List[str]:
+        """Add `items` and return those that were (probably) not seen before"""
+        data = self._map
+        fresh = []
+        for item in items:
+            seen = True
+            for position in self._positions(item):
+                byte, bit = position >> 3, 1 << (position & 7)
+                if not data[byte] & bit:
+                    seen = False
+                    data[byte] |= bit
+            if not seen:
+                fresh.append(item)
+        return fresh
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_invalid_registry(directory: str, capacity: int = DEFAULT_BLOOM_CAPACITY) -> BloomFilter:
+    """The Bloom filter of invalid numbers kept next to the valid-number bitmaps in `directory`"""
+    return BloomFilter(os.path.join(directory, INVALID_BLOOM_NAME), capacity)
+
+
+def draw_unissued(
+    prefixes: Sequence[str],
+    count: int,
+    registry: NumberRegistry,
+    rng=None,
+    max_rounds: int = 100,
+) -> List[int]:
+    """Draw `count` numbers that were never issued (nor repeated in this batch) and mark them issued"""
+    values: List[int] = []
+    for _ in range(max_rounds):
+        if len(values) >= count:
+            break
+        values.extend(registry.claim(draw_numbers(prefixes, count - len(values), rng)))
+    if len(values) < count:
+        raise ValueError(f"Only {len(values)} of {count} unissued numbers found; the prefixes are nearly exhausted")
+    return values
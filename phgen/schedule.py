@@ -0,0 +1,180 @@
+import math
+import random
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterator, List, Optional, Sequence, Union
+
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes
+from phgen.unique import FeistelPermutation
+
+# head: the first N numbers again, as one block at the end (the original behaviour)
+# uniform: duplicates of uniformly chosen numbers at uniformly random positions
+# zipf: like uniform, but a few hot numbers take most of the duplicates
+# exact: every number appears an exact number of times, at random positions
+STRATEGIES = ("head", "uniform", "zipf", "exact")
+DEFAULT_ZIPF_EXPONENT = 1.1
+
+
+class ZipfSampler:
+    """Ranks 1..n with P(k) proportional to 1 / k^exponent, in O(1) memory
+
+    Rejection-inversion sampling (Hörmann & Derflinger, 1996): no table over the
+    ranks, so it works for 100M distinct numbers; about 1.1 uniforms per draw.
+    """
+
+    def __init__(self, n: int, exponent: float = DEFAULT_ZIPF_EXPONENT):
+        if n < 1:
+            raise ValueError("n must be positive")
+        if exponent <= 0:
+            raise ValueError("exponent must be positive")
+        self.n = n
+        self.exponent = exponent
+        self._h_integral_x1 = self._h_integral(1.5) - 1.0
+        self._h_integral_n = self._h_integral(n + 0.5)
+        self._s = 2.0 - self._h_integral_inverse(self._h_integral(2.5) - self._h(2.0))
+
+    def _h(self, x: float) -> float:
+        return math.exp(-self.exponent * math.log(x))
+
+    def _h_integral(self, x: float) -> float:
+        log_x = math.log(x)
+        t = (1.0 - self.exponent) * log_x
+        # expm1(t) / t, tending to 1 as t -> 0 (exponent close to 1)
+        return (math.expm1(t) / t if abs(t) > 1e-8 else 1.0 + t / 2.0) * log_x
+
+    def _h_integral_inverse(self, x: float) -> float:
+        t = max(x * (1.0 - self.exponent), -1.0)
+        # log1p(t) / t, tending to 1 as t -> 0
+        return math.exp((math.log1p(t) / t if abs(t) > 1e-8 else 1.0 - t / 2.0) * x)
+
+    def sample(self, rng: random.Random) -> int:
+        """One rank in 1..n"""
+        while True:
+            u = self._h_integral_n + rng.random() * (self._h_integral_x1 - self._h_integral_n)
+            x = self._h_integral_inverse(u)
+            k = min(max(int(x + 0.5), 1), self.n)
+            if k - x <= self._s or u >= self._h_integral(k + 0.5) - self._h(k):
+                return k
+
+
+class DuplicateScheduler:
+    """Plans a file of `unique` numbers plus duplicates as indices into the unique set
+
+    Row r of the file is number `index` of the unique set; unique rows come in
+    order 0, 1, 2, ... and duplicate rows are references, so no number is ever
+    copied. Memory is O(1), or O(unique) for a per-number multiplicity list.
+    """
+
+    def __init__(
+        self,
+        unique: int,
+        duplicates: int = 0,
+        strategy: str = "head",
+        seed: Optional[int] = None,
+        zipf_exponent: float = DEFAULT_ZIPF_EXPONENT,
+        multiplicity: Union[int, Sequence[int], None] = None,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown duplicate strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+        if unique < 0 or duplicates < 0:
+            raise ValueError("unique and duplicates must not be negative")
+        if duplicates and not unique:
+            raise ValueError("Duplicates need at least one unique number")
+        if multiplicity is not None and strategy != "exact":
+            raise ValueError("multiplicity only applies to the exact strategy")
+        self.unique = unique
+        self.strategy = strategy
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.zipf_exponent = zipf_exponent
+        self._ref_offsets: Optional[array] = None
+        if strategy == "head" and duplicates > unique:
+            raise ValueError(f"head strategy can repeat at most {unique} numbers, got {duplicates}")
+        if isinstance(multiplicity, int):
+            if multiplicity < 1:
+                raise ValueError("multiplicity must be at least 1")
+            duplicates = unique * (multiplicity - 1)
+        elif multiplicity is not None:
+            if len(multiplicity) != unique:
+                raise ValueError(f"Expected {unique} multiplicities, got {len(multiplicity)}")
+            # Running total of duplicate slots, so slot -> number is one bisect
+            self._ref_offsets = array('Q')
+            total = 0
+            for count in multiplicity:
+                if count < 1:
+                    raise ValueError("multiplicity must be at least 1")
+                total += count - 1
+                self._ref_offsets.append(total)
+            duplicates = total
+        self.duplicates = duplicates
+
+    @property
+    def total(self) -> int:
+        return self.unique + self.duplicates
+
+    def _reference_fn(self, rng: random.Random) -> Callable[[int], List[int]]:
+        """Function returning the unique indices of the next `k` duplicate rows"""
+        unique = self.unique
+        if self.strategy == "uniform":
+            randrange = rng.randrange
+            return lambda k: [randrange(unique) for _ in range(k)]
+        if self.strategy == "zipf":
+            sample = ZipfSampler(unique, self.zipf_exponent).sample
+            return lambda k: [sample(rng) - 1 for _ in range(k)]
+
+        # exact: duplicate slots are walked in a keyed random order, each slot belongs to one number
+        order = FeistelPermutation(self.duplicates, self.seed, tweak="duplicates") if self.duplicates else None
+        offsets = self._ref_offsets
+        base, extra = divmod(self.duplicates, unique) if unique else (0, 0)
+        done = 0
+
+        def slot_number(slot: int) -> int:
+            if offsets is not None:
+                return bisect_right(offsets, slot)
+            # Even spread: the first `extra` numbers own base + 1 slots, the rest own base
+            if slot < extra * (base + 1):
+                return slot // (base + 1)
+            return extra + (slot - extra * (base + 1)) // base
+
+        def references(k: int) -> List[int]:
+            nonlocal done
+            if not k:
+                return []
+            slots = order.batch(done, done + k)
+            done += k
+            return [slot_number(slot) for slot in slots]
+
+        return references
+
+    def iter_indices(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[int]]:
+        """Unique-set index of every row, chunk by chunk"""
+        if self.strategy == "head":
+            for start in range(0, self.unique, chunk_size):
+                yield list(range(start, min(start + chunk_size, self.unique)))
+            for start in range(0, self.duplicates, chunk_size):
+                yield list(range(start, min(start + chunk_size, self.duplicates)))
+            return
+
+        rng = random.Random(self.seed)
+        references = self._reference_fn(rng)
+        random_ = rng.random
+        next_unique = 0
+        duplicates_left = self.duplicates
+        rows_left = self.total
+        for size in chunk_sizes(self.total, chunk_size):
+            # Sequential selection: row is a duplicate with probability duplicates_left / rows_left,
+            # which places exactly `duplicates` of them, every arrangement equally likely
+            is_duplicate = []
+            for draw in [random_() for _ in range(size)]:
+                duplicate = draw * rows_left < duplicates_left
+                is_duplicate.append(duplicate)
+                duplicates_left -= duplicate
+                rows_left -= 1
+            refs = iter(references(sum(is_duplicate)))
+            out = []
+            for duplicate in is_duplicate:
+                if duplicate:
+                    out.append(next(refs))
+                else:
+                    out.append(next_unique)
+                    next_unique += 1
+            yield out
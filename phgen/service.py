@@ -0,0 +1,212 @@
+"""Long-running HTTP service that streams generated rows on demand
+
+GET /<mode>?<options> takes the same options as `python -m phgen <mode>`, with
+`--` dropped (a bare key is a flag):
+
+    GET /valid?count=1000000&seed=42
+    GET /duplicate?network=Globe/TM=200&network=Smart=200&duplicates=500
+    GET /mixed?count=100000&invalid=1000&duplicates=500&placement=burst
+    GET /contacts?network=Sun=10&fast
+    GET /slice?count=100000000&invalid=1000000&seed=7&start=40000000&stop=41000000
+
+Rows go out as a chunked text/csv response while later rows are still being
+generated. The next chunk is only generated once the client has taken the
+previous one, so a slow reader holds one chunk in memory, not the whole file.
+"""
+import argparse
+import asyncio
+import os
+import random
+import stat
+import sys
+import traceback
+from typing import Iterator, List, Optional, Sequence
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from phgen.cli import DEFAULT_MAX_STREAMS, build_parser
+
+# Rows per streamed chunk unless the request sets chunk_size (smaller than files: first bytes arrive sooner)
+DEFAULT_SERVICE_CHUNK_SIZE = 10_000
+# Options that only make sense for files written by the CLI
+_FILE_OPTIONS = {"output", "processes", "registry", "report", "profile", "trace_memory", "resumable",
+                 "segment_rows"}
+# Generator modes, listed by GET /
+MODES = ["valid", "duplicate", "weighted", "invalid", "mixed", "contacts", "slice"]
+# Longest request line or header line accepted
+_MAX_LINE = 8192
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class _RequestParser(argparse.ArgumentParser):
+    """Reports bad options as ValueError instead of printing usage and exiting"""
+
+    def error(self, message: str):
+        raise ValueError(message)
+
+
+def parse_request(target: str) -> argparse.Namespace:
+    """CLI arguments for a request target such as /mixed?count=100&invalid=10"""
+    url = urlsplit(target)
+    mode = unquote(url.path).strip("/")
+    if mode not in MODES:
+        raise LookupError(f"Unknown mode: {mode} (modes: {', '.join(MODES)})")
+    argv = [mode]
+    options = parse_qsl(url.query, keep_blank_values=True)
+    for key, value in options:
+        if key in _FILE_OPTIONS:
+            raise ValueError(f"{key} is not available over HTTP")
+        argv.append("--" + key.replace("_", "-"))
+        if value:
+            argv.append(value)
+    if not any(key == "chunk_size" for key, _ in options):
+        argv += ["--chunk-size", str(DEFAULT_SERVICE_CHUNK_SIZE)]
+    args = build_parser(_RequestParser).parse_args(argv)
+    if args.seed is None:
+        # Seeded once here, so every mode gets its own stream instead of sharing the global RNG
+        args.seed = random.getrandbits(63)
+    return args
+
+
+def _encode(chunk: Sequence[str], line_ending: str) -> bytes:
+    """One HTTP chunk (size line, data, CRLF) holding the rows of `chunk`"""
+    data = (line_ending.join(chunk) + line_ending).encode()
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+def _head(status: int, headers: List[str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_STATUS[status]}", *headers, "Connection: close", "", ""]
+    return "\r\n".join(lines).encode()
+
+
+async def _send_error(writer: asyncio.StreamWriter, status: int, message: str):
+    body = (message + "\n").encode()
+    writer.write(_head(status, ["Content-Type: text/plain; charset=utf-8", f"Content-Length: {len(body)}"]) + body)
+    await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple]:
+    """(method, target) of the request, after skipping its headers; None if the client went away"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    if len(request_line) > _MAX_LINE:
+        raise ValueError("Request line too long")
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        if len(header) > _MAX_LINE:
+            raise ValueError("Header line too long")
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line")
+    return parts[0], parts[1]
+
+
+def _log_failure(args: argparse.Namespace):
+    """Report a generator that failed mid-request on stderr (the client only sees a 500 or a cut-off body)"""
+    print(f"ERROR: /{args.mode} (seed {args.seed}) failed:", file=sys.stderr)
+    traceback.print_exc()
+
+
+class GenerationService:
+    """Streams generator output to many concurrent clients
+
+    Generation runs in worker threads, so the event loop keeps accepting and
+    serving other clients. At most `max_streams` responses are generated at once;
+    further clients wait for a free slot. Backpressure comes from awaiting
+    drain() before producing the next chunk.
+    """
+
+    def __init__(self, max_streams: int = DEFAULT_MAX_STREAMS):
+        if max_streams < 1:
+            raise ValueError("max_streams must be at least 1")
+        self._slots = asyncio.Semaphore(max_streams)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await self._respond(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # The client hung up, nothing left to tell it
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await _read_request(reader)
+        except ValueError as e:
+            await _send_error(writer, 400, str(e))
+            return
+        if request is None:
+            return
+        method, target = request
+        if method != "GET":
+            await _send_error(writer, 405, "Only GET is supported")
+            return
+        try:
+            args = parse_request(target)
+        except LookupError as e:
+            await _send_error(writer, 404, str(e))
+            return
+        except ValueError as e:
+            await _send_error(writer, 400, str(e))
+            return
+
+        async with self._slots:
+            await self._stream(writer, args)
+
+    async def _stream(self, writer: asyncio.StreamWriter, args: argparse.Namespace):
+        loop = asyncio.get_running_loop()
+        line_ending = "\n" if args.mode == "contacts" else "\r\n"
+        chunks: Optional[Iterator[Sequence[str]]] = None
+        try:
+            # Generators check their arguments on the first chunk, so fetch it before committing to 200
+            try:
+                chunks = iter(await loop.run_in_executor(None, args.chunks, args))
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+            except (ValueError, ImportError) as e:
+                await _send_error(writer, 400, str(e))
+                return
+            except Exception:
+                _log_failure(args)
+                await _send_error(writer, 500, "Generation failed")
+                return
+            writer.write(_head(200, ["Content-Type: text/csv; charset=utf-8", "Transfer-Encoding: chunked",
+                                     f"X-Seed: {args.seed}"]))
+            try:
+                while chunk is not None:
+                    if chunk:
+                        writer.write(_encode(chunk, line_ending))
+                        await writer.drain()
+                    chunk = await loop.run_in_executor(None, next, chunks, None)
+            except ConnectionError:
+                raise
+            except Exception:
+                # The 200 is already out: closing without the last chunk tells the client the body is cut short
+                _log_failure(args)
+                return
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            if chunks is not None and hasattr(chunks, "close"):
+                chunks.close()
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    unix_path: Optional[str] = None,
+    max_streams: int = DEFAULT_MAX_STREAMS,
+):
+    """Run the service until cancelled, on TCP `host`:`port` or on the Unix socket `unix_path`"""
+    service = GenerationService(max_streams)
+    if unix_path is not None:
+        if os.path.exists(unix_path) and stat.S_ISSOCK(os.stat(unix_path).st_mode):
+            os.remove(unix_path)  # Left behind by an earlier run
+        server = await asyncio.start_unix_server(service.handle, unix_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    where = unix_path or ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"Serving phgen on {where} (Ctrl+C to stop)", flush=True)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,175 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from phgen.batch import SUFFIX_SPACE, format_numbers
+from phgen.stream import DEFAULT_CHUNK_SIZE
+
+# Values sorted at a time without NumPy (only one run is ever held as Python ints)
+SORT_RUN = 1 << 16
+
+
+def prefix_network_table(sim_prefixes: Dict[str, List[str]]) -> List[Optional[str]]:
+    """Network name for every 3-digit prefix (first network listing it wins)"""
+    table: List[Optional[str]] = [None] * 1000
+    for network, prefixes in sim_prefixes.items():
+        for prefix in prefixes:
+            if table[int(prefix)] is None:
+                table[int(prefix)] = network
+    return table
+
+
+def sorted_values(values: array) -> array:
+    """Sorted copy of packed values, without a Python int per value
+
+    NumPy (optional, only imported here) sorts the copy's buffer in place.
+    Otherwise runs of SORT_RUN values are sorted into packed arrays and merged,
+    so the only extra memory is the 8-byte copy plus one run.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        ordered = array('Q', values)
+        np.frombuffer(ordered, dtype=np.uint64).sort()
+        return ordered
+    runs = [array('Q', sorted(values[start:start + SORT_RUN])) for start in range(0, len(values), SORT_RUN)]
+    if len(runs) <= 1:
+        return runs[0] if runs else array('Q')
+    ordered = array('Q')
+    ordered.extend(heapq.merge(*runs))
+    return ordered
+
+
+class NumberStore:
+    """Valid numbers packed as unsigned 64-bit integers (prefix * 10^7 + suffix)
+
+    Uses 8 bytes per number instead of a Python string (plus the list around it);
+    text is only rendered when iterating chunks for the writer or indexing.
+    """
+
+    def __init__(self, values: Iterable[int] = (), country_code: str = "63"):
+        self._values = values if isinstance(values, array) and values.typecode == 'Q' else array('Q', values)
+        self.country_code = country_code
+        self._sorted: Optional[array] = None
+
+    @classmethod
+    def from_strings(cls, numbers: Iterable[str], country_code: str = "63") -> "NumberStore":
+        """Pack text numbers that start with `country_code`"""
+        skip = len(country_code)
+        return cls((int(number[skip:]) for number in numbers), country_code)
+
+    @property
+    def values(self) -> array:
+        """The packed integers (no country code)"""
+        return self._values
+
+    def extend(self, values: Iterable[int]):
+        """Append integer numbers"""
+        self._values.extend(values)
+        self._sorted = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return NumberStore(self._values[index], self.country_code)
+        return format_numbers([self._values[index]], self.country_code)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.iter_text_chunks():
+            yield from chunk
+
+    def _parse(self, number: Union[int, str]) -> Optional[int]:
+        if isinstance(number, int):
+            return number
+        if not number.startswith(self.country_code) or not number[len(self.country_code):].isdigit():
+            return None
+        return int(number[len(self.country_code):])
+
+    def __contains__(self, number: Union[int, str]) -> bool:
+        value = self._parse(number)
+        if value is None:
+            return False
+        if self._sorted is None:
+            self._sorted = sorted_values(self._values)
+        position = bisect_left(self._sorted, value)
+        return position < len(self._sorted) and self._sorted[position] == value
+
+    def unique_count(self) -> int:
+        """Number of distinct numbers"""
+        if self._sorted is None:
+            self._sorted = sorted_values(self._values)
+        ordered = self._sorted
+        return sum(1 for i in range(len(ordered)) if i == 0 or ordered[i] != ordered[i - 1])
+
+    def network_counts(self, sim_prefixes: Dict[str, List[str]], unique: bool = False) -> Dict[str, int]:
+        """Count numbers per network by their prefix (optionally counting each distinct number once)"""
+        table = prefix_network_table(sim_prefixes)
+        counts = {network: 0 for network in sim_prefixes}
+        if unique:
+            self.unique_count()
+            ordered = self._sorted
+            values: Iterable[int] = (ordered[i] for i in range(len(ordered)) if i == 0 or ordered[i] != ordered[i - 1])
+        else:
+            values = self._values
+        for value in values:
+            network = table[value // SUFFIX_SPACE % 1000]
+            if network is not None:
+                counts[network] += 1
+        return counts
+
+    def iter_text_chunks(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """Rendered text of numbers [start, stop), chunk by chunk, for write_chunks"""
+        values = self._values
+        stop = len(values) if stop is None else min(stop, len(values))
+        for chunk_start in range(start, stop, chunk_size):
+            yield format_numbers(values[chunk_start:min(chunk_start + chunk_size, stop)], self.country_code)
+
+    def with_duplicates(self, duplicates: int) -> "DuplicatedNumbers":
+        """View of the store followed by its first `duplicates` numbers again, without copying"""
+        return DuplicatedNumbers(self, duplicates)
+
+
+class DuplicatedNumbers:
+    """Read-only view: every number of a store, then the store's first `duplicates` numbers again"""
+
+    def __init__(self, store: NumberStore, duplicates: int):
+        self.store = store
+        self.duplicates = min(max(duplicates, 0), len(store))
+
+    def __len__(self) -> int:
+        return len(self.store) + self.duplicates
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("index out of range")
+        return self.store[index if index < len(self.store) else index - len(self.store)]
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.iter_text_chunks():
+            yield from chunk
+
+    def __contains__(self, number: Union[int, str]) -> bool:
+        return number in self.store
+
+    def unique_count(self) -> int:
+        """Number of distinct numbers (duplicates never add new ones)"""
+        return self.store.unique_count()
+
+    def iter_text_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[str]]:
+        """Rendered text of the store, then of the duplicated head"""
+        yield from self.store.iter_text_chunks(chunk_size)
+        yield from self.store.iter_text_chunks(chunk_size, 0, self.duplicates)
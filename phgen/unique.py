@@ -0,0 +1,264 @@
+import random
+from typing import Dict, List, Optional, Sequence
+
+from phgen.batch import SUFFIX_SPACE, format_numbers
+from phgen.checkpoint import rng_state, set_rng_state
+
+_ROUNDS = 4
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+# Halves wider than this compute the round function instead of tabulating it
+_MAX_TABLE_BITS = 16
+# Round tables shared by permutations with the same key and width (bounded)
+_TABLE_CACHE: Dict[tuple, list] = {}
+_TABLE_CACHE_SIZE = 64
+
+
+def mix64(key: int, counter: int) -> int:
+    """64 random bits as a pure function of (key, counter): the SplitMix64 output for step `counter`"""
+    z = (key + (counter + 1) * _GOLDEN) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class _RoundFunction:
+    """Round function with the same indexing interface as a lookup table"""
+
+    def __init__(self, key: int, mask: int):
+        self._key = key
+        self._mask = mask
+
+    def __getitem__(self, value: int) -> int:
+        return mix64(self._key, value) & self._mask
+
+
+class FeistelPermutation:
+    """Keyed bijection of range(size), used to walk an index space in shuffled order
+
+    A balanced Feistel network over the next even power of two, with cycle-walking
+    to stay inside `size`. Each index maps to a distinct value, so sampling
+    without replacement needs no dedupe set and no retries on collisions.
+    Each round is a SplitMix64 finalizer of (round key, half), so even a
+    20-element domain comes out thoroughly shuffled. Round functions are precomputed lookup tables when a half fits in 16 bits.
+    Permutations that only differ by `tweak` share the tables and are told apart
+    by input/output whitening, which keeps many per-prefix permutations cheap.
+    Pass `expected` (values that will be drawn) to skip tabulating when only a
+    handful are needed; the output is the same either way.
+    """
+
+    def __init__(self, size: int, key, tweak=None, expected: Optional[int] = None):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        bits = max((size - 1).bit_length(), 2)
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+        # A table costs 2^half round evaluations up front, only worth it for many draws
+        tabulate = expected is None or expected * 8 >= 1 << self._half
+        self._tables = _round_tables(key, self._half, tabulate)
+        self._in_white = self._out_white = 0
+        if tweak is not None:
+            whitening = random.Random(f"{key}:{tweak}")
+            self._in_white = whitening.getrandbits(2 * self._half)
+            self._out_white = whitening.getrandbits(2 * self._half)
+
+    def _encrypt(self, value: int) -> int:
+        half, mask = self._half, self._mask
+        value ^= self._in_white
+        left, right = value >> half, value & mask
+        for round_index, table in enumerate(self._tables):
+            if round_index % 2 == 0:
+                left ^= table[right]
+            else:
+                right ^= table[left]
+        return ((left << half) | right) ^ self._out_white
+
+    def batch(self, start: int, stop: int) -> List[int]:
+        """Permuted values for indices [start, stop), with the round loop unrolled"""
+        if start < 0 or stop > self.size:
+            raise IndexError(f"range {start}..{stop} outside permutation of size {self.size}")
+        half, mask, size = self._half, self._mask, self.size
+        in_white, out_white = self._in_white, self._out_white
+        t0, t1, t2, t3 = self._tables
+        out = []
+        append = out.append
+        for value in range(start, stop):
+            while True:
+                value ^= in_white
+                left, right = value >> half, value & mask
+                left ^= t0[right]
+                right ^= t1[left]
+                left ^= t2[right]
+                right ^= t3[left]
+                value = ((left << half) | right) ^ out_white
+                if value < size:
+                    break
+            append(value)
+        return out
+
+    def __call__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"index {index} outside permutation of size {self.size}")
+        value = self._encrypt(index)
+        while value >= self.size:  # cycle-walk back into range, at most a few steps on average
+            value = self._encrypt(value)
+        return value
+
+
+def _round_tables(key, half: int, tabulate: bool = True) -> list:
+    """Round functions for `key` at width `half`, tabulated when small enough"""
+    tabulate = tabulate and half <= _MAX_TABLE_BITS
+    cache_key = (key, half, tabulate)
+    tables = _TABLE_CACHE.get(cache_key)
+    if tables is not None:
+        return tables
+    rng = random.Random(key)
+    mask = (1 << half) - 1
+    tables = []
+    for _ in range(_ROUNDS):
+        round_key = rng.getrandbits(64)
+        if tabulate:
+            tables.append([mix64(round_key, value) & mask for value in range(mask + 1)])
+        else:
+            tables.append(_RoundFunction(round_key, mask))
+    if len(_TABLE_CACHE) >= _TABLE_CACHE_SIZE:
+        _TABLE_CACHE.clear()
+    _TABLE_CACHE[cache_key] = tables
+    return tables
+
+
+def unique_prefixes(prefixes: Sequence[str]) -> List[str]:
+    """Drop repeated prefixes, keeping first-seen order"""
+    return list(dict.fromkeys(prefixes))
+
+
+class UniquePermutation:
+    """Shuffled, duplicate-free view of every number under `prefixes`
+
+    Index i always maps to the same number for a given seed, and distinct
+    indices never collide, so row ranges can be produced independently.
+    """
+
+    def __init__(self, prefixes: Sequence[str], seed: int):
+        self.prefixes = unique_prefixes(prefixes)
+        if not self.prefixes:
+            raise ValueError("At least one prefix is required")
+        self.capacity = len(self.prefixes) * SUFFIX_SPACE
+        self._bases = [int(prefix) * SUFFIX_SPACE for prefix in self.prefixes]
+        self._permute = FeistelPermutation(self.capacity, seed)
+
+    def values(self, start: int, stop: int) -> List[int]:
+        """Integer numbers (prefix * 10^7 + suffix) for indices [start, stop)"""
+        if stop > self.capacity:
+            raise ValueError(
+                f"Requested {stop} unique numbers but the selected prefixes only hold {self.capacity}"
+            )
+        bases = self._bases
+        return [bases[v // SUFFIX_SPACE] + v % SUFFIX_SPACE for v in self._permute.batch(start, stop)]
+
+    def values_at(self, indices: Sequence[int]) -> List[int]:
+        """Integer numbers for arbitrary indices (e.g. to repeat earlier rows)"""
+        bases, permute = self._bases, self._permute
+        return [bases[v // SUFFIX_SPACE] + v % SUFFIX_SPACE for v in map(permute, indices)]
+
+    def numbers(self, start: int, stop: int, country_code: str = "63") -> List[str]:
+        """Text numbers for indices [start, stop)"""
+        return format_numbers(self.values(start, stop), country_code)
+
+
+class UniqueNumberSampler:
+    """Draws numbers without replacement, prefix by prefix
+
+    Every prefix keeps a counter into its own keyed permutation of the 10^7
+    suffixes, so state is O(number of prefixes) no matter how many numbers
+    are issued. Prefixes shared between networks share one counter.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._used: Dict[str, int] = {}
+        self._permutations: Dict[str, FeistelPermutation] = {}
+
+    def getstate(self) -> dict:
+        """JSON-ready position of the sampler (its RNG and the per-prefix counters)"""
+        return {"rng": rng_state(self._rng), "used": dict(self._used)}
+
+    def setstate(self, state: dict):
+        """Continue from a position saved by getstate (same seed)"""
+        set_rng_state(self._rng, state["rng"])
+        self._used = dict(state["used"])
+
+    def remaining(self, prefixes: Sequence[str]) -> int:
+        """Numbers still available under `prefixes`"""
+        return sum(SUFFIX_SPACE - self._used.get(prefix, 0) for prefix in unique_prefixes(prefixes))
+
+    def _permutation(self, prefix: str) -> FeistelPermutation:
+        permute = self._permutations.get(prefix)
+        if permute is None:
+            permute = self._permutations[prefix] = FeistelPermutation(SUFFIX_SPACE, self._seed, tweak=prefix)
+        return permute
+
+    def _next_value(self, prefix: str) -> int:
+        used = self._used.get(prefix, 0)
+        self._used[prefix] = used + 1
+        return int(prefix) * SUFFIX_SPACE + self._permutation(prefix)(used)
+
+    def _take(self, row_prefixes: Sequence[str], counts: Dict[str, int]) -> List[int]:
+        """_next_value for every entry of `row_prefixes`, one permutation batch per prefix (all must have room)"""
+        runs = {}
+        for prefix, needed in counts.items():
+            used = self._used.get(prefix, 0)
+            base = int(prefix) * SUFFIX_SPACE
+            runs[prefix] = iter([base + v for v in self._permutation(prefix).batch(used, used + needed)])
+            self._used[prefix] = used + needed
+        return [next(runs[prefix]) for prefix in row_prefixes]
+
+    def draw(self, prefixes: Sequence[str], count: int) -> List[int]:
+        """Draw `count` unused numbers, choosing prefixes like random.choice(prefixes)"""
+        if count <= 0:
+            return []
+        available = self.remaining(prefixes)
+        if count > available:
+            raise ValueError(
+                f"Requested {count} unique numbers but prefixes {unique_prefixes(prefixes)} "
+                f"only have {available} left"
+            )
+        drawn = self._rng.choices(prefixes, k=count)
+        counts: Dict[str, int] = {}
+        for prefix in drawn:
+            counts[prefix] = counts.get(prefix, 0) + 1
+        if all(self._used.get(prefix, 0) + needed <= SUFFIX_SPACE for prefix, needed in counts.items()):
+            return self._take(drawn, counts)
+        values = []
+        for prefix in drawn:
+            if self._used.get(prefix, 0) >= SUFFIX_SPACE:
+                # Prefix exhausted, move the row to one that still has room
+                prefix = self._rng.choice([p for p in prefixes if self._used.get(p, 0) < SUFFIX_SPACE])
+            values.append(self._next_value(prefix))
+        return values
+
+    def draw_for(self, row_prefixes: Sequence[str]) -> List[int]:
+        """Draw one unused number per entry of `row_prefixes`"""
+        counts: Dict[str, int] = {}
+        for prefix in row_prefixes:
+            counts[prefix] = counts.get(prefix, 0) + 1
+        for prefix, needed in counts.items():
+            if needed > SUFFIX_SPACE - self._used.get(prefix, 0):
+                raise ValueError(f"Prefix {prefix} has no room for {needed} more unique numbers")
+        return self._take(row_prefixes, counts)
+
+
+def generate_unique_ph_numbers(
+    prefixes: Sequence[str],
+    count: int,
+    seed: Optional[int] = None,
+    country_code: str = "63",
+) -> List[str]:
+    """Generate `count` guaranteed-unique numbers spread over `prefixes`"""
+    if seed is None:
+        seed = random.getrandbits(64)
+    return UniquePermutation(prefixes, seed).numbers(0, count, country_code)
@@ -0,0 +1,61 @@
+import random
+from typing import Iterator, List, Optional
+
+from phgen.batch import draw_numbers, format_numbers, generate_ph_numbers
+from phgen.prefixes import all_network_prefixes
+from phgen.registry import NumberRegistry, draw_unissued
+from phgen.store import NumberStore
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes
+from phgen.unique import UniquePermutation
+
+
+def generate_mixed_numbers(total_numbers: int, registry: Optional[NumberRegistry] = None) -> List[str]:
+    """Generate numbers from ALL networks (randomly mixed)
+
+    With a `registry`, numbers issued by earlier runs are skipped and the new ones recorded.
+    """
+    if registry is not None:
+        return format_numbers(draw_unissued(all_network_prefixes(), total_numbers, registry))
+    # Draw every prefix and suffix in one batch, text is only built at the end
+    return generate_ph_numbers(all_network_prefixes(), total_numbers)
+
+
+def generate_number_store(total_numbers: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> NumberStore:
+    """Same as generate_mixed_numbers, but packed as 64-bit integers (about 8 bytes per number)"""
+    all_prefixes = all_network_prefixes()
+    store = NumberStore()
+    for size in chunk_sizes(total_numbers, chunk_size):
+        store.extend(draw_numbers(all_prefixes, size))
+    return store
+
+
+def iter_mixed_numbers(
+    total_numbers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rng: Optional[random.Random] = None,
+    registry: Optional[NumberRegistry] = None,
+) -> Iterator[List[str]]:
+    """Streaming version of generate_mixed_numbers, yields chunks of at most `chunk_size` numbers"""
+    all_prefixes = all_network_prefixes()
+    for size in chunk_sizes(total_numbers, chunk_size):
+        if registry is not None:
+            yield format_numbers(draw_unissued(all_prefixes, size, registry, rng))
+        else:
+            yield generate_ph_numbers(all_prefixes, size, rng)
+
+
+def iter_number_rows(start: int, stop: int, rng: random.Random) -> Iterator[List[str]]:
+    """Rows [start, stop) of a sharded job (every row is an independent random number)"""
+    return iter_mixed_numbers(stop - start, rng=rng)
+
+
+def iter_unique_rows(start: int, stop: int, rng: random.Random, seed: int) -> Iterator[List[str]]:
+    """Rows [start, stop) of a file that never repeats a number (all shards share `seed`)"""
+    permutation = UniquePermutation(all_network_prefixes(), seed)
+    for chunk_start in range(start, stop, DEFAULT_CHUNK_SIZE):
+        yield permutation.numbers(chunk_start, min(chunk_start + DEFAULT_CHUNK_SIZE, stop))
+
+
+def iter_unique_file_rows(start: int, stop: int, rng: random.Random) -> Iterator[List[str]]:
+    """Rows [start, stop) of a unique-number file keyed by its own shard RNG"""
+    return iter_unique_rows(start, stop, rng, rng.getrandbits(64))
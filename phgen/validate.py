@@ -0,0 +1,196 @@
+import mmap
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from phgen.store import prefix_network_table
+
+# Bytes read from the mapped file per block
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Accepted forms: 63XXXXXXXXXX, 0XXXXXXXXXX and +63XXXXXXXXXX (X = 3-digit prefix + 7 digits)
+NUMBER_FORMS = ("63", "0", "+63")
+
+
+class PrefixClassifier:
+    """O(1) prefix -> network lookup for every accepted number form
+
+    Heads such as "63905", "0905" and "+63905" are precomputed into one dict, so a
+    number is classified with a length check, one dict lookup and one isdigit call.
+    """
+
+    def __init__(self, sim_prefixes: Dict[str, List[str]]):
+        self.networks = list(sim_prefixes)
+        self._table = prefix_network_table(sim_prefixes)
+        self._heads: Dict[bytes, str] = {}
+        self._head_length: Dict[int, int] = {}
+        for prefix_value, network in enumerate(self._table):
+            if network is None:
+                continue
+            for form in NUMBER_FORMS:
+                head = f"{form}{prefix_value:03d}".encode()
+                self._heads[head] = network
+                self._head_length[len(form) + 10] = len(head)
+
+    def network(self, prefix: str) -> Optional[str]:
+        """Network for a 3-digit prefix, or None"""
+        if len(prefix) != 3 or not prefix.isdigit():
+            return None
+        return self._table[int(prefix)]
+
+    def classify(self, number: bytes) -> Tuple[Optional[str], Optional[str]]:
+        """(network, None) for a valid number, (None, reason) otherwise"""
+        head_length = self._head_length.get(len(number))
+        if head_length is not None:
+            network = self._heads.get(number[:head_length])
+            if network is not None and number[head_length:].isdigit():
+                return network, None
+        return None, self._reason(number)
+
+    def network_of(self, number: bytes) -> Optional[str]:
+        """Network of a valid number, None otherwise (classify() without explaining invalid rows)"""
+        head_length = self._head_length.get(len(number))
+        if head_length is not None:
+            network = self._heads.get(number[:head_length])
+            if network is not None and number[head_length:].isdigit():
+                return network
+        return None
+
+    def _reason(self, number: bytes) -> str:
+        """Explain why `number` is not valid (slow path, invalid rows only)"""
+        if not number:
+            return "empty"
+        body = number[1:] if number.startswith(b"+") else number
+        if not body.isdigit():
+            return "non-digit characters"
+        if number.startswith(b"+") and not number.startswith(b"+63"):
+            return "wrong country code"
+        if number.startswith(b"63") or number.startswith(b"+63"):
+            form = b"+63" if number.startswith(b"+") else b"63"
+        elif number.startswith(b"0"):
+            form = b"0"
+        else:
+            return "wrong country code"
+        if len(number) != len(form) + 10:
+            return "wrong length"
+        return "unknown prefix"
+
+    def classify_text(self, number: str) -> Tuple[Optional[str], Optional[str]]:
+        """classify() for a str"""
+        return self.classify(number.strip().encode())
+
+
+class ValidationSummary(NamedTuple):
+    rows: int
+    valid: int
+    invalid: int
+    network_counts: Dict[str, int]
+    reason_counts: Dict[str, int]
+
+
+def iter_file_lines(
+    path: str, block_size: int = DEFAULT_BLOCK_SIZE, start: int = 0, stop: Optional[int] = None
+) -> Iterator[List[bytes]]:
+    """Memory-map `path` and yield its lines block by block (line endings stripped)
+
+    `start`/`stop` restrict it to a byte range that begins and ends on line boundaries
+    (see line_ranges), so several workers can share one file.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        size = len(mapped) if stop is None else min(stop, len(mapped))
+        while start < size:
+            end = min(start + block_size, size)
+            if end < size:
+                newline = mapped.rfind(b"\n", start, end)
+                if newline < start:  # a single line longer than the block
+                    newline = mapped.find(b"\n", end, size)
+                end = size if newline < 0 else newline + 1
+            lines = mapped[start:end].split(b"\n")
+            if lines and not lines[-1]:
+                lines.pop()
+            yield [line[:-1] if line.endswith(b"\r") else line for line in lines]
+            start = end
+
+
+def line_ranges(path: str, range_size: int) -> List[Tuple[int, int]]:
+    """Split `path` into byte ranges of about `range_size` that start and end on line boundaries"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        while start < size:
+            newline = mapped.find(b"\n", min(start + range_size, size) - 1)
+            end = size if newline < 0 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_first_line(path: str) -> bytes:
+    """First line of `path` without its line ending (b"" for an empty file)"""
+    with open(path, 'rb') as f:
+        return f.readline().rstrip(b"\r\n")
+
+
+def detect_column(first_line: bytes) -> Tuple[Optional[bytes], int]:
+    """(delimiter, column) for the number: pipe files keep it in column 4 (Book1.csv layout)"""
+    if b"|" in first_line:
+        return b"|", 3
+    if b"," in first_line:
+        return b",", 0
+    return None, 0
+
+
+def extract_numbers(lines: List[bytes], delimiter: Optional[bytes], column: int) -> List[bytes]:
+    """The number field of every line (quotes and spaces stripped, b"" when the column is missing)"""
+    if delimiter is None:
+        return [line.strip(b'" ') for line in lines]
+    return [line.split(delimiter)[column].strip(b'" ') if line.count(delimiter) >= column else b""
+            for line in lines]
+
+
+def validate_file(
+    path: str,
+    classifier: PrefixClassifier,
+    report_path: Optional[str] = None,
+    column: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> ValidationSummary:
+    """Validate every row of a CSV or pipe file, optionally writing a per-row report
+
+    Report rows are `number,valid,<network>` or `number,invalid,<reason>` in input order.
+    """
+    network_counts = {network: 0 for network in classifier.networks}
+    reason_counts: Dict[str, int] = {}
+    rows = valid = 0
+    delimiter: Optional[bytes] = None
+    classify = classifier.classify
+    report = open(report_path, 'wb', buffering=DEFAULT_BLOCK_SIZE) if report_path else None
+    try:
+        for lines in iter_file_lines(path, block_size):
+            if rows == 0 and lines:
+                delimiter, detected = detect_column(lines[0])
+                column = detected if column is None else column
+            numbers = extract_numbers(lines, delimiter, column)
+            out = []
+            for number in numbers:
+                network, reason = classify(number)
+                if network is not None:
+                    network_counts[network] += 1
+                    valid += 1
+                    if report:
+                        out.append(b"%s,valid,%s" % (number, network.encode()))
+                else:
+                    reason_counts[reason] = reason_counts.get(reason, 0) + 1
+                    if report:
+                        out.append(b"%s,invalid,%s" % (number, reason.encode()))
+            rows += len(numbers)
+            if report and out:
+                report.write(b"\r\n".join(out) + b"\r\n")
+    finally:
+        if report:
+            report.close()
+    return ValidationSummary(rows, valid, rows - valid, network_counts, reason_counts)
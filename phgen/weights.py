@@ -0,0 +1,237 @@
+import random
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from phgen.batch import generate_ph_numbers_for
+from phgen.instrument import current_stats, timed
+from phgen.prefixes import SIM_PREFIXES
+from phgen.shard import derive_seed
+from phgen.store import prefix_network_table
+from phgen.stream import DEFAULT_CHUNK_SIZE, chunk_sizes
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per draw whatever the weights
+
+    Every column holds its own outcome up to a threshold and one alias above it,
+    so a draw is one 64-bit random number, a modulo and a comparison.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive total")
+        scaled = [weight * n / total for weight in weights]
+        probability = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            probability[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Whatever is left over is 1.0 up to rounding and keeps its own column
+        self.n = n
+        self.alias = alias
+        # Compared against the 64-bit draw divided by n, so no float work per row
+        span = (1 << 64) // n
+        self._limits = [int(p * span) for p in probability]
+
+    def sample(self, rng: random.Random, count: int) -> List[int]:
+        """`count` outcome indices, from one batch of random bytes"""
+        if count <= 0:
+            return []
+        n, alias, limits = self.n, self.alias, self._limits
+        raw = array('Q', rng.randbytes(8 * count))
+        return [k if x // n < limits[k] else alias[k] for x in raw for k in (x % n,)]
+
+
+def apportion(weights: Sequence[float], total: int) -> List[int]:
+    """Split `total` in proportion to `weights` (largest remainder, ties go to the earlier entry)
+
+    Integer weights are split with exact integer arithmetic.
+    """
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    if all(isinstance(weight, int) for weight in weights):
+        shares = [divmod(total * weight, weight_sum) for weight in weights]
+    else:
+        exact = [total * weight / weight_sum for weight in weights]
+        shares = [(int(share), share - int(share)) for share in exact]
+    counts = [share for share, _ in shares]
+    leftover = total - sum(counts)
+    for i in sorted(range(len(weights)), key=lambda i: -shares[i][1])[:leftover]:
+        counts[i] += 1
+    return counts
+
+
+def split_quotas(quotas: Sequence[int], part_sizes: Sequence[int]) -> Iterator[List[int]]:
+    """Split exact `quotas` over consecutive parts (chunks or shards), each part in proportion
+
+    Part by part, the part's rows are apportioned by what is still owed, so every
+    quota is met exactly when the parts add up to the quotas' total.
+    """
+    remaining = list(quotas)
+    if sum(part_sizes) != sum(remaining):
+        raise ValueError(f"Parts hold {sum(part_sizes)} rows but the quotas add up to {sum(remaining)}")
+    for size in part_sizes:
+        counts = apportion(remaining, size)
+        remaining = [left - count for left, count in zip(remaining, counts)]
+        yield counts
+
+
+class NetworkWeights:
+    """Sampling weight of every prefix, from per-network and per-prefix weights (e.g. market share)
+
+    Prefixes are de-duplicated like prefix_network_table: a prefix listed under
+    several networks belongs to the first one (946 is Smart, not TNT) and a
+    prefix listed twice counts once (932 under Sun), so the generated numbers
+    are counted back to the network they were drawn for. A network's weight is
+    shared by its prefixes in proportion to their prefix weights (1 each by
+    default); networks left out of `network_weights` get no rows. Without
+    network weights every prefix weighs its prefix weight.
+    """
+
+    def __init__(
+        self,
+        network_weights: Optional[Dict[str, float]] = None,
+        prefix_weights: Optional[Dict[str, float]] = None,
+        sim_prefixes: Dict[str, List[str]] = SIM_PREFIXES,
+    ):
+        prefix_weights = prefix_weights or {}
+        owners = prefix_network_table(sim_prefixes)
+        self.networks = list(sim_prefixes)
+        for network in network_weights or {}:
+            if network not in sim_prefixes:
+                raise ValueError(f"Unknown network: {network}")
+        for prefix, weight in prefix_weights.items():
+            if not prefix.isdigit() or len(prefix) != 3 or owners[int(prefix)] is None:
+                raise ValueError(f"Unknown prefix: {prefix}")
+            if weight < 0:
+                raise ValueError(f"Prefix weight must not be negative, got {prefix}={weight}")
+
+        self.prefixes: List[str] = []
+        self.weights: List[float] = []
+        self._network_index: List[int] = []
+        for index, network in enumerate(self.networks):
+            owned = [prefix for prefix in dict.fromkeys(sim_prefixes[network]) if owners[int(prefix)] == network]
+            relative = [prefix_weights.get(prefix, 1) for prefix in owned]
+            if network_weights is None:
+                weights = relative
+            else:
+                share = network_weights.get(network, 0)
+                if share < 0:
+                    raise ValueError(f"Network weight must not be negative, got {network}={share}")
+                if share and not sum(relative):
+                    raise ValueError(f"{network} has weight {share} but no prefixes of its own to draw from")
+                weights = [share * weight / sum(relative) for weight in relative] if share else [0] * len(owned)
+            for prefix, weight in zip(owned, weights):
+                if weight:
+                    self.prefixes.append(prefix)
+                    self.weights.append(weight)
+                    self._network_index.append(index)
+        if not self.prefixes:
+            raise ValueError("At least one prefix needs a positive weight")
+        self._alias: Optional[AliasTable] = None
+
+    def shares(self) -> Dict[str, float]:
+        """Fraction of the rows each network gets"""
+        total = sum(self.weights)
+        return self.network_counts([weight / total for weight in self.weights])
+
+    def quotas(self, total: int) -> List[int]:
+        """Exact row count per prefix (in self.prefixes order) for a file of `total` rows"""
+        return apportion(self.weights, total)
+
+    def network_counts(self, prefix_counts: Sequence[float]) -> Dict[str, int]:
+        """Per-prefix counts folded into per-network counts (a histogram without touching any rows)"""
+        counts = dict.fromkeys(self.networks, 0)
+        for index, count in zip(self._network_index, prefix_counts):
+            counts[self.networks[index]] += count
+        return counts
+
+    def iter_chunk_counts(
+        self,
+        total: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rng: Optional[random.Random] = None,
+        exact: bool = True,
+    ) -> Iterator[List[int]]:
+        """Per-prefix row counts of each chunk of a `total`-row file
+
+        exact: the file meets quotas(total) and every chunk is in proportion;
+        otherwise every row is an independent draw from the alias table.
+        """
+        if exact:
+            yield from split_quotas(self.quotas(total), list(chunk_sizes(total, chunk_size)))
+            return
+        if self._alias is None:
+            self._alias = AliasTable(self.weights)
+        for size in chunk_sizes(total, chunk_size):
+            drawn = Counter(self._alias.sample(rng or random, size))
+            yield [drawn.get(index, 0) for index in range(len(self.prefixes))]
+
+    def row_prefixes(self, counts: Sequence[int], rng: Optional[random.Random] = None) -> List[str]:
+        """One prefix per row for the given per-prefix counts, shuffled when `rng` is given"""
+        rows = [prefix for prefix, count in zip(self.prefixes, counts) for _ in range(count)]
+        if rng is not None:
+            rng.shuffle(rows)
+        return rows
+
+    def iter_numbers(
+        self,
+        total: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rng: Optional[random.Random] = None,
+        exact: bool = True,
+        histogram: Optional[Dict[str, int]] = None,
+        country_code: str = "63",
+    ) -> Iterator[List[str]]:
+        """Stream `total` weighted numbers; per-network counts are added to `histogram` as chunks go out"""
+        rng = rng or random.Random()
+        stats = current_stats()
+        for counts in timed(self.iter_chunk_counts(total, chunk_size, rng, exact), "prefix"):
+            if histogram is not None:
+                for network, count in self.network_counts(counts).items():
+                    histogram[network] = histogram.get(network, 0) + count
+            if stats is not None:
+                with stats.stage("prefix", sum(counts)):
+                    rows = self.row_prefixes(counts, rng)
+            else:
+                rows = self.row_prefixes(counts, rng)
+            yield generate_ph_numbers_for(rows, rng, country_code)
+
+    def iter_rows(
+        self,
+        start: int,
+        stop: int,
+        rng: random.Random,
+        total: int,
+        seed: int,
+        exact: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[List[str]]:
+        """Rows [start, stop) of a sharded `total`-row file (all shards share `seed`)
+
+        With exact quotas the prefix of row r depends only on `seed` and r, so the
+        file meets quotas(total) however it is split across shards.
+        """
+        if not exact:
+            for counts in self.iter_chunk_counts(stop - start, chunk_size, rng, exact=False):
+                yield generate_ph_numbers_for(self.row_prefixes(counts, rng), rng)
+            return
+        chunk_start = 0
+        for chunk, counts in enumerate(self.iter_chunk_counts(total, chunk_size)):
+            chunk_stop = chunk_start + sum(counts)
+            if chunk_stop > start:
+                # Shuffled with the chunk's own seed, so a chunk split between shards agrees on its order
+                rows = self.row_prefixes(counts, random.Random(derive_seed(seed, chunk)))
+                yield generate_ph_numbers_for(rows[max(start - chunk_start, 0):stop - chunk_start], rng)
+            if chunk_stop >= stop:
+                break
+            chunk_start = chunk_stop
@@ -0,0 +1,95 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from phgen.stream import compression_for, write_chunks
+
+# Writer threads: encoding, compression and disk writes run here, off the generating thread
+DEFAULT_WRITER_THREADS = 4
+# Chunks buffered per file before the generator has to wait for its writer
+DEFAULT_QUEUE_SIZE = 4
+
+# Queue markers: end of file, or generation failed and the file must be dropped
+_DONE = object()
+_ABORT = object()
+
+FileJob = Tuple[str, Iterable[Sequence[str]]]
+
+
+class _Aborted(Exception):
+    """The generating thread failed part-way through a file"""
+
+
+def _drain(chunks: "queue.Queue") -> Iterator[Sequence[str]]:
+    """Chunks put on the queue until the end marker"""
+    while True:
+        chunk = chunks.get()
+        if chunk is _DONE:
+            return
+        if chunk is _ABORT:
+            raise _Aborted
+        yield chunk
+
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _write_queued(filename: str, chunks: "queue.Queue", line_ending: str, trailing_newline: bool,
+                  compression: Optional[str]) -> int:
+    """Worker: write one file from its queue to `filename`.tmp, then move it into place"""
+    if compression == "auto":
+        compression = compression_for(filename)
+    tmp_name = f"{filename}.tmp"
+    try:
+        rows = write_chunks(tmp_name, _drain(chunks), line_ending, trailing_newline, compression=compression)
+    except _Aborted:
+        _discard(tmp_name)
+        raise
+    except BaseException:
+        # Keep consuming so the generating thread never blocks on a dead writer
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE or chunk is _ABORT:
+                break
+        _discard(tmp_name)
+        raise
+    os.replace(tmp_name, filename)
+    return rows
+
+
+def write_files(
+    jobs: Iterable[FileJob],
+    threads: int = DEFAULT_WRITER_THREADS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    line_ending: str = "\r\n",
+    trailing_newline: bool = True,
+    compression: Optional[str] = "auto",
+) -> List[int]:
+    """Write many files while the next rows are generated, return the row count of each
+
+    Chunks are generated on the calling thread and handed to a bounded pool of writer
+    threads through per-file queues of `queue_size` chunks, so at most about
+    `threads + 1` files are in memory at once. zlib and lzma release the GIL, so
+    compression runs alongside generation. Files appear under their final name only
+    once complete.
+    """
+    if threads < 1:
+        raise ValueError("threads must be at least 1")
+    futures = []
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for filename, chunks in jobs:
+            pending: queue.Queue = queue.Queue(maxsize=queue_size)
+            futures.append(pool.submit(_write_queued, filename, pending, line_ending, trailing_newline, compression))
+            try:
+                for chunk in chunks:
+                    if futures[-1].done():  # The writer failed, stop generating for it
+                        break
+                    pending.put(chunk)
+            except BaseException:
+                pending.put(_ABORT)
+                raise
+            pending.put(_DONE)
+    return [future.result() for future in futures]
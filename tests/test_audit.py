@@ -0,0 +1,80 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from phgen import audit
+from phgen.audit import audit_files, collect_paths
+from phgen.prefixes import SIM_PREFIXES
+from phgen.validate import PrefixClassifier
+
+FORMS = ("63", "0", "+63")
+
+
+def _key(number: str, classifier: PrefixClassifier) -> str:
+    """Naive identity of a row: the last 10 digits of a valid number in any form, else its text"""
+    return number[-10:] if classifier.network_of(number.encode()) else "text:" + number
+
+
+@pytest.fixture
+def files(tmp_path):
+    rng = random.Random(5)
+    prefixes = [prefix for prefixes in SIM_PREFIXES.values() for prefix in prefixes]
+    pool = [f"{rng.choice(prefixes)}{rng.randrange(10 ** 7):07d}" for _ in range(3000)]
+    contents = {}
+    for index in range(4):
+        rows = []
+        for _ in range(rng.randrange(500, 2500)):
+            if rng.random() < 0.05:
+                rows.append(rng.choice(["6390abc", "12345", "", "639999999999"]))
+            else:
+                rows.append(rng.choice(FORMS) + rng.choice(pool))
+        path = tmp_path / f"numbers_{index}.csv"
+        path.write_text("\r\n".join(rows) + "\r\n")
+        contents[str(path)] = rows
+    # Book1.csv layout: the number is column 4 of a pipe-delimited row
+    rows = [rng.choice(FORMS) + rng.choice(pool) for _ in range(800)]
+    path = tmp_path / "contacts.csv"
+    path.write_text("\n".join(f"Ana|B|Cruz|{number}|Acme|Clerk|IT|a@b.com|1 Road, City" for number in rows))
+    contents[str(path)] = rows
+    return contents
+
+
+def test_exact_audit_matches_naive_sets(files, monkeypatch):
+    monkeypatch.setattr(audit, "RANGE_BYTES", 4096)  # Many ranges per file
+    classifier = PrefixClassifier(SIM_PREFIXES)
+    paths = sorted(files)
+    report = audit_files(paths, processes=2, partitions=3)
+    keys = {path: [_key(number, classifier) for number in files[path]] for path in paths}
+    seen = Counter(key for path in paths for key in set(keys[path]))
+
+    assert report.rows == sum(len(rows) for rows in files.values())
+    assert report.distinct == len(set().union(*map(set, keys.values())))
+    assert report.duplicate_rows == report.rows - report.distinct
+    assert report.cross_file_numbers == sum(1 for count in seen.values() if count > 1)
+    for audited in report.files:
+        rows = keys[audited.path]
+        assert audited.rows == len(rows)
+        assert audited.valid == sum(1 for key in rows if not key.startswith("text:"))
+        assert audited.distinct == len(set(rows))
+        assert audited.shared == sum(1 for key in set(rows) if seen[key] > 1)
+    for first, second in combinations(paths, 2):
+        shared = len(set(keys[first]) & set(keys[second]))
+        assert report.overlaps.get((first, second), 0) == shared
+
+
+def test_estimate_is_close(files):
+    paths = sorted(files)
+    exact = audit_files(paths, processes=1)
+    estimate = audit_files(paths, processes=1, estimate=True)
+    assert estimate.estimated and estimate.rows == exact.rows
+    assert abs(estimate.distinct - exact.distinct) <= 0.05 * exact.distinct
+    for approx, audited in zip(estimate.files, exact.files):
+        assert approx.valid == audited.valid
+        assert abs(approx.distinct - audited.distinct) <= 0.05 * audited.distinct
+
+
+def test_missing_path_is_a_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        collect_paths([str(tmp_path / "missing")])
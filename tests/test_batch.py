@@ -0,0 +1,60 @@
+import random
+import re
+
+import pytest
+
+from phgen.batch import draw_numbers, format_numbers, generate_ph_numbers, generate_ph_numbers_for
+from phgen.prefixes import SIM_PREFIXES, all_network_prefixes
+from phgen.valid import generate_mixed_numbers
+
+_VALID_PREFIXES = set(all_network_prefixes())
+
+
+def _is_valid(number, head="63"):
+    return (re.fullmatch(re.escape(head) + r"\d{10}", number) is not None
+            and number[len(head):len(head) + 3] in _VALID_PREFIXES)
+
+
+def test_mixed_numbers_format():
+    numbers = generate_mixed_numbers(20_000)
+    assert len(numbers) == 20_000
+    assert all(len(number) == 12 and _is_valid(number) for number in numbers)
+    # Every prefix shows up: prefixes and suffixes come from one draw without skewing either
+    assert {number[2:5] for number in numbers} == _VALID_PREFIXES
+    assert len({number[5:] for number in numbers}) > 19_000
+
+
+@pytest.mark.parametrize("country_code", ["63", "0", "+63"])
+def test_country_codes(country_code):
+    numbers = generate_ph_numbers(SIM_PREFIXES["Sun"], 3000, random.Random(1), country_code)
+    assert all(_is_valid(number, country_code) for number in numbers)
+    assert {number[len(country_code):len(country_code) + 3] for number in numbers} == set(SIM_PREFIXES["Sun"])
+
+
+def test_same_seed_same_numbers():
+    prefixes = all_network_prefixes()
+    first = generate_ph_numbers(prefixes, 5000, random.Random(7))
+    assert generate_ph_numbers(prefixes, 5000, random.Random(7)) == first
+    assert generate_ph_numbers(prefixes, 5000, random.Random(8)) != first
+    # The packed draw is the same numbers before formatting
+    assert format_numbers(draw_numbers(prefixes, 5000, random.Random(7))) == first
+    random.seed(3)
+    seeded = generate_mixed_numbers(1000)
+    random.seed(3)
+    assert generate_mixed_numbers(1000) == seeded
+
+
+def test_numbers_for_given_prefixes():
+    row_prefixes = ["917", "922", "917", "999"]
+    numbers = generate_ph_numbers_for(row_prefixes, random.Random(2))
+    assert [number[2:5] for number in numbers] == row_prefixes
+    assert all(re.fullmatch(r"63\d{10}", number) for number in numbers)
+    assert [number[1:4] for number in generate_ph_numbers_for(row_prefixes, random.Random(2), "0")] == row_prefixes
+
+
+def test_empty_and_bad_arguments():
+    assert generate_ph_numbers(SIM_PREFIXES["Smart"], 0) == [] and draw_numbers(SIM_PREFIXES["Smart"], -1) == []
+    with pytest.raises(ValueError):
+        generate_ph_numbers([], 10)
+    with pytest.raises(ValueError):
+        draw_numbers([], 10)
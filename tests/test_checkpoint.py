@@ -0,0 +1,95 @@
+import gzip
+import os
+
+import pytest
+
+from phgen.checkpoint import checkpoint_path, load_checkpoint, run_resumable
+from phgen.duplicates import ResumableDistribution, iter_numbers_with_distribution
+from phgen.stream import collect
+
+COUNTS = {"Smart": 3000, "Sun": 1200, "Globe/TM": 800}
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingSource:
+    """Passes through a source, raising after `takes` take() calls like a killed run"""
+
+    def __init__(self, source, takes):
+        self._source = source
+        self._takes = takes
+        self.total = source.total
+
+    def take(self, count):
+        if self._takes == 0:
+            raise Crash()
+        self._takes -= 1
+        return self._source.take(count)
+
+    def getstate(self):
+        return self._source.getstate()
+
+    def setstate(self, state):
+        self._source.setstate(state)
+
+
+def _write(path, source, job, **options):
+    return run_resumable(str(path), source, job, segment_rows=700, chunk_size=256, **options)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".csv.gz"])
+@pytest.mark.parametrize("crashes", [[3], [1, 5, 9], [0, 0, 20]])
+def test_resumed_run_is_byte_identical(tmp_path, suffix, crashes):
+    job = {"networks": COUNTS, "duplicates": 900, "seed": 12}
+    reference = tmp_path / f"reference{suffix}"
+    assert _write(reference, ResumableDistribution(COUNTS, 900, 12), job) == 5900
+
+    target = tmp_path / f"resumed{suffix}"
+    committed = False
+    for takes in crashes:
+        with pytest.raises(Crash):
+            _write(target, CrashingSource(ResumableDistribution(COUNTS, 900, 12), takes), job)
+        # A segment is 3 takes: a crash inside the first one leaves nothing to resume
+        committed = committed or takes >= 3
+        assert os.path.exists(checkpoint_path(str(target))) == committed
+    assert _write(target, ResumableDistribution(COUNTS, 900, 12), job) == 5900
+    assert target.read_bytes() == reference.read_bytes()
+    assert load_checkpoint(str(target)) is None
+    if suffix == ".csv.gz":
+        assert len(gzip.decompress(target.read_bytes()).split(b"\r\n")) == 5901
+
+
+def test_resumable_rows_match_the_streaming_generator(tmp_path):
+    path = tmp_path / "numbers.csv"
+    _write(path, ResumableDistribution(COUNTS, 900, 5), {"seed": 5})
+    expected = collect(iter_numbers_with_distribution(COUNTS, 900, seed=5))
+    assert path.read_text().split() == expected
+
+
+def test_a_different_job_is_refused(tmp_path):
+    path = tmp_path / "numbers.csv"
+    with pytest.raises(Crash):
+        _write(path, CrashingSource(ResumableDistribution(COUNTS, 900, 5), 4), {"seed": 5})
+    with pytest.raises(ValueError):
+        _write(path, ResumableDistribution(COUNTS, 900, 6), {"seed": 6})
+
+
+def test_resumed_contacts_are_byte_identical(tmp_path):
+    pytest.importorskip("faker")
+    from phgen.contacts import ResumableContacts
+
+    counts = {"Smart": 150, "Sun": 60}
+    options = {"line_ending": "\n", "trailing_newline": False}
+    job = {"networks": counts, "duplicates": 70, "seed": 3}
+    reference = tmp_path / "reference.csv"
+    run_resumable(str(reference), ResumableContacts(counts, 70, 3, block_rows=50), job,
+                  segment_rows=40, chunk_size=16, **options)
+    target = tmp_path / "resumed.csv"
+    with pytest.raises(Crash):
+        run_resumable(str(target), CrashingSource(ResumableContacts(counts, 70, 3, block_rows=50), 7), job,
+                      segment_rows=40, chunk_size=16, **options)
+    run_resumable(str(target), ResumableContacts(counts, 70, 3, block_rows=50), job,
+                  segment_rows=40, chunk_size=16, **options)
+    assert target.read_bytes() == reference.read_bytes()
@@ -0,0 +1,58 @@
+import pytest
+
+from phgen.columnar import ColumnarReader, ColumnarWriter, iter_columnar_text, save_columnar
+from phgen.invalid import generate_unique_invalid_numbers
+from phgen.mixed import iter_interleaved_numbers
+from phgen.prefixes import SIM_PREFIXES
+from phgen.store import DuplicatedNumbers, NumberStore
+from phgen.stream import collect
+from phgen.unique import generate_unique_ph_numbers
+
+
+def test_mixed_rows_round_trip(tmp_path):
+    rows = collect(iter_interleaved_numbers(3000, 800, 500, "shuffle", seed=1))
+    # Rows that look almost valid, and text the CSV could hold, stay text rows
+    rows += ["639991234567", "09171234567", "", "63917123456€", "+639171234567"]
+    path = str(tmp_path / "mixed.phc")
+    assert save_columnar(path, rows, chunk_size=700) == len(rows)
+    assert collect(iter_columnar_text(path, chunk_size=256)) == rows
+    with ColumnarReader(path) as reader:
+        assert len(reader) == len(rows)
+        assert [reader.text(row) for row in (0, 1234, len(rows) - 2)] == [rows[0], rows[1234], rows[-2]]
+        counts = reader.flag_counts()
+        assert counts["valid"] + counts["text"] == len(rows)
+        assert counts["text"] == 800 + 5
+
+
+def test_store_with_duplicates_round_trip(tmp_path):
+    numbers = generate_unique_ph_numbers(SIM_PREFIXES["Smart"] + SIM_PREFIXES["Sun"], 2500, seed=2)
+    store = NumberStore(int(number[2:]) for number in numbers)
+    path = str(tmp_path / "duplicates.phc")
+    assert save_columnar(path, DuplicatedNumbers(store, 600), chunk_size=512) == 3100
+    assert collect(iter_columnar_text(path)) == numbers + numbers[:600]
+    with ColumnarReader(path) as reader:
+        assert reader.flag_counts() == {"valid": 3100, "duplicate": 600, "text": 0}
+        unique = reader.network_counts(unique=True)
+        assert unique["Smart"] + unique["Sun"] == 2500
+        assert sum(reader.network_counts().values()) == 3100
+
+
+def test_writer_accepts_values_and_text_in_any_order(tmp_path):
+    invalid = generate_unique_invalid_numbers(50, seed=3)
+    valid = generate_unique_ph_numbers(SIM_PREFIXES["Globe/TM"], 50, seed=3)
+    path = str(tmp_path / "parts.phc")
+    with ColumnarWriter(path) as writer:
+        writer.write_numbers(invalid[:20])
+        writer.write_values([int(number[2:]) for number in valid])
+        writer.write_numbers(invalid[20:] + valid[:5], duplicate=True)
+    assert collect(iter_columnar_text(path)) == invalid[:20] + valid + invalid[20:] + valid[:5]
+
+
+def test_empty_file_and_wrong_magic(tmp_path):
+    path = str(tmp_path / "empty.phc")
+    assert save_columnar(path, []) == 0
+    assert collect(iter_columnar_text(path)) == []
+    other = tmp_path / "rows.csv"
+    other.write_bytes(b"639171234567\r\n" * 10)
+    with pytest.raises(ValueError):
+        ColumnarReader(str(other))
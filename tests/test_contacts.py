@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("faker")
+
+from phgen import contacts
+from phgen.contacts import load_or_build_pools, pool_cache_path
+
+
+def test_pool_build_is_seeded():
+    assert load_or_build_pools(50) == load_or_build_pools(50)
+
+
+def test_pool_cache_is_keyed_on_size_and_locale(tmp_path):
+    path = str(tmp_path / "pools.json")
+    pools = load_or_build_pools(40, path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert (data["size"], data["locale"]) == (40, "en_US")
+    assert load_or_build_pools(40, path) == pools
+    # Another size or locale rebuilds instead of reusing the cached pools
+    assert len(load_or_build_pools(30, path).first_names) == 30
+    assert load_or_build_pools(30, path, "en_PH") != load_or_build_pools(30, None)
+    assert os.listdir(tmp_path) == ["pools.json"]  # No temporary files left behind
+
+
+def test_pool_cache_lives_in_the_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert pool_cache_path(10, "en_PH") == str(tmp_path / "phgen" / "contact_pools_en_PH_10.json")
+    monkeypatch.setattr(contacts, "_pools", {})
+    pools = contacts.get_contact_pools(10, "en_PH")
+    assert os.path.exists(pool_cache_path(10, "en_PH"))
+    assert contacts.get_contact_pools(10, "en_PH") is pools
@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+
+from phgen.cli import main
+from phgen.counter import COUNTER_PLACEMENTS, COUNTER_STRATEGIES, CounterDataset
+from phgen.mixed import DUPLICATE, INVALID, VALID
+
+
+def _full(dataset):
+    return [row for chunk in dataset.iter_rows(chunk_size=257) for row in chunk]
+
+
+@pytest.mark.parametrize("strategy", COUNTER_STRATEGIES)
+@pytest.mark.parametrize("placement", COUNTER_PLACEMENTS)
+def test_any_slice_matches_the_full_run(strategy, placement):
+    dataset = CounterDataset(3000, 800, 1200, seed=4, strategy=strategy, placement=placement)
+    full = _full(dataset)
+    assert len(full) == dataset.total == 5000
+    for start, stop in [(0, 1), (1234, 1235), (999, 3333), (4800, 5000), (2500, 2500)]:
+        assert dataset.rows(start, stop) == full[start:stop]
+    # A fresh dataset from the same arguments, as another process would build it
+    again = CounterDataset(3000, 800, 1200, seed=4, strategy=strategy, placement=placement)
+    assert again.rows(4000, 4100) == full[4000:4100]
+    assert dataset.row(77) == full[77]
+
+
+def test_class_counts_are_exact():
+    dataset = CounterDataset(2000, 700, 300, seed=5)
+    classes = Counter(dataset.classes(0, dataset.total))
+    assert classes == {VALID: 2000, INVALID: 700, DUPLICATE: 300}
+    rows = _full(dataset)
+    invalid = [row for row, code in zip(rows, dataset.classes(0, dataset.total)) if code == INVALID]
+    assert len(set(invalid)) == 700
+
+
+def test_unique_exact_repeats_every_number_evenly():
+    dataset = CounterDataset(1000, 0, 2500, seed=6, strategy="exact", unique=True)
+    counts = Counter(_full(dataset))
+    assert len(counts) == 1000
+    assert sorted(counts.values()) == [3] * 500 + [4] * 500
+
+
+def test_out_of_range_slices_are_rejected():
+    dataset = CounterDataset(100, 10, 10, seed=7)
+    with pytest.raises(IndexError):
+        dataset.rows(100, 121)
+    with pytest.raises(ValueError):
+        CounterDataset(10, 0, 11, seed=7, strategy="head")
+
+
+def test_cli_slice_in_processes_matches_serial(tmp_path):
+    argv = ["slice", "-n", "3000", "--invalid", "500", "--duplicates", "400", "--seed", "9",
+            "--start", "700", "--stop", "2900", "--chunk-size", "128"]
+    assert main([*argv, "-o", str(tmp_path / "serial.csv")]) == 0
+    assert main([*argv, "--processes", "2", "-o", str(tmp_path / "sharded.csv")]) == 0
+    serial = (tmp_path / "serial.csv").read_bytes()
+    assert serial == (tmp_path / "sharded.csv").read_bytes()
+    dataset = CounterDataset(2100, 500, 400, seed=9)
+    assert serial.decode().split() == dataset.rows(700, 2900)
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from phgen.cli import main
+
+
+def test_report_counts_rows(tmp_path):
+    output = tmp_path / "valid.csv"
+    assert main(["valid", "-n", "500", "--seed", "1", "--report", "-o", str(output)]) == 0
+    report = json.loads((tmp_path / "valid.csv.report.json").read_text())
+    assert report["rows"] == 500
+
+
+@pytest.mark.parametrize("argv", [
+    ["valid", "-n", "100"],
+    ["weighted", "-n", "100"],
+    ["mixed", "-n", "100", "--invalid", "10"],
+    ["slice", "-n", "100", "--seed", "1"],
+])
+def test_report_rejects_worker_processes(tmp_path, capsys, argv):
+    output = tmp_path / "out.csv"
+    assert main([*argv, "--processes", "2", "--report", "-o", str(output)]) == 1
+    assert "--processes 1" in capsys.readouterr().err
+    assert not output.exists()
@@ -0,0 +1,90 @@
+import random
+from collections import Counter
+
+import pytest
+
+from phgen.invalid import INVALID_PATTERNS, InvalidNumberEngine, allocate_quotas, generate_unique_invalid_numbers
+from phgen.prefixes import all_network_prefixes
+
+_VALID_PREFIXES = set(all_network_prefixes())
+
+
+def _tail(text, head_length, charset):
+    return all(char in charset for char in text[head_length:])
+
+
+# What each family's numbers look like, written out independently of the renderers
+_LANGUAGES = {
+    "wrong_country_code": lambda s: len(s) == 11 and s.isdigit() and s[:2] in ("60", "61", "62", "64", "65"),
+    "wrong_length": lambda s: len(s) == 11 and s.isdigit() and s[:2] == "63" and s[2] != "0",
+    "invalid_prefix": lambda s: len(s) == 12 and s.isdigit() and s[:5] in ("63000", "63111", "63222"),
+    "invalid_carrier": lambda s: len(s) == 12 and s.isdigit() and s[:5] in ("63123", "63555"),
+    "letters": lambda s: len(s) == 11 and s[:4] in ("6381", "6390", "6391")
+                         and _tail(s, 4, "abcdefghijABCDEFGHIJ!@#$%^&*()"),
+    "wrong_structure": lambda s: len(s) == 12 and s[:2] == "63" and s[2:5] in _VALID_PREFIXES
+                                 and _tail(s, 5, "ABCD!@#$"),
+}
+for _length in range(8, 16):
+    _LANGUAGES[f"random_digits_{_length}"] = (
+        lambda s, length=_length: len(s) == length and s.isdigit() and s[0] in "12345789")
+
+
+def _families(text):
+    return [name for name, accepts in _LANGUAGES.items() if accepts(text)]
+
+
+def test_patterns_are_disjoint():
+    rng = random.Random(1)
+    assert {pattern.name for pattern in INVALID_PATTERNS} == set(_LANGUAGES)
+    for pattern in INVALID_PATTERNS:
+        indices = {0, pattern.size - 1, *(rng.randrange(pattern.size) for _ in range(2000))}
+        for index in indices:
+            # Every number belongs to its own family and to no other
+            assert _families(pattern.render(index)) == [pattern.name]
+
+
+@pytest.mark.parametrize("count", [1, 25, 1000, 12_345])
+def test_quotas_add_up_to_count(count):
+    engine = InvalidNumberEngine(INVALID_PATTERNS, count, seed=2)
+    assert sum(engine.quotas) == count
+    assert sum(engine.pattern_counts().values()) == count
+    numbers = engine.numbers(0, count)
+    assert len(set(numbers)) == count
+    assert Counter(_families(number)[0] for number in numbers) == engine.pattern_counts()
+
+
+def test_rows_mix_the_patterns():
+    # Neighbouring rows share a pattern about 1 time in 8 when rows are shuffled, never grouped
+    same = total = 0
+    for seed in range(20):
+        families = [_families(number)[0] for number in InvalidNumberEngine(INVALID_PATTERNS, 25, seed=seed).numbers(0, 25)]
+        same += sum(a == b for a, b in zip(families, families[1:]))
+        total += len(families) - 1
+    assert same / total < 0.25
+
+
+def test_capacity_is_enforced():
+    capacity = sum(pattern.size for pattern in INVALID_PATTERNS)
+    with pytest.raises(ValueError):
+        allocate_quotas(INVALID_PATTERNS, capacity + 1)
+    narrow = next(pattern for pattern in INVALID_PATTERNS if pattern.name == "invalid_carrier")
+    with pytest.raises(ValueError):
+        InvalidNumberEngine(INVALID_PATTERNS, narrow.size + 1, seed=3, names=["invalid_carrier"])
+    with pytest.raises(ValueError):
+        InvalidNumberEngine(INVALID_PATTERNS, 10, seed=3, names=["no_such_pattern"])
+
+
+def test_quotas_spill_over_full_patterns():
+    small = [pattern._replace(size=5) if pattern.name == "letters" else pattern for pattern in INVALID_PATTERNS]
+    quotas = dict(zip((pattern.name for pattern in small), allocate_quotas(small, 700)))
+    assert quotas["letters"] == 5
+    assert sum(quotas.values()) == 700
+
+
+def test_restricted_patterns_and_seeds():
+    numbers = generate_unique_invalid_numbers(500, seed=4, patterns=["letters", "wrong_length"])
+    assert {_families(number)[0] for number in numbers} == {"letters", "wrong_length"}
+    assert generate_unique_invalid_numbers(500, seed=4, patterns=["letters", "wrong_length"]) == numbers
+    engine = InvalidNumberEngine(INVALID_PATTERNS, 3000, seed=5)
+    assert engine.numbers_at([2999, 7, 1500]) == [engine.numbers(2999, 3000)[0], engine.numbers(7, 8)[0],
+                                                   engine.numbers(1500, 1501)[0]]
@@ -0,0 +1,81 @@
+from itertools import groupby
+
+import pytest
+
+from phgen.cli import main
+from phgen.mixed import DUPLICATE, INVALID, PLACEMENTS, VALID, InterleavedMixer, iter_interleaved_numbers
+from phgen.stream import chunk_sizes, collect
+
+
+def _rows(mixer, chunk_size=333):
+    return collect(mixer.iter_numbers(chunk_size))
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS)
+@pytest.mark.parametrize("valid, invalid, duplicates", [(2000, 500, 700), (1, 0, 5), (0, 40, 0), (300, 1, 0)])
+def test_class_counts_are_exact(placement, valid, invalid, duplicates):
+    mixer = InterleavedMixer(valid, invalid, duplicates, placement, burst_size=64, seed=1)
+    codes = list(mixer.iter_classes())
+    assert [codes.count(code) for code in (VALID, INVALID, DUPLICATE)] == [valid, invalid, duplicates]
+    rows = _rows(mixer)
+    assert len(rows) == valid + invalid + duplicates
+    assert mixer.counts == {"valid": valid, "invalid": invalid, "duplicate": duplicates}
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS)
+def test_duplicates_repeat_valid_rows_of_the_same_file(placement):
+    mixer = InterleavedMixer(1500, 400, 900, placement, seed=2)
+    codes = list(mixer.iter_classes())
+    rows = _rows(mixer)
+    by_class = {code: [row for row, c in zip(rows, codes) if c == code] for code in (VALID, INVALID, DUPLICATE)}
+    valid = set(by_class[VALID])
+    assert len(valid) == 1500  # Valid rows never repeat each other
+    assert set(by_class[DUPLICATE]) <= valid
+    assert len(set(by_class[INVALID])) == 400 and not valid & set(by_class[INVALID])
+
+
+def test_blocks_layout():
+    codes = list(InterleavedMixer(30, 20, 10, "blocks", seed=3).iter_classes())
+    assert codes == [VALID] * 30 + [INVALID] * 20 + [DUPLICATE] * 10
+
+
+@pytest.mark.parametrize("invalid, burst_size", [(500, 100), (530, 100), (7, 3), (50, 50)])
+def test_burst_layout(invalid, burst_size):
+    valid, duplicates = 3000, 1000
+    codes = list(InterleavedMixer(valid, invalid, duplicates, "burst", burst_size=burst_size, seed=4).iter_classes())
+    runs = [(code, len(list(group))) for code, group in groupby(codes, key=lambda code: code == INVALID)]
+    bursts = [length for is_invalid, length in runs if is_invalid]
+    assert bursts == list(chunk_sizes(invalid, burst_size))
+    # Bursts are spread evenly: burst k starts after (2k + 1) / 2n of the other rows
+    others_before = 0
+    k = 0
+    for is_invalid, length in runs:
+        if is_invalid:
+            assert others_before == (2 * k + 1) * (valid + duplicates) // (2 * len(bursts))
+            k += 1
+        else:
+            others_before += length
+
+
+def test_same_seed_same_rows_for_any_chunk_size():
+    first = collect(iter_interleaved_numbers(800, 300, 200, "shuffle", chunk_size=1000, seed=5))
+    assert collect(iter_interleaved_numbers(800, 300, 200, "shuffle", chunk_size=77, seed=5)) == first
+    assert collect(iter_interleaved_numbers(800, 300, 200, "shuffle", seed=6)) != first
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        InterleavedMixer(10, 5, placement="sorted")
+    with pytest.raises(ValueError):
+        InterleavedMixer(0, 5, 1)
+    with pytest.raises(ValueError):
+        InterleavedMixer(10, 5, burst_size=0)
+
+
+def test_cli_mixed_counts(tmp_path):
+    path = tmp_path / "mixed.csv"
+    argv = ["mixed", "-n", "1000", "--invalid", "150", "--duplicates", "100", "--placement", "burst", "--seed", "7"]
+    assert main([*argv, "-o", str(path)]) == 0
+    rows = path.read_text().split()
+    assert len(rows) == 1000
+    assert rows == collect(iter_interleaved_numbers(750, 150, 100, "burst", seed=7))
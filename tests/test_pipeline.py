@@ -0,0 +1,80 @@
+import gzip
+import hashlib
+import re
+
+import pytest
+
+pytest.importorskip("faker")
+
+from phgen.cli import main
+from phgen.contacts import DEPARTMENTS, load_or_build_pools
+from phgen.pipeline import plan_contact_blocks, write_contacts_parallel
+from phgen.prefixes import SIM_PREFIXES
+
+COUNTS = {"Smart": 700, "Sun": 250, "Globe/TM": 300}
+DUPLICATES = 450
+_ROW = re.compile(r"[^|]+\|[A-Z]\|[^|]+\|(09\d{9})\|[^|]+\|[^|]+\|([^|]+)\|[^|@]+@[^|]+\.com\|\d{1,3} [^|]+, [^|]+")
+
+
+@pytest.fixture(scope="module")
+def pools():
+    return load_or_build_pools(200)
+
+
+def _write(path, processes, pools=None, **options):
+    rows = write_contacts_parallel(str(path), COUNTS, DUPLICATES, seed=5, fast=pools is not None,
+                                   processes=processes, block_rows=128, pools=pools, **options)
+    assert rows == sum(COUNTS.values()) + DUPLICATES
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_same_file_for_any_process_count(tmp_path, pools, fast):
+    pools = pools if fast else None
+    digests = {hashlib.md5(_write(tmp_path / f"{processes}.csv", processes, pools)).hexdigest()
+               for processes in (1, 2, 3)}
+    assert len(digests) == 1
+
+
+def test_book1_layout_unique_mobiles_and_replayed_duplicates(tmp_path, pools):
+    data = _write(tmp_path / "contacts.csv", 2, pools)
+    assert not data.endswith(b"\n")
+    rows = data.decode("utf-8").split("\n")
+    unique_total = sum(COUNTS.values())
+    mobiles = []
+    for row in rows:
+        match = _ROW.fullmatch(row)
+        assert match, row
+        assert match.group(2) in DEPARTMENTS
+        mobiles.append(match.group(1))
+    # Unique rows: one network after the other, every mobile number new
+    assert len(set(mobiles[:unique_total])) == unique_total
+    start = 0
+    for network, count in COUNTS.items():
+        assert {mobile[1:4] for mobile in mobiles[start:start + count]} <= set(SIM_PREFIXES[network])
+        start += count
+    # Duplicates replay the first rows, byte for byte
+    assert rows[unique_total:] == rows[:DUPLICATES]
+
+
+def test_compressed_output_matches(tmp_path, pools):
+    plain = _write(tmp_path / "contacts.csv", 2, pools)
+    assert gzip.decompress(_write(tmp_path / "contacts.csv.gz", 2, pools)) == plain
+
+
+def test_plan_replays_the_head():
+    blocks = plan_contact_blocks({"Smart": 250, "Sun": 100}, 300, block_rows=100)
+    unique = [block for block in blocks if not block.replay]
+    replay = [block for block in blocks if block.replay]
+    assert [(block.network, block.start, block.rows) for block in unique] == [
+        ("Smart", 0, 100), ("Smart", 100, 100), ("Smart", 200, 50), ("Sun", 250, 100)]
+    assert [(block.block, block.keep) for block in replay] == [(0, 100), (1, 100), (2, 50), (3, 50)]
+    with pytest.raises(ValueError):
+        plan_contact_blocks({"Nowhere": 1}, 0)
+
+
+def test_cli_file_does_not_depend_on_processes(tmp_path):
+    argv = ["contacts", "--network", "Smart=90", "--network", "Sun=40", "--duplicates", "50", "--seed", "8"]
+    assert main([*argv, "-o", str(tmp_path / "one.csv")]) == 0
+    assert main([*argv, "--processes", "2", "-o", str(tmp_path / "two.csv")]) == 0
+    assert (tmp_path / "one.csv").read_bytes() == (tmp_path / "two.csv").read_bytes()
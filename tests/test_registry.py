@@ -0,0 +1,46 @@
+from collections import Counter
+
+import pytest
+
+from phgen.invalid import INVALID_PATTERNS, InvalidNumberEngine, iter_unique_invalid_numbers
+from phgen.registry import BITMAP_BYTES, NumberRegistry, open_invalid_registry
+
+
+def test_claims_persist_across_runs(tmp_path):
+    values = [9_171_234_567, 9_171_234_568, 9_998_765_432]
+    with NumberRegistry(str(tmp_path)) as registry:
+        assert registry.claim(values + values[:1]) == values
+    with NumberRegistry(str(tmp_path)) as registry:
+        assert registry.claim(values) == []
+        assert values[0] in registry and 9_170_000_000 not in registry
+        assert registry.issued_count("917") == 2
+
+
+def test_bitmap_of_the_wrong_size_is_refused(tmp_path):
+    (tmp_path / "917.bits").write_bytes(b"\0" * (BITMAP_BYTES - 1))
+    with NumberRegistry(str(tmp_path)) as registry:
+        with pytest.raises(ValueError):
+            registry.claim([9_171_234_567])
+    assert (tmp_path / "917.bits").stat().st_size == BITMAP_BYTES - 1
+
+
+def test_bloom_filter_of_another_capacity_is_refused(tmp_path):
+    open_invalid_registry(str(tmp_path), 1000).close()
+    with pytest.raises(ValueError):
+        open_invalid_registry(str(tmp_path), 2000)
+
+
+def test_invalid_registry_never_reissues_and_keeps_quotas(tmp_path):
+    names = ["invalid_prefix", "letters"]
+    quotas = InvalidNumberEngine(INVALID_PATTERNS, 5000, seed=4, names=names).pattern_counts()
+    runs = []
+    with open_invalid_registry(str(tmp_path), 100_000) as registry:
+        for _ in range(3):
+            runs.append([n for chunk in iter_unique_invalid_numbers(5000, 700, 4, names, registry) for n in chunk])
+    assert runs[0] == [n for chunk in iter_unique_invalid_numbers(5000, 700, 4, names) for n in chunk]
+    assert len(set().union(*runs)) == 3 * 5000
+    # Replacements come from the same pattern, so every run meets the same per-pattern quotas
+    for rows in runs:
+        kinds = Counter("invalid_prefix" if n[:5] in ("63000", "63111", "63222") and n.isdigit() else "letters"
+                        for n in rows)
+        assert kinds == quotas
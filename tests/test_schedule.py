@@ -0,0 +1,59 @@
+from collections import Counter
+
+import pytest
+
+from phgen.schedule import STRATEGIES, DuplicateScheduler
+
+
+def _indices(scheduler, chunk_size=997):
+    return [index for chunk in scheduler.iter_indices(chunk_size) for index in chunk]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_every_number_appears_and_totals_hold(strategy):
+    scheduler = DuplicateScheduler(5000, 3000, strategy, seed=1)
+    indices = _indices(scheduler)
+    assert len(indices) == scheduler.total == 8000
+    counts = Counter(indices)
+    assert set(counts) <= set(range(5000))
+    assert len(counts) == 5000  # Every unique number is written at least once
+    assert sum(count - 1 for count in counts.values()) == 3000
+
+
+@pytest.mark.parametrize("unique, duplicates", [(1000, 2500), (1000, 999), (7, 1), (300, 0)])
+def test_exact_spreads_duplicates_evenly(unique, duplicates):
+    counts = Counter(_indices(DuplicateScheduler(unique, duplicates, "exact", seed=2)))
+    base, extra = divmod(duplicates, unique)
+    assert sorted(counts.values(), reverse=True) == [base + 2] * extra + [base + 1] * (unique - extra)
+
+
+def test_exact_integer_multiplicity():
+    scheduler = DuplicateScheduler(2000, strategy="exact", seed=3, multiplicity=4)
+    assert scheduler.duplicates == 6000
+    assert set(Counter(_indices(scheduler)).values()) == {4}
+
+
+def test_exact_per_number_multiplicity():
+    multiplicity = [1 + (i * 7) % 5 for i in range(1500)]
+    scheduler = DuplicateScheduler(1500, strategy="exact", seed=4, multiplicity=multiplicity)
+    counts = Counter(_indices(scheduler, chunk_size=100))
+    assert [counts[i] for i in range(1500)] == multiplicity
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_same_seed_same_schedule(strategy):
+    first = _indices(DuplicateScheduler(3000, 2000, strategy, seed=5))
+    assert _indices(DuplicateScheduler(3000, 2000, strategy, seed=5)) == first
+    if strategy != "head":
+        assert _indices(DuplicateScheduler(3000, 2000, strategy, seed=6)) != first
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        DuplicateScheduler(10, 11, "head")
+    with pytest.raises(ValueError):
+        DuplicateScheduler(10, 5, "uniform", multiplicity=2)
+    with pytest.raises(ValueError):
+        DuplicateScheduler(3, strategy="exact", multiplicity=[1, 2])
+    with pytest.raises(ValueError):
+        DuplicateScheduler(3, strategy="exact", multiplicity=[1, 0, 2])
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import phgen.cli
+from phgen.service import GenerationService
+
+
+def _dechunk(body: bytes):
+    """(data, complete) of a chunked body; complete is False when the final 0-size chunk is missing"""
+    data = b""
+    while body:
+        size_line, _, body = body.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            return data, True
+        data, body = data + body[:size], body[size + 2:]
+    return data, False
+
+
+async def _get_all(targets, max_streams=8):
+    service = GenerationService(max_streams)
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async def get(target):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        await writer.drain()
+        raw = await reader.read()
+        writer.close()
+        head, _, body = raw.partition(b"\r\n\r\n")
+        if b"Transfer-Encoding: chunked" not in head:
+            return head.decode(), body, True
+        return (head.decode(), *_dechunk(body))
+
+    async with server:
+        return await asyncio.gather(*(get(target) for target in targets))
+
+
+def fetch(*targets):
+    return asyncio.run(_get_all(targets))
+
+
+@pytest.mark.parametrize("target", [
+    "/duplicate?unique=300&duplicates=100&seed=5",
+    "/duplicate?network=Smart=200&duplicates=100&strategy=uniform&seed=5",
+    "/mixed?count=300&invalid=50&duplicates=20&seed=5",
+])
+def test_seeded_request_repeats(target):
+    (head, first, complete), = fetch(target)
+    assert head.startswith("HTTP/1.1 200") and "X-Seed: 5" in head and complete
+    (_, second, _), = fetch(target)
+    assert first == second
+
+
+def test_x_seed_reproduces_unseeded_request():
+    (head, body, _), = fetch("/duplicate?unique=200&duplicates=50")
+    seed = next(line.split(": ")[1] for line in head.split("\r\n") if line.startswith("X-Seed"))
+    (_, again, _), = fetch(f"/duplicate?unique=200&duplicates=50&seed={seed}")
+    assert body == again
+
+
+@pytest.mark.parametrize("fast", ["", "&fast"])
+def test_concurrent_contacts_do_not_interfere(fast):
+    pytest.importorskip("faker")
+    targets = [f"/contacts?network=Smart=300&network=Sun=100&duplicates=150&chunk_size=7&seed={seed}{fast}"
+               for seed in range(6)]
+    alone = [fetch(target)[0][1] for target in targets]
+    together = [body for _, body, _ in fetch(*targets)]
+    assert together == alone
+    assert len(set(alone)) == len(alone)
+
+
+def test_failure_mid_stream_cuts_the_body(monkeypatch, capsys):
+    def failing_chunks(args):
+        yield ["639171234567"]
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(phgen.cli, "_valid_chunks", failing_chunks)
+    (head, body, complete), = fetch("/valid?count=10")
+    assert head.startswith("HTTP/1.1 200")
+    assert body == b"639171234567\r\n" and not complete
+    assert "disk on fire" in capsys.readouterr().err
+
+
+def test_failure_before_first_chunk_is_a_500(monkeypatch, capsys):
+    def failing_chunks(args):
+        raise RuntimeError("disk on fire")
+        yield
+
+    monkeypatch.setattr(phgen.cli, "_valid_chunks", failing_chunks)
+    (head, _, _), = fetch("/valid?count=10")
+    assert head.startswith("HTTP/1.1 500")
+    assert "disk on fire" in capsys.readouterr().err
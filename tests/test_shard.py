@@ -0,0 +1,50 @@
+import gzip
+import os
+
+import pytest
+
+from phgen.shard import derive_seed, generate_file_sharded, generate_files_sharded, split_rows
+from phgen.valid import iter_number_rows
+
+
+def _sharded(path, processes, seed=11, shards=4, rows=5003):
+    assert generate_file_sharded(str(path), iter_number_rows, rows, seed=seed, shards=shards,
+                                 processes=processes) == rows
+    return path.read_bytes()
+
+
+def test_same_seed_and_shards_give_the_same_file(tmp_path):
+    first = _sharded(tmp_path / "a.csv", 2)
+    assert _sharded(tmp_path / "b.csv", 2) == first
+    assert _sharded(tmp_path / "c.csv", 1) == first
+    assert _sharded(tmp_path / "d.csv", 3) == first
+    assert _sharded(tmp_path / "e.csv", 2, seed=12) != first
+    assert first.count(b"\r\n") == 5003
+    assert sorted(os.listdir(tmp_path)) == ["a.csv", "b.csv", "c.csv", "d.csv", "e.csv"]  # Parts are cleaned up
+
+
+def test_compressed_parts_stitch_into_the_same_rows(tmp_path):
+    plain = _sharded(tmp_path / "rows.csv", 2)
+    assert gzip.decompress(_sharded(tmp_path / "rows.csv.gz", 2)) == plain
+
+
+def test_files_sharded_are_reproducible(tmp_path):
+    def run(name, processes):
+        paths = [tmp_path / f"{name}_{index}.csv" for index in range(3)]
+        counts = generate_files_sharded([str(path) for path in paths], iter_number_rows, 700, seed=3,
+                                        processes=processes)
+        assert counts == [700] * 3
+        return [path.read_bytes() for path in paths]
+
+    first = run("a", 2)
+    assert run("b", 2) == first
+    assert run("c", 1) == first
+    assert len(set(first)) == 3  # Every file has its own stream
+
+
+def test_split_rows_and_seeds():
+    assert split_rows(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert split_rows(2, 4) == [(0, 1), (1, 2), (2, 2), (2, 2)]
+    with pytest.raises(ValueError):
+        split_rows(10, 0)
+    assert derive_seed(1, 0) == derive_seed(1, 0) != derive_seed(1, 1)
@@ -0,0 +1,32 @@
+import random
+from array import array
+
+import pytest
+
+from phgen import store
+from phgen.prefixes import SIM_PREFIXES
+from phgen.store import NumberStore, sorted_values
+
+
+@pytest.mark.parametrize("size", [0, 1, 99, 1000, 4321])
+def test_sorted_values_without_numpy_matches_sorted(monkeypatch, size):
+    monkeypatch.setattr(store, "SORT_RUN", 100)
+    monkeypatch.setitem(__import__("sys").modules, "numpy", None)  # Force the merge path
+    rng = random.Random(size)
+    values = array('Q', (rng.randrange(10 ** 10) for _ in range(size)))
+    assert sorted_values(values) == array('Q', sorted(values))
+
+
+def test_membership_and_counts():
+    rng = random.Random(2)
+    bases = [int(SIM_PREFIXES[network][0]) * 10 ** 7 for network in ("Globe/TM", "Smart")]
+    values = [rng.choice(bases) + rng.randrange(1000) for _ in range(3000)]
+    numbers = NumberStore(values)
+    assert numbers.unique_count() == len(set(values))
+    assert all(f"63{value}" in numbers for value in values[:100])
+    assert f"63{bases[0] + 1000}" not in numbers and "not a number" not in numbers
+    counts = numbers.network_counts(SIM_PREFIXES, unique=True)
+    assert counts["Globe/TM"] == len({value for value in values if value < bases[0] + 1000})
+    assert sum(counts.values()) == len(set(values))
+    numbers.extend([bases[0] + 1000])
+    assert bases[0] + 1000 in numbers
@@ -0,0 +1,72 @@
+import csv
+import gzip
+import lzma
+import os
+import random
+
+import pytest
+
+from phgen.stream import compressed_name, compression_for, write_chunks
+from phgen.writer import write_files
+
+_DECOMPRESS = {None: bytes, "gzip": gzip.decompress, "xz": lzma.decompress}
+
+
+def _chunks(seed, rows=2500, chunk_size=300):
+    rng = random.Random(seed)
+    return [[f"63917{rng.randrange(10 ** 7):07d}" for _ in range(min(chunk_size, rows - start))]
+            for start in range(0, rows, chunk_size)]
+
+
+def test_write_chunks_matches_csv_writer(tmp_path):
+    chunks = _chunks(1)
+    assert write_chunks(str(tmp_path / "fast.csv"), chunks) == 2500
+    with open(tmp_path / "csv.csv", 'w', newline='') as f:
+        csv.writer(f).writerows([row] for chunk in chunks for row in chunk)
+    assert (tmp_path / "fast.csv").read_bytes() == (tmp_path / "csv.csv").read_bytes()
+    write_chunks(str(tmp_path / "joined.txt"), chunks + [[]], line_ending="\n", trailing_newline=False)
+    assert (tmp_path / "joined.txt").read_bytes() == "\n".join(row for chunk in chunks for row in chunk).encode()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "xz"])
+def test_write_files_compressed_round_trip(tmp_path, compression):
+    plain = [str(tmp_path / f"plain_{index}.csv") for index in range(5)]
+    packed = [compressed_name(str(tmp_path / f"packed_{index}.csv"), compression) for index in range(5)]
+    assert all(compression_for(name) == compression for name in packed)
+    assert write_files(((name, _chunks(index)) for index, name in enumerate(plain)), threads=2,
+                       compression=None) == [2500] * 5
+    # The extension picks the compression
+    assert write_files(((name, _chunks(index)) for index, name in enumerate(packed)), threads=3,
+                       queue_size=1) == [2500] * 5
+    for plain_name, packed_name in zip(plain, packed):
+        with open(plain_name, 'rb') as f:
+            expected = f.read()
+        with open(packed_name, 'rb') as f:
+            assert _DECOMPRESS[compression](f.read()) == expected
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_gzip_output_is_reproducible(tmp_path):
+    first, second = str(tmp_path / "a.csv.gz"), str(tmp_path / "b.csv.gz")
+    write_chunks(first, _chunks(2))
+    write_chunks(second, _chunks(2))
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_failed_generation_leaves_no_file(tmp_path):
+    def failing():
+        yield from _chunks(3)[:2]
+        raise RuntimeError("generator failed")
+
+    jobs = [(str(tmp_path / "good.csv"), _chunks(4)), (str(tmp_path / "bad.csv.gz"), failing())]
+    with pytest.raises(RuntimeError):
+        write_files(jobs, threads=2)
+    assert os.listdir(tmp_path) == ["good.csv"]
+
+
+def test_unknown_compression_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        compressed_name("rows.csv", "zip")
+    with pytest.raises(ValueError):
+        write_chunks(str(tmp_path / "rows.csv"), _chunks(5), compression="zip")
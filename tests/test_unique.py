@@ -0,0 +1,75 @@
+import pytest
+
+from phgen.batch import SUFFIX_SPACE
+from phgen.prefixes import SIM_PREFIXES
+from phgen.unique import FeistelPermutation, UniqueNumberSampler, UniquePermutation
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 17, 1000, 4097, 65537])
+@pytest.mark.parametrize("tweak", [None, "rows"])
+def test_feistel_is_a_bijection(size, tweak):
+    permute = FeistelPermutation(size, 42, tweak=tweak)
+    values = permute.batch(0, size)
+    assert sorted(values) == list(range(size))
+    assert [permute(index) for index in range(0, size, max(size // 50, 1))] == values[::max(size // 50, 1)]
+
+
+def test_feistel_depends_on_key_and_tweak_not_expected():
+    size = 10_000
+    base = FeistelPermutation(size, 7).batch(0, size)
+    assert FeistelPermutation(size, 7, expected=3).batch(0, size) == base
+    assert FeistelPermutation(size, 8).batch(0, size) != base
+    assert FeistelPermutation(size, 7, tweak="a").batch(0, size) != FeistelPermutation(size, 7, tweak="b").batch(0, size)
+
+
+def test_feistel_ranges_are_independent():
+    permute = FeistelPermutation(5000, 3)
+    assert permute.batch(0, 1234) + permute.batch(1234, 5000) == permute.batch(0, 5000)
+    with pytest.raises(IndexError):
+        permute(5000)
+    with pytest.raises(IndexError):
+        permute.batch(0, 5001)
+
+
+def test_unique_permutation_never_repeats():
+    numbers = UniquePermutation(SIM_PREFIXES["Smart"], 11)
+    values = numbers.values(0, 50_000)
+    assert len(set(values)) == len(values)
+    assert numbers.values_at([10, 20_000]) == [values[10], values[20_000]]
+    assert {value // SUFFIX_SPACE for value in values} <= {int(prefix) for prefix in SIM_PREFIXES["Smart"]}
+
+
+def test_sampler_draws_without_replacement_across_calls():
+    sampler = UniqueNumberSampler(5)
+    prefixes = SIM_PREFIXES["Sun"]
+    drawn = sampler.draw(prefixes, 30_000) + sampler.draw(prefixes, 30_000) + sampler.draw_for(prefixes * 100)
+    assert len(set(drawn)) == len(drawn)
+    assert sampler.remaining(prefixes) == len(set(prefixes)) * SUFFIX_SPACE - len(drawn)
+
+
+def test_sampler_state_resumes_the_same_draws():
+    prefixes = SIM_PREFIXES["Globe/TM"]
+    sampler = UniqueNumberSampler(9)
+    sampler.draw(prefixes, 1000)
+    state = sampler.getstate()
+    expected = sampler.draw(prefixes, 1000)
+    resumed = UniqueNumberSampler(9)
+    resumed.setstate(state)
+    assert resumed.draw(prefixes, 1000) == expected
+
+
+def _inversions(values):
+    return sum(1 for i, a in enumerate(values) for b in values[i + 1:] if a > b)
+
+
+@pytest.mark.parametrize("size", [20, 25, 50, 300])
+def test_feistel_shuffles_small_domains(size):
+    # A uniform shuffle leaves `near` indices within 3 places on average, and has n(n-1)/4 inversions
+    near = sum(min(i + 3, size - 1) - max(i - 3, 0) + 1 for i in range(size)) / size
+    permutations = [FeistelPermutation(size, seed, tweak=tweak).batch(0, size)
+                    for seed in range(30) for tweak in (None, "rows")]
+    displaced = [sum(abs(value - index) <= 3 for index, value in enumerate(p)) for p in permutations]
+    assert sum(displaced) / len(displaced) < 1.25 * near
+    inversions = sum(map(_inversions, permutations)) / len(permutations)
+    assert 0.9 < inversions / (size * (size - 1) / 4) < 1.1
+    assert list(range(size)) not in permutations
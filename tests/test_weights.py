@@ -0,0 +1,73 @@
+import random
+from collections import Counter
+
+import pytest
+
+from phgen.duplicates import iter_weighted_numbers
+from phgen.prefixes import SIM_PREFIXES
+from phgen.registry import NumberRegistry
+from phgen.store import prefix_network_table
+from phgen.weights import NetworkWeights, apportion, split_quotas
+
+MARKET_SHARE = {"Globe/TM": 0.55, "Smart": 0.25, "TNT": 0.1, "Sun": 0.1}
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1], [3, 0, 7, 2], [0.55, 0.25, 0.1, 0.1], [1e-9, 1.0]])
+@pytest.mark.parametrize("total", [0, 1, 7, 1000, 99_991])
+def test_apportion_is_exact(weights, total):
+    counts = apportion(weights, total)
+    assert sum(counts) == total
+    for weight, count in zip(weights, counts):
+        # Largest remainder: every count is the floor or the ceiling of its exact share
+        assert abs(count - total * weight / sum(weights)) < 1
+
+
+def test_split_quotas_meets_every_quota():
+    rng = random.Random(1)
+    quotas = [rng.randrange(500) for _ in range(20)]
+    total = sum(quotas)
+    parts = []
+    while sum(parts) < total:
+        parts.append(min(rng.randrange(1, 300), total - sum(parts)))
+    split = list(split_quotas(quotas, parts))
+    assert [sum(counts) for counts in split] == parts
+    assert [sum(column) for column in zip(*split)] == quotas
+    assert all(count >= 0 for counts in split for count in counts)
+
+
+def test_split_quotas_rejects_mismatched_parts():
+    with pytest.raises(ValueError):
+        list(split_quotas([5, 5], [4, 4]))
+
+
+def test_weighted_numbers_meet_quotas():
+    weights = NetworkWeights(MARKET_SHARE)
+    for total in (17, 1000, 25_000):
+        rows = [row for chunk in weights.iter_numbers(total, 999, random.Random(total)) for row in chunk]
+        prefixes = Counter(row[2:5] for row in rows)
+        assert [prefixes[prefix] for prefix in weights.prefixes] == weights.quotas(total)
+
+
+def test_market_share_draws_only_owned_prefixes():
+    weights = NetworkWeights(MARKET_SHARE)
+    owners = prefix_network_table(SIM_PREFIXES)
+    rows = [row for chunk in iter_weighted_numbers(weights, 5000, 1000, 333, seed=3) for row in chunk]
+    unique = rows[:5000]
+    assert len(set(unique)) == 5000 and rows[5000:] == unique[:1000]
+    networks = Counter(owners[int(row[2:5])] for row in unique)
+    assert networks == Counter({n: c for n, c in weights.network_counts(weights.quotas(5000)).items() if c})
+    prefixes = Counter(row[2:5] for row in unique)
+    assert [prefixes[prefix] for prefix in weights.prefixes] == weights.quotas(5000)
+
+
+def test_market_share_with_registry_never_reissues(tmp_path):
+    weights = NetworkWeights(MARKET_SHARE, {"917": 50})
+    runs = []
+    with NumberRegistry(str(tmp_path)) as registry:
+        for seed in (1, 1):
+            runs.append([row for chunk in iter_weighted_numbers(weights, 3000, 0, 500, registry, seed=seed)
+                         for row in chunk])
+    assert not set(runs[0]) & set(runs[1])
+    for rows in runs:
+        prefixes = Counter(row[2:5] for row in rows)
+        assert [prefixes[prefix] for prefix in weights.prefixes] == weights.quotas(3000)
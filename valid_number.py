@@ -1,56 +1,71 @@
-import csv
+import os
 import random
+from functools import partial
 from typing import List
 
-# SIM Prefixes mapping with network names in descending priority order
-SIM_PREFIXES: dict[str, List[str]] = {
-    "Globe/TM": ["905", "906", "915", "916", "917", "926", "927", "935", "936", "945"],
-    "Smart": ["908", "918", "919", "920", "921", "928", "929", "939", "946", "947", "949"],
-    "TNT": ["907", "909", "910", "912", "930", "938", "946", "948", "950"],
-    "Smart/TNT": ["907", "908", "909", "910", "912", "913", "914"],
-    "Sun": ["922", "923", "924", "925", "931", "932", "932", "934", "940", "941", "942"]
-}
+from phgen.prefixes import SIM_PREFIXES, all_network_prefixes
+from phgen.registry import NumberRegistry
+from phgen.shard import generate_file_sharded, generate_files_sharded
+from phgen.stream import compressed_name, write_chunks
+from phgen.valid import (
+    generate_mixed_numbers, generate_number_store, iter_mixed_numbers,
+    iter_number_rows, iter_unique_file_rows, iter_unique_rows,
+)
+from phgen.writer import write_files
 
 def generate_ph_number(prefix: str) -> str:
     """Generate a random Philippine mobile number (63 + prefix + 7 random digits)"""
     suffix = ''.join([str(random.randint(0, 9)) for _ in range(7)])
     return f"63{prefix}{suffix}"
 
-def generate_mixed_numbers(total_numbers: int) -> List[List[str]]:
-    """Generate numbers from ALL networks (randomly mixed)"""
-    numbers = []
-    all_prefixes = []
-    
-    # Combine all prefixes into one list
-    for network in SIM_PREFIXES:
-        all_prefixes.extend(SIM_PREFIXES[network])
-    
-    # Generate random numbers
-    for _ in range(total_numbers):
-        prefix = random.choice(all_prefixes)  # Randomly pick any prefix
-        number = generate_ph_number(prefix)
-        numbers.append([number])  # CSV format: 1 number per row
-    
-    return numbers
-
-def save_to_csv(filename: str, numbers: List[List[str]]):
-    """Save numbers to a CSV file"""
-    with open(filename, 'w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerows(numbers)
+def save_to_csv(filename: str, numbers: List[str]):
+    """Save numbers to a CSV file (one number per row, same CRLF rows as csv.writer)"""
+    write_chunks(filename, [numbers])
 
 def main():
     # CONFIGURATION (Change as needed)
     CONTACTS_PER_FILE = 20 # Numbers per file
     NUMBER_OF_FILES = 1       # How many CSV files to generate
+    PROCESSES = 1             # Worker processes (>1 spreads the files, or one file's rows, across cores)
+    SEED = None               # Set an int for byte-identical output (same SEED and PROCESSES)
+    UNIQUE = False            # True = no number repeats within a file
+    USE_REGISTRY = False      # True = never reuse numbers issued by earlier runs (kept in .registry/, one process)
+    COMPRESSION = None        # "gzip" or "xz" writes Valid_N.csv.gz / Valid_N.csv.xz
+    WRITER_THREADS = 4        # Files compressed and written while the next one is generated
     
     print(f"Generating {NUMBER_OF_FILES} files with {CONTACTS_PER_FILE} mixed numbers each...")
     
-    for file_num in range(1, NUMBER_OF_FILES + 1):
-        numbers = generate_mixed_numbers(CONTACTS_PER_FILE)
-        filename = f"Valid_{file_num}.csv"
-        save_to_csv(filename, numbers)
+    filenames = [compressed_name(f"Valid_{file_num}.csv", COMPRESSION) for file_num in range(1, NUMBER_OF_FILES + 1)]
+    if USE_REGISTRY and PROCESSES > 1:
+        print("❌ USE_REGISTRY updates the registry from one process, set PROCESSES = 1")
+        return
+    if (PROCESSES > 1 or SEED is not None or UNIQUE) and not USE_REGISTRY:
+        seed = SEED if SEED is not None else random.getrandbits(64)
+        if NUMBER_OF_FILES == 1:
+            rows_fn = partial(iter_unique_rows, seed=seed) if UNIQUE else iter_number_rows
+            generate_file_sharded(filenames[0], rows_fn, CONTACTS_PER_FILE,
+                                  seed=seed, shards=PROCESSES, processes=PROCESSES)
+        else:
+            # Each file gets its own permutation key, drawn from its shard RNG
+            rows_fn = iter_unique_file_rows if UNIQUE else iter_number_rows
+            generate_files_sharded(filenames, rows_fn, CONTACTS_PER_FILE,
+                                   seed=seed, processes=PROCESSES)
+        for filename in filenames:
+            print(f"Created {filename}")
+        print("Done!")
+        return
+    
+    # The registry is updated in place, so registry runs stay in this process; its numbers never
+    # repeat, so UNIQUE holds, and SEED repeats a run given the same registry contents
+    registry = NumberRegistry(os.path.join(os.path.dirname(__file__), ".registry")) if USE_REGISTRY else None
+    rng = random.Random(SEED)
+    # Rows are generated here, in order, while writer threads compress and write earlier files
+    jobs = ((filename, iter_mixed_numbers(CONTACTS_PER_FILE, rng=rng, registry=registry)) for filename in filenames)
+    write_files(jobs, threads=WRITER_THREADS)
+    for filename in filenames:
         print(f"Created {filename}")
+    if registry is not None:
+        registry.close()
 
     print("Done!")
 
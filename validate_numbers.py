@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+from phgen.prefixes import SIM_PREFIXES
+from phgen.validate import PrefixClassifier, validate_file
+
+def main():
+    # ===== USER CONFIGURATION =====
+    # 1. Files to audit (CSV with one number per row, or pipe-delimited contact files)
+    #    Paths given on the command line take precedence
+    FILES = [
+        os.path.join(os.path.dirname(__file__), "Duplicate", "Duplicate_500.csv"),
+    ]
+    
+    # 2. Write a per-row report next to each file (<name>.report.csv)
+    WRITE_REPORT = True
+    # =============================
+    
+    files = sys.argv[1:] or FILES
+    classifier = PrefixClassifier(SIM_PREFIXES)
+    
+    for path in files:
+        if not os.path.exists(path):
+            print(f"\n❌ File not found: {path}")
+            continue
+        report_path = f"{os.path.splitext(path)[0]}.report.csv" if WRITE_REPORT else None
+        start = time.perf_counter()
+        summary = validate_file(path, classifier, report_path)
+        elapsed = time.perf_counter() - start
+        
+        print(f"\n✅ Checked: {path}")
+        print(f"🔢 Rows: {summary.rows} ({summary.rows / max(elapsed, 1e-9) * 60:,.0f} rows/min)")
+        print(f"🌟 Valid: {summary.valid}")
+        print(f"❌ Invalid: {summary.invalid}")
+        if report_path:
+            print(f"📁 Report: {os.path.abspath(report_path)}")
+        
+        print("\n📶 Network distribution (valid rows):")
+        for network, count in summary.network_counts.items():
+            print(f"  - {network}: {count} numbers")
+        if summary.reason_counts:
+            print("\n🔍 Invalid reasons:")
+            for reason, count in summary.reason_counts.items():
+                print(f"  - {reason}: {count} numbers")
+
+if __name__ == "__main__":
+    main()